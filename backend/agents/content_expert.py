@@ -11,7 +11,7 @@ The Content Expert focuses on:
 This agent runs IN PARALLEL with the Visual Director.
 """
 
-from typing import List
+from typing import List, Optional
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -25,6 +25,7 @@ from models.schemas import (
     PageSkeleton
 )
 from llm.client import create_llm_from_env
+from llm.structured import record_parse, PARSED, REPAIRED, FAILED
 
 
 class ContentExpertAgent:
@@ -34,10 +35,61 @@ class ContentExpertAgent:
     Focus: Pedagogy, accuracy, clarity, analogies, examples
     """
 
+    # Appended to the user prompt (after the cacheable prefix) when a
+    # deadline forces short output
+    BRIEF_INSTRUCTIONS = """
+## Length Budget (deadline):
+Keep it brief: main_content under 150 words, at most 3 key_points, 1 example and 1 quiz question.
+"""
+
     def __init__(self, model_name: str = "gpt-4o"):
-        # Use unified LLM client
+        # Shared LLM client (one per config, pooled connections)
         self.llm = create_llm_from_env()
         self.parser = PydanticOutputParser(pydantic_object=ContentCollection)
+        self.node_parser = PydanticOutputParser(pydantic_object=ContentBlock)
+
+        # Static prompt prefixes, built once so they stay byte-identical across
+        # calls (lets providers serve them from their prefix cache)
+        self._collection_system_prompt = (
+            self._build_system_prompt() + "\n" + self._build_collection_format_instructions()
+        )
+        self._node_system_prompt = (
+            self._build_system_prompt() + "\n" + self._build_node_format_instructions()
+        )
+
+    def _build_node_format_instructions(self) -> str:
+        """Output format for single-node generation (static, from ContentBlock's schema)."""
+        difficulties = ", ".join(level.value for level in DifficultyLevel)
+        return f"""## Task: SINGLE learning node
+
+You will receive the section context and then ONE node's information.
+Generate ONLY the content for that specific node.
+**IMPORTANT: Return ONLY a JSON object for this single node, not an array.**
+Copy node_id, title and category exactly from the Node Information.
+
+- key_points, examples, keywords, common_misconceptions, quiz_questions, quiz_answers: arrays of plain strings
+- analogies: one string
+- difficulty must be one of: {difficulties}
+
+{self.node_parser.get_format_instructions()}
+"""
+
+    def _build_collection_format_instructions(self) -> str:
+        """Output format for whole-skeleton generation (static)."""
+        return f"""## CRITICAL: Output Format
+
+You must output ONLY valid JSON. No additional text, no explanations, no markdown code blocks.
+
+The JSON must follow this exact structure:
+- "contents": array of content blocks
+- Each block must have: node_id, title, category, main_content, key_points, examples, analogies, difficulty, keywords, common_misconceptions, quiz_questions, quiz_answers
+- category must be one of: abstract_concept, concrete_example, process_flow, code_example, comparison_analysis, historical_event, practice_exercise, definition
+- difficulty must be one of: beginner, intermediate, advanced
+
+{self.parser.get_format_instructions()}
+
+REMEMBER: Output ONLY the JSON object, nothing else!
+"""
 
     def _build_system_prompt(self) -> str:
         """Build system prompt for content generation."""
@@ -159,7 +211,8 @@ For each content node, generate:
     def generate_content(
         self,
         skeleton: PageSkeleton,
-        target_audience: str
+        target_audience: str,
+        max_tokens: Optional[int] = None
     ) -> ContentCollection:
         """
         Generate educational content for all nodes in the skeleton.
@@ -167,10 +220,45 @@ For each content node, generate:
         Args:
             skeleton: Page structure from Planner Agent
             target_audience: Who is this content for?
+            max_tokens: Lower output limit for deadline-constrained runs
+                (also asks the model for brief content)
 
         Returns:
             ContentCollection with generated content for each node
         """
+        messages = self._build_collection_messages(skeleton, target_audience, brief=max_tokens is not None)
+
+        try:
+            response = self.llm.invoke(messages, output_schema=ContentCollection, **self._limit_kwargs(max_tokens))
+            return self._parse_collection_response(response, skeleton)
+
+        except Exception as e:
+            print(f"❌ Content Expert error: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+    async def agenerate_content(
+        self,
+        skeleton: PageSkeleton,
+        target_audience: str,
+        max_tokens: Optional[int] = None
+    ) -> ContentCollection:
+        """Async variant of generate_content() (uses ainvoke)."""
+        messages = self._build_collection_messages(skeleton, target_audience, brief=max_tokens is not None)
+
+        try:
+            response = await self.llm.ainvoke(messages, output_schema=ContentCollection, **self._limit_kwargs(max_tokens))
+            return self._parse_collection_response(response, skeleton)
+
+        except Exception as e:
+            print(f"❌ Content Expert error: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+    def _build_collection_messages(self, skeleton: PageSkeleton, target_audience: str, brief: bool = False) -> list:
+        """Build the LLM messages for whole-skeleton content generation."""
         print(f"📚 Content Expert: Generating content for {self._count_nodes(skeleton)} nodes...")
 
         # Collect all nodes with their context
@@ -178,166 +266,165 @@ For each content node, generate:
 
         # Build user prompt
         user_prompt = self._build_user_prompt(skeleton, nodes_context, target_audience)
+        if brief:
+            user_prompt += self.BRIEF_INSTRUCTIONS
 
         # Build messages
-        messages = [
-            SystemMessage(content=self._build_system_prompt()),
+        return [
+            SystemMessage(content=self._collection_system_prompt),
             HumanMessage(content=user_prompt)
         ]
 
+    def _parse_collection_response(self, response, skeleton: PageSkeleton) -> ContentCollection:
+        """Parse and validate a ContentCollection response (with manual JSON recovery)."""
+        # Try to parse with better error handling
         try:
-            response = self.llm.invoke(messages)
+            result = self.parser.parse(response.content)
+            record_parse("content_expert", PARSED)
+        except Exception as parse_error:
+            print(f"⚠️  Pydantic parser failed: {parse_error}")
+            print(f"📝 Attempting manual JSON parsing...")
 
-            # Try to parse with better error handling
-            try:
-                result = self.parser.parse(response.content)
-            except Exception as parse_error:
-                print(f"⚠️  Pydantic parser failed: {parse_error}")
-                print(f"📝 Attempting manual JSON parsing...")
-
-                # Try manual parsing as fallback
-                import json
-                import re
-
-                # Try to extract JSON from response
-                content = response.content
-                # Look for JSON block
-                json_match = re.search(r'\{[\s\S]*\}', content)
-                if json_match:
-                    json_str = json_match.group(0)
-
-                    # Clean control characters that might break JSON parsing
-                    # LLMs sometimes output control chars in JSON strings that break parsing
-
-                    # Remove all control characters except valid JSON whitespace (space, \n, \r, \t in structure)
-                    # We need to preserve the JSON structure but clean control chars from string values
-                    import json as json_module
-
-                    # Step 1: Fix invalid escape sequences
-                    # LLMs sometimes generate backslashes followed by non-escapable characters
-                    # We need to clean these while preserving valid escapes like \n, \t, \", \\, \uXXXX
-
-                    def clean_invalid_escapes(text: str) -> str:
-                        """Remove invalid escape sequences from JSON string."""
-                        # Pattern: backslash followed by anything that's NOT a valid escape character
-                        # Valid escapes: " \ / b f n r t uXXXX (where X is hex digit)
-                        result = []
-                        i = 0
-                        while i < len(text):
-                            if text[i] == '\\' and i + 1 < len(text):
-                                next_char = text[i + 1]
-                                # Check if it's a valid escape
-                                if next_char in '"\\/bfnrt':
-                                    result.append(text[i:i+2])
-                                    i += 2
-                                    continue
-                                elif next_char == 'u' and i + 5 < len(text):
-                                    # Check \uXXXX format
-                                    hex_digits = text[i+2:i+6]
-                                    if all(c in '0123456789abcdefABCDEF' for c in hex_digits):
-                                        result.append(text[i:i+6])
-                                        i += 6
-                                        continue
-                                # Invalid escape - remove the backslash, keep the next char
-                                result.append(next_char)
+            # Try manual parsing as fallback
+            import json
+            import re
+
+            # Try to extract JSON from response
+            content = response.content
+            # Look for JSON block
+            json_match = re.search(r'\{[\s\S]*\}', content)
+            if json_match:
+                json_str = json_match.group(0)
+
+                # Clean control characters that might break JSON parsing
+                # LLMs sometimes output control chars in JSON strings that break parsing
+
+                # Remove all control characters except valid JSON whitespace (space, \n, \r, \t in structure)
+                # We need to preserve the JSON structure but clean control chars from string values
+                import json as json_module
+
+                # Step 1: Fix invalid escape sequences
+                # LLMs sometimes generate backslashes followed by non-escapable characters
+                # We need to clean these while preserving valid escapes like \n, \t, \", \\, \uXXXX
+
+                def clean_invalid_escapes(text: str) -> str:
+                    """Remove invalid escape sequences from JSON string."""
+                    # Pattern: backslash followed by anything that's NOT a valid escape character
+                    # Valid escapes: " \ / b f n r t uXXXX (where X is hex digit)
+                    result = []
+                    i = 0
+                    while i < len(text):
+                        if text[i] == '\\' and i + 1 < len(text):
+                            next_char = text[i + 1]
+                            # Check if it's a valid escape
+                            if next_char in '"\\/bfnrt':
+                                result.append(text[i:i+2])
                                 i += 2
-                            else:
-                                result.append(text[i])
-                                i += 1
-                        return ''.join(result)
+                                continue
+                            elif next_char == 'u' and i + 5 < len(text):
+                                # Check \uXXXX format
+                                hex_digits = text[i+2:i+6]
+                                if all(c in '0123456789abcdefABCDEF' for c in hex_digits):
+                                    result.append(text[i:i+6])
+                                    i += 6
+                                    continue
+                            # Invalid escape - remove the backslash, keep the next char
+                            result.append(next_char)
+                            i += 2
+                        else:
+                            result.append(text[i])
+                            i += 1
+                    return ''.join(result)
 
-                    def fix_json_syntax(text: str) -> str:
-                        """Fix common JSON syntax errors."""
-                        # Fix 1: Remove trailing commas (e.g., { "a": 1, } -> { "a": 1 })
-                        text = re.sub(r',\s*([}\]])', r'\1', text)
+                def fix_json_syntax(text: str) -> str:
+                    """Fix common JSON syntax errors."""
+                    # Fix 1: Remove trailing commas (e.g., { "a": 1, } -> { "a": 1 })
+                    text = re.sub(r',\s*([}\]])', r'\1', text)
 
-                        # Fix 2: Add missing commas between objects/arrays
-                        # e.g., {"a":1}{"b":2} -> {"a":1},{"b":2}
-                        text = re.sub(r'}\s*{', '},{', text)
-                        text = re.sub(r']\s*\[', '],[', text)
-                        text = re.sub(r'"\s*\s*"', '","', text)
-                        text = re.sub(r'"\s*{', '",{', text)
-                        text = re.sub(r'}\s*"', '},"', text)
+                    # Fix 2: Add missing commas between objects/arrays
+                    # e.g., {"a":1}{"b":2} -> {"a":1},{"b":2}
+                    text = re.sub(r'}\s*{', '},{', text)
+                    text = re.sub(r']\s*\[', '],[', text)
+                    text = re.sub(r'"\s*\s*"', '","', text)
+                    text = re.sub(r'"\s*{', '",{', text)
+                    text = re.sub(r'}\s*"', '},"', text)
 
-                        # Fix 3: Fix unquoted strings (if they appear as keys/values)
-                        # This is risky, so be conservative
+                    # Fix 3: Fix unquoted strings (if they appear as keys/values)
+                    # This is risky, so be conservative
 
-                        return text
+                    return text
 
-                    # Step 1: Clean invalid escapes
-                    json_str = clean_invalid_escapes(json_str)
+                # Step 1: Clean invalid escapes
+                json_str = clean_invalid_escapes(json_str)
+
+                # Step 2: Fix JSON syntax errors
+                json_str = fix_json_syntax(json_str)
 
-                    # Step 2: Fix JSON syntax errors
-                    json_str = fix_json_syntax(json_str)
+                # Step 3: Remove control characters (except those in valid escape sequences)
+                # This removes \x00-\x1f except space (\x20), \n (\x0a), \r (\x0d), \t (\x09)
+                cleaned_json = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', json_str)
 
-                    # Step 3: Remove control characters (except those in valid escape sequences)
-                    # This removes \x00-\x1f except space (\x20), \n (\x0a), \r (\x0d), \t (\x09)
-                    cleaned_json = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', json_str)
+                try:
+                    data = json.loads(cleaned_json)
+                except json.JSONDecodeError as json_err:
+                    print(f"❌ JSON parsing failed: {json_err}")
+                    print(f"📝 JSON preview (first 300 chars): {cleaned_json[:300]}")
 
+                    # Try with strict=False as last resort
                     try:
-                        data = json.loads(cleaned_json)
-                    except json.JSONDecodeError as json_err:
-                        print(f"❌ JSON parsing failed: {json_err}")
-                        print(f"📝 JSON preview (first 300 chars): {cleaned_json[:300]}")
+                        data = json.loads(cleaned_json, strict=False)
+                        print(f"✅ Parsed with strict=False")
+                    except Exception as final_err:
+                        record_parse("content_expert", FAILED)
+                        raise ValueError(f"Failed to parse JSON: {final_err}")
+
+                # Manually construct ContentCollection
+                contents = []
+                for item in data.get("contents", []):
+                    # Fix common issues
+                    if "category" in item and isinstance(item["category"], str):
+                        # Validate enum
+                        try:
+                            item["category"] = ContentCategory(item["category"])
+                        except ValueError:
+                            item["category"] = ContentCategory.ABSTRACT_CONCEPT
 
-                        # Try with strict=False as last resort
+                    if "difficulty" in item and isinstance(item["difficulty"], str):
+                        # Validate enum
                         try:
-                            data = json.loads(cleaned_json, strict=False)
-                            print(f"✅ Parsed with strict=False")
-                        except Exception as final_err:
-                            raise ValueError(f"Failed to parse JSON: {final_err}")
-
-                    # Manually construct ContentCollection
-                    contents = []
-                    for item in data.get("contents", []):
-                        # Fix common issues
-                        if "category" in item and isinstance(item["category"], str):
-                            # Validate enum
-                            try:
-                                item["category"] = ContentCategory(item["category"])
-                            except ValueError:
-                                item["category"] = ContentCategory.ABSTRACT_CONCEPT
-
-                        if "difficulty" in item and isinstance(item["difficulty"], str):
-                            # Validate enum
-                            try:
-                                item["difficulty"] = DifficultyLevel(item["difficulty"])
-                            except ValueError:
-                                item["difficulty"] = DifficultyLevel.INTERMEDIATE
-
-                        # Fix analogies: if it's a list, convert to string or set to None
-                        if "analogies" in item and isinstance(item["analogies"], list):
-                            if len(item["analogies"]) > 0:
-                                # Convert first analogy to string
-                                item["analogies"] = str(item["analogies"][0])
-                            else:
-                                item["analogies"] = None
-
-                        # Ensure difficulty field exists
-                        if "difficulty" not in item:
+                            item["difficulty"] = DifficultyLevel(item["difficulty"])
+                        except ValueError:
                             item["difficulty"] = DifficultyLevel.INTERMEDIATE
 
-                        # Create ContentBlock
-                        block = ContentBlock(**item)
-                        contents.append(block)
+                    # Fix analogies: if it's a list, convert to string or set to None
+                    if "analogies" in item and isinstance(item["analogies"], list):
+                        if len(item["analogies"]) > 0:
+                            # Convert first analogy to string
+                            item["analogies"] = str(item["analogies"][0])
+                        else:
+                            item["analogies"] = None
 
-                    result = ContentCollection(contents=contents)
-                    print(f"✅ Manual parsing successful: {len(result.contents)} blocks")
-                else:
-                    raise ValueError(f"Could not extract JSON from response: {content[:500]}...")
+                    # Ensure difficulty field exists
+                    if "difficulty" not in item:
+                        item["difficulty"] = DifficultyLevel.INTERMEDIATE
 
-            print(f"✅ Content Expert: Generated {len(result.contents)} content blocks")
+                    # Create ContentBlock
+                    block = ContentBlock(**item)
+                    contents.append(block)
 
-            # Validate
-            self._validate_content(result, skeleton)
+                result = ContentCollection(contents=contents)
+                record_parse("content_expert", REPAIRED)
+                print(f"✅ Manual parsing successful: {len(result.contents)} blocks")
+            else:
+                record_parse("content_expert", FAILED)
+                raise ValueError(f"Could not extract JSON from response: {content[:500]}...")
 
-            return result
+        print(f"✅ Content Expert: Generated {len(result.contents)} content blocks")
 
-        except Exception as e:
-            print(f"❌ Content Expert error: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+        # Validate
+        self._validate_content(result, skeleton)
+
+        return result
 
     def generate_content_for_node(
         self,
@@ -346,7 +433,9 @@ For each content node, generate:
         section_context: str,
         target_audience: str,
         index: int,
-        total: int
+        total: int,
+        prerequisite_context: Optional[str] = None,
+        max_tokens: Optional[int] = None
     ) -> ContentBlock:
         """
         Generate content for a single node (for progressive streaming).
@@ -358,201 +447,285 @@ For each content node, generate:
             target_audience: Who is this content for?
             index: Current node index (for progress tracking)
             total: Total number of nodes
+            prerequisite_context: Summary of already generated prerequisite nodes
+            max_tokens: Lower output limit for deadline-constrained runs
+                (also asks the model for brief content)
 
         Returns:
             ContentBlock for this node
         """
-        print(f"  📝 Generating content for node {index + 1}/{total}: {node.title}")
+        messages = self._build_node_messages(
+            node, section_title, section_context, target_audience, index, total,
+            prerequisite_context, brief=max_tokens is not None
+        )
 
-        # Build node-specific prompt
-        node_context = {
-            "node_id": node.node_id,
-            "title": node.title,
-            "category": node.category.value,
-            "section": section_title,
-            "section_context": section_context,
-            "learning_objectives": node.learning_objectives,
-            "suggested_length": node.estimated_time_minutes
-        }
-
-        user_prompt = f"""Generate educational content for a SINGLE learning node.
-
-## Node Information:
-- **Node ID**: {node_context['node_id']}
-- **Title**: {node_context['title']}
-- **Category**: {node_context['category']}
-- **Section**: {node_context['section']}
-- **Learning Objectives**: {', '.join(node_context['learning_objectives']) if node_context['learning_objectives'] else 'Learn and understand this topic'}
-- **Target Audience**: {target_audience}
+        try:
+            response = self.llm.invoke(messages, output_schema=ContentBlock, **self._limit_kwargs(max_tokens))
+            return self._parse_node_response(response, index, total)
 
-## Context:
-This is node {index + 1} of {total} in the section "{section_title}".
-{section_context}
+        except Exception as e:
+            print(f"  ❌ Error generating content for node {node.node_id}: {e}")
+            return self._fallback_node_content(node)
 
-## Instructions:
-Generate ONLY the content for this specific node. Use the format specified in the system prompt.
-**IMPORTANT: Return ONLY a JSON object for this single node, not an array.**
+    async def agenerate_content_for_node(
+        self,
+        node,
+        section_title: str,
+        section_context: str,
+        target_audience: str,
+        index: int,
+        total: int,
+        prerequisite_context: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> ContentBlock:
+        """Async variant of generate_content_for_node() (uses ainvoke)."""
+        messages = self._build_node_messages(
+            node, section_title, section_context, target_audience, index, total,
+            prerequisite_context, brief=max_tokens is not None
+        )
 
-Format:
-{{
-  "node_id": "{node_context['node_id']}",
-  "title": "{node_context['title']}",
-  "category": "{node_context['category']}",
-  "main_content": "Your markdown content here...",
-  "key_points": ["point 1", "point 2", "point 3"],
-  "examples": [
-    {{"description": "Example 1", "content": "..."}},
-    {{"description": "Example 2", "content": "..."}}
-  ],
-  "analogies": [
-    {{"analogy": "Think of it like...", "explanation": "..."}}
-  ],
-  "keywords": ["term1", "term2"],
-  "common_misconceptions": [
-    {{"misconception": "...", "clarification": "..."}}
-  ],
-  "quiz_questions": [
-    {{"question": "...", "options": ["A", "B", "C", "D"], "correct_answer": 0, "explanation": "..."}}
-  ]
-}}
-"""
+        try:
+            response = await self.llm.ainvoke(messages, output_schema=ContentBlock, **self._limit_kwargs(max_tokens))
+            return self._parse_node_response(response, index, total)
 
-        messages = [
-            SystemMessage(content=self._build_system_prompt()),
-            HumanMessage(content=user_prompt)
-        ]
+        except Exception as e:
+            print(f"  ❌ Error generating content for node {node.node_id}: {e}")
+            return self._fallback_node_content(node)
 
-        try:
-            response = self.llm.invoke(messages)
+    def _build_node_messages(
+        self,
+        node,
+        section_title: str,
+        section_context: str,
+        target_audience: str,
+        index: int,
+        total: int,
+        prerequisite_context: Optional[str] = None,
+        brief: bool = False
+    ) -> list:
+        """
+        Build the LLM messages for a single node.
 
-            # Parse response
-            import json
-            import re
+        Layout is prefix-cache friendly: the byte-stable system prompt and
+        format instructions come first, then the section context (shared by
+        every node in the section), and the per-node details last.
+        """
+        print(f"  📝 Generating content for node {index + 1}/{total}: {node.title}")
 
-            content = response.content
-            json_match = re.search(r'\{[\s\S]*\}', content)
+        objectives = ', '.join(node.learning_objectives) if node.learning_objectives else 'Learn and understand this topic'
 
-            if json_match:
-                json_str = json_match.group(0)
+        user_prompt = f"""## Section Context:
+- **Section**: {section_title}
+- **Target Audience**: {target_audience}
 
-                # Clean invalid escapes
-                def clean_invalid_escapes(text: str) -> str:
-                    result = []
-                    i = 0
-                    while i < len(text):
-                        if text[i] == '\\' and i + 1 < len(text):
-                            next_char = text[i + 1]
-                            if next_char in '"\\/bfnrt':
-                                result.append(text[i:i+2])
-                                i += 2
-                                continue
-                            elif next_char == 'u' and i + 5 < len(text):
-                                hex_digits = text[i+2:i+6]
-                                if all(c in '0123456789abcdefABCDEF' for c in hex_digits):
-                                    result.append(text[i:i+6])
-                                    i += 6
-                                    continue
-                            result.append(next_char)
-                            i += 2
-                        else:
-                            result.append(text[i])
-                            i += 1
-                    return ''.join(result)
+{section_context}
 
-                def fix_json_syntax(text: str) -> str:
-                    text = re.sub(r',\s*([}\]])', r'\1', text)
-                    text = re.sub(r'}\s*{', '},{', text)
-                    text = re.sub(r']\s*\[', '],[', text)
-                    return text
+## Node Information:
+- **Node ID**: {node.node_id}
+- **Title**: {node.title}
+- **Category**: {node.category.value}
+- **Learning Objectives**: {objectives}
+- **Position**: node {index + 1} of {total}
+"""
 
-                json_str = clean_invalid_escapes(json_str)
-                json_str = fix_json_syntax(json_str)
-                cleaned_json = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', json_str)
+        if prerequisite_context:
+            user_prompt += f"""
+## Prerequisite Content (already covered - build on it, do not repeat it):
+{prerequisite_context}
+"""
 
-                data = json.loads(cleaned_json)
+        if brief:
+            user_prompt += self.BRIEF_INSTRUCTIONS
 
-                # Fix enums
-                if "category" in data and isinstance(data["category"], str):
-                    try:
-                        data["category"] = ContentCategory(data["category"])
-                    except ValueError:
-                        data["category"] = ContentCategory.ABSTRACT_CONCEPT
+        return [
+            SystemMessage(content=self._node_system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
 
-                if "difficulty" in data and isinstance(data["difficulty"], str):
-                    try:
-                        data["difficulty"] = DifficultyLevel(data["difficulty"])
-                    except ValueError:
-                        data["difficulty"] = DifficultyLevel.INTERMEDIATE
-
-                # Fix analogies: if it's a list, convert to string or set to None
-                if "analogies" in data and isinstance(data["analogies"], list):
-                    if len(data["analogies"]) > 0:
-                        # Convert first analogy to string
-                        data["analogies"] = str(data["analogies"][0])
+    def _parse_node_response(self, response, index: int, total: int) -> ContentBlock:
+        """Parse a single-node JSON response into a ContentBlock (repairing it if needed)."""
+        try:
+            result = ContentBlock.model_validate_json(response.content)
+        except ValueError:
+            try:
+                result = self._repair_node_response(response)
+            except Exception:
+                record_parse("content_expert", FAILED)
+                raise
+            record_parse("content_expert", REPAIRED)
+        else:
+            record_parse("content_expert", PARSED)
+
+        print(f"  ✅ Generated content for node {index + 1}/{total}")
+        return result
+
+    def _repair_node_response(self, response) -> ContentBlock:
+        """Regex / JSON-repair fallback for node responses that are not clean JSON."""
+        # Parse response
+        import json
+        import re
+
+        content = response.content
+        json_match = re.search(r'\{[\s\S]*\}', content)
+
+        if json_match:
+            json_str = json_match.group(0)
+
+            # Clean invalid escapes
+            def clean_invalid_escapes(text: str) -> str:
+                result = []
+                i = 0
+                while i < len(text):
+                    if text[i] == '\\' and i + 1 < len(text):
+                        next_char = text[i + 1]
+                        if next_char in '"\\/bfnrt':
+                            result.append(text[i:i+2])
+                            i += 2
+                            continue
+                        elif next_char == 'u' and i + 5 < len(text):
+                            hex_digits = text[i+2:i+6]
+                            if all(c in '0123456789abcdefABCDEF' for c in hex_digits):
+                                result.append(text[i:i+6])
+                                i += 6
+                                continue
+                        result.append(next_char)
+                        i += 2
                     else:
-                        data["analogies"] = None
-
-                # Ensure difficulty field exists
-                if "difficulty" not in data:
+                        result.append(text[i])
+                        i += 1
+                return ''.join(result)
+
+            def fix_json_syntax(text: str) -> str:
+                text = re.sub(r',\s*([}\]])', r'\1', text)
+                text = re.sub(r'}\s*{', '},{', text)
+                text = re.sub(r']\s*\[', '],[', text)
+                return text
+
+            json_str = clean_invalid_escapes(json_str)
+            json_str = fix_json_syntax(json_str)
+            cleaned_json = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', json_str)
+
+            data = json.loads(cleaned_json)
+
+            # Fix enums
+            if "category" in data and isinstance(data["category"], str):
+                try:
+                    data["category"] = ContentCategory(data["category"])
+                except ValueError:
+                    data["category"] = ContentCategory.ABSTRACT_CONCEPT
+
+            if "difficulty" in data and isinstance(data["difficulty"], str):
+                try:
+                    data["difficulty"] = DifficultyLevel(data["difficulty"])
+                except ValueError:
                     data["difficulty"] = DifficultyLevel.INTERMEDIATE
 
-                # Fix examples: if list of dicts, extract the first value from each dict
-                if "examples" in data and isinstance(data["examples"], list):
-                    if len(data["examples"]) > 0 and isinstance(data["examples"][0], dict):
-                        # Extract values from dicts - try common keys
-                        data["examples"] = [
-                            (d.get("description") or d.get("example") or d.get("text") or list(d.values())[0] if d else "")
-                            for d in data["examples"]
-                        ]
-
-                # Fix common_misconceptions: if list of dicts, extract the misconception value
-                if "common_misconceptions" in data and isinstance(data["common_misconceptions"], list):
-                    if len(data["common_misconceptions"]) > 0 and isinstance(data["common_misconceptions"][0], dict):
-                        data["common_misconceptions"] = [
-                            (d.get("misconception") or d.get("text") or list(d.values())[0] if d else "")
-                            for d in data["common_misconceptions"]
-                        ]
-
-                # Fix quiz_questions: if list of dicts, extract the question value
-                if "quiz_questions" in data and isinstance(data["quiz_questions"], list):
-                    if len(data["quiz_questions"]) > 0 and isinstance(data["quiz_questions"][0], dict):
-                        data["quiz_questions"] = [
-                            (d.get("question") or d.get("text") or list(d.values())[0] if d else "")
-                            for d in data["quiz_questions"]
-                        ]
-
-                # Fix quiz_answers: if list of dicts, extract the answer value
-                if "quiz_answers" in data and isinstance(data["quiz_answers"], list):
-                    if len(data["quiz_answers"]) > 0 and isinstance(data["quiz_answers"][0], dict):
-                        data["quiz_answers"] = [
-                            (d.get("answer") or d.get("text") or list(d.values())[0] if d else "")
-                            for d in data["quiz_answers"]
-                        ]
-
-                result = ContentBlock(**data)
-                print(f"  ✅ Generated content for node {index + 1}/{total}")
-                return result
-
-            else:
-                raise ValueError(f"Could not extract JSON from response")
+            # Fix analogies: if it's a list, convert to string or set to None
+            if "analogies" in data and isinstance(data["analogies"], list):
+                if len(data["analogies"]) > 0:
+                    # Convert first analogy to string
+                    data["analogies"] = str(data["analogies"][0])
+                else:
+                    data["analogies"] = None
+
+            # Ensure difficulty field exists
+            if "difficulty" not in data:
+                data["difficulty"] = DifficultyLevel.INTERMEDIATE
+
+            # Fix examples: if list of dicts, extract the first value from each dict
+            if "examples" in data and isinstance(data["examples"], list):
+                if len(data["examples"]) > 0 and isinstance(data["examples"][0], dict):
+                    # Extract values from dicts - try common keys
+                    data["examples"] = [
+                        (d.get("description") or d.get("example") or d.get("text") or list(d.values())[0] if d else "")
+                        for d in data["examples"]
+                    ]
+
+            # Fix common_misconceptions: if list of dicts, extract the misconception value
+            if "common_misconceptions" in data and isinstance(data["common_misconceptions"], list):
+                if len(data["common_misconceptions"]) > 0 and isinstance(data["common_misconceptions"][0], dict):
+                    data["common_misconceptions"] = [
+                        (d.get("misconception") or d.get("text") or list(d.values())[0] if d else "")
+                        for d in data["common_misconceptions"]
+                    ]
+
+            # Fix quiz_questions: if list of dicts, extract the question value
+            if "quiz_questions" in data and isinstance(data["quiz_questions"], list):
+                if len(data["quiz_questions"]) > 0 and isinstance(data["quiz_questions"][0], dict):
+                    data["quiz_questions"] = [
+                        (d.get("question") or d.get("text") or list(d.values())[0] if d else "")
+                        for d in data["quiz_questions"]
+                    ]
+
+            # Fix quiz_answers: if list of dicts, extract the answer value
+            if "quiz_answers" in data and isinstance(data["quiz_answers"], list):
+                if len(data["quiz_answers"]) > 0 and isinstance(data["quiz_answers"][0], dict):
+                    data["quiz_answers"] = [
+                        (d.get("answer") or d.get("text") or list(d.values())[0] if d else "")
+                        for d in data["quiz_answers"]
+                    ]
+
+            return ContentBlock(**data)
+
+        else:
+            raise ValueError(f"Could not extract JSON from response")
+
+    @staticmethod
+    def _limit_kwargs(max_tokens: Optional[int]) -> dict:
+        """Per-call max_tokens override (empty: provider default)."""
+        return {"max_tokens": max_tokens} if max_tokens else {}
+
+    def rule_based_content(self, node) -> ContentBlock:
+        """
+        Content built from the node's own metadata, without an LLM call.
 
-        except Exception as e:
-            print(f"  ❌ Error generating content for node {node.node_id}: {e}")
-            # Return minimal content as fallback
-            return ContentBlock(
-                node_id=node.node_id,
-                title=node.title,
-                category=node.category,
-                difficulty=node.difficulty,
-                main_content=f"以下是关于 {node.title} 的内容。",
-                key_points=[f"关于 {node.title} 的关键点"],
-                examples=[f"示例 1：{node.title} 的应用"],
-                analogies=None,
-                keywords=[node.title],
-                common_misconceptions=[],
-                quiz_questions=[],
-                quiz_answers=[]
-            )
+        Used when a deadline leaves no time for generation: the knowledge
+        point's description, objectives, scenarios and misconceptions are
+        laid out as-is.
+        """
+        lines = [f"## {node.title}", ""]
+        if node.original_description:
+            lines += [node.original_description, ""]
+        if node.learning_objectives:
+            lines += ["**学习目标**", ""] + [f"- {objective}" for objective in node.learning_objectives] + [""]
+        if node.mastery_criteria:
+            lines += [f"**掌握标准**：{node.mastery_criteria}"]
+
+        return ContentBlock(
+            node_id=node.node_id,
+            title=node.title,
+            category=node.category,
+            difficulty=node.difficulty,
+            main_content="\n".join(lines).strip(),
+            key_points=list(node.learning_objectives) or [node.title],
+            examples=list(node.application_scenarios),
+            analogies=None,
+            keywords=list(node.keywords) or [node.title],
+            common_misconceptions=list(node.common_misconceptions),
+            quiz_questions=[],
+            quiz_answers=[]
+        )
+
+    def is_fallback_content(self, node, content: ContentBlock) -> bool:
+        """True if `content` is the placeholder produced when generation failed."""
+        return content == self._fallback_node_content(node)
+
+    def _fallback_node_content(self, node) -> ContentBlock:
+        """Minimal content used when generation for a node fails."""
+        return ContentBlock(
+            node_id=node.node_id,
+            title=node.title,
+            category=node.category,
+            difficulty=node.difficulty,
+            main_content=f"以下是关于 {node.title} 的内容。",
+            key_points=[f"关于 {node.title} 的关键点"],
+            examples=[f"示例 1：{node.title} 的应用"],
+            analogies=None,
+            keywords=[node.title],
+            common_misconceptions=[],
+            quiz_questions=[],
+            quiz_answers=[]
+        )
 
     def _count_nodes(self, skeleton: PageSkeleton) -> int:
         """Count total nodes in skeleton."""
@@ -624,19 +797,7 @@ For EACH node, generate:
 - For comparisons: use Markdown tables
 - Make it engaging! Use a conversational but professional tone
 
-## CRITICAL: Output Format
-
-You must output ONLY valid JSON. No additional text, no explanations, no markdown code blocks.
-
-The JSON must follow this exact structure:
-- "contents": array of content blocks
-- Each block must have: node_id, title, category, main_content, key_points, examples, analogies, difficulty, keywords, common_misconceptions, quiz_questions, quiz_answers
-- category must be one of: abstract_concept, concrete_example, process_flow, code_example, comparison_analysis, historical_event, practice_exercise, definition
-- difficulty must be one of: beginner, intermediate, advanced
-
-{self.parser.get_format_instructions()}
-
-REMEMBER: Output ONLY the JSON object, nothing else!
+Output the JSON object described in the Output Format section.
 """
 
     def _validate_content(self, content: ContentCollection, skeleton: PageSkeleton) -> None:
@@ -34,7 +34,7 @@ class EnhancedContentExpertAgent:
     """
 
     def __init__(self, model_name: str = "gpt-4o"):
-        # Use unified LLM client
+        # Shared LLM client (one per config, pooled connections)
         self.llm = create_llm_from_env()
         self.parser = PydanticOutputParser(pydantic_object=ContentCollection)
 
@@ -30,6 +30,7 @@ from models.schemas import (
 )
 from models.adapters import knowledge_path_to_skeleton
 from llm.client import create_llm_from_env
+from llm.structured import record_parse, PARSED, REPAIRED, FAILED
 
 
 class PlannerAgent:
@@ -47,12 +48,17 @@ class PlannerAgent:
         Args:
             model_name: Model name (deprecated, uses env config)
         """
-        # Use unified LLM client
+        # Shared LLM client (one per config, pooled connections)
         self.llm = create_llm_from_env()
         self.parser = PydanticOutputParser(pydantic_object=PageSkeleton)
 
     def _build_system_prompt(self) -> str:
-        """Build the system prompt for the planner."""
+        """
+        Build the system prompt for the planner.
+
+        Includes the (static) output schema so the whole system message is a
+        byte-stable prefix; per-request details go in the user prompt.
+        """
         return """You are an expert **Course Designer** and **Learning Architect**.
 
 Your role is to design the structure of educational content pages. You are NOT writing content yet - you are creating a **skeleton/outline**.
@@ -119,7 +125,8 @@ Keep nodes FOCUSED. Each node should represent ONE learnable unit.
 - Any text content
 
 This applies regardless of whether the topic name is in English or Chinese.
-"""
+
+""" + self.parser.get_format_instructions()
 
     def _build_user_prompt(self, request: GenerationRequest) -> str:
         """Build the user prompt based on the generation request."""
@@ -150,9 +157,7 @@ This applies regardless of whether the topic name is in English or Chinese.
 5. Assign realistic time estimates (5-20 minutes per node)
 6. Write 1-3 clear learning objectives for each node
 
-Generate the complete page skeleton as JSON.
-
-{self.parser.get_format_instructions()}
+Generate the complete page skeleton as JSON, following the output schema in the system prompt.
 """
 
     def plan(self, request: GenerationRequest) -> PageSkeleton:
@@ -169,131 +174,149 @@ Generate the complete page skeleton as JSON.
         Returns:
             PageSkeleton with sections, nodes, and relationships
         """
-        mode = request.get_mode()
-
-        if mode == "knowledge_path":
-            # Mode 1: Direct conversion from knowledge path (NO LLM needed)
-            print(f"🏗️  Planner Agent: Converting knowledge path to skeleton...")
-            print(f"   Mode: Knowledge Path")
-            print(f"   Domain: {request.knowledge_path.domain}")
-            print(f"   Knowledge Points: {len(request.knowledge_path.knowledge_points)}")
-
-            skeleton = knowledge_path_to_skeleton(request.knowledge_path)
-
-            # Apply custom title if provided
-            if request.custom_title:
-                skeleton.title = request.custom_title
-
-            # Apply custom page_id if provided
-            if request.page_id:
-                skeleton.page_id = request.page_id
-
-            print(f"✅ Planner Agent: Converted to {len(skeleton.sections)} sections with "
-                  f"{sum(len(s.nodes) for s in skeleton.sections)} total nodes")
-
-            return skeleton
-
-        else:
-            # Mode 2: LLM-based generation from topic
-            print(f"🏗️  Planner Agent: Generating structure for '{request.topic}'...")
-            print(f"   Mode: Topic (LLM-based)")
-
-            # Build messages
-            messages = [
-                SystemMessage(content=self._build_system_prompt()),
-                HumanMessage(content=self._build_user_prompt(request))
-            ]
-
-            # Invoke LLM
-            try:
-                response = self.llm.invoke(messages)
-                result = self.parser.parse(response.content)
-
-                print(f"✅ Planner Agent: Generated {len(result.sections)} sections with "
-                      f"{sum(len(s.nodes) for s in result.sections)} total nodes")
-
-                # Validate
-                self._validate_skeleton(result)
-
-                return result
-
-            except Exception as e:
-                print(f"⚠️  Pydantic parser failed: {e}")
-                print(f"📝 Attempting manual JSON parsing...")
-
-                # Try manual parsing as fallback
-                import json
-                import re
-
-                # Try to extract JSON from response
-                content = response.content
-                json_match = re.search(r'\{[\s\S]*\}', content)
-
-                if json_match:
-                    json_str = json_match.group(0)
-
-                    try:
-                        data = json.loads(json_str)
-
-                        # Valid category enum values
-                        valid_categories = {
-                            'abstract_concept', 'concrete_example', 'process_flow',
-                            'code_example', 'definition', 'comparison_analysis',
-                            'historical_event', 'practice_exercise'
-                        }
-
-                        # Category mapping for common invalid values
-                        category_mapping = {
-                            'summary': 'abstract_concept',
-                            'introduction': 'abstract_concept',
-                            'overview': 'abstract_concept',
-                            'conclusion': 'abstract_concept',
-                            'example': 'concrete_example',
-                            'history': 'historical_event',
-                            'comparison': 'comparison_analysis',
-                            'practice': 'practice_exercise',
-                            'exercise': 'practice_exercise',
-                            'code': 'code_example',
-                            'flow': 'process_flow',
-                        }
-
-                        # Fix missing/invalid fields
-                        for section in data.get("sections", []):
-                            for node in section.get("nodes", []):
-                                # Fix 1: Missing knowledge_id
-                                if "knowledge_id" not in node or not node["knowledge_id"]:
-                                    node_id = node.get("node_id", "")
-                                    if node_id.startswith("node-"):
-                                        knowledge_id = "k-" + node_id[5:]
-                                    else:
-                                        knowledge_id = "k-" + node_id
-                                    node["knowledge_id"] = knowledge_id
-                                    print(f"   🔧 Added missing knowledge_id: {knowledge_id} for node {node_id}")
-
-                                # Fix 2: Invalid category
-                                category = node.get("category", "")
-                                if category and category not in valid_categories:
-                                    # Map to valid category
-                                    new_category = category_mapping.get(category.lower(), 'abstract_concept')
-                                    node["category"] = new_category
-                                    print(f"   🔧 Fixed invalid category '{category}' -> '{new_category}' for node {node.get('node_id')}")
-
-                        # Re-parse with Pydantic
-                        result = PageSkeleton(**data)
-
-                        print(f"✅ Planner Agent: Generated {len(result.sections)} sections with "
-                              f"{sum(len(s.nodes) for s in result.sections)} total nodes (recovered)")
-
-                        # Validate
-                        self._validate_skeleton(result)
-
-                        return result
-
-                    except Exception as fallback_err:
-                        print(f"❌ Fallback parsing also failed: {fallback_err}")
-                        raise ValueError(f"Failed to parse skeleton: {fallback_err}")
-
-                raise
+        if request.get_mode() == "knowledge_path":
+            return self._plan_from_knowledge_path(request)
+
+        # Mode 2: LLM-based generation from topic
+        messages = self._build_topic_messages(request)
+        response = self.llm.invoke(messages, output_schema=PageSkeleton)
+        return self._parse_skeleton_response(response)
+
+    async def aplan(self, request: GenerationRequest) -> PageSkeleton:
+        """Async variant of plan() (uses ainvoke, never blocks the event loop)."""
+        if request.get_mode() == "knowledge_path":
+            return self._plan_from_knowledge_path(request)
+
+        messages = self._build_topic_messages(request)
+        response = await self.llm.ainvoke(messages, output_schema=PageSkeleton)
+        return self._parse_skeleton_response(response)
+
+    def _plan_from_knowledge_path(self, request: GenerationRequest) -> PageSkeleton:
+        """Mode 1: Direct conversion from knowledge path (NO LLM needed)."""
+        print(f"🏗️  Planner Agent: Converting knowledge path to skeleton...")
+        print(f"   Mode: Knowledge Path")
+        print(f"   Domain: {request.knowledge_path.domain}")
+        print(f"   Knowledge Points: {len(request.knowledge_path.knowledge_points)}")
+
+        skeleton = knowledge_path_to_skeleton(request.knowledge_path)
+
+        # Apply custom title if provided
+        if request.custom_title:
+            skeleton.title = request.custom_title
+
+        # Apply custom page_id if provided
+        if request.page_id:
+            skeleton.page_id = request.page_id
+
+        print(f"✅ Planner Agent: Converted to {len(skeleton.sections)} sections with "
+              f"{sum(len(s.nodes) for s in skeleton.sections)} total nodes")
+
+        return skeleton
+
+    def _build_topic_messages(self, request: GenerationRequest) -> list:
+        """Build the LLM messages for topic mode."""
+        print(f"🏗️  Planner Agent: Generating structure for '{request.topic}'...")
+        print(f"   Mode: Topic (LLM-based)")
+
+        return [
+            SystemMessage(content=self._build_system_prompt()),
+            HumanMessage(content=self._build_user_prompt(request))
+        ]
+
+    def _parse_skeleton_response(self, response) -> PageSkeleton:
+        """Parse the LLM response into a validated PageSkeleton (with manual JSON recovery)."""
+        try:
+            result = self.parser.parse(response.content)
+
+            print(f"✅ Planner Agent: Generated {len(result.sections)} sections with "
+                  f"{sum(len(s.nodes) for s in result.sections)} total nodes")
+
+            # Validate
+            self._validate_skeleton(result)
+            record_parse("planner", PARSED)
+
+            return result
+
+        except Exception as e:
+            print(f"⚠️  Pydantic parser failed: {e}")
+            print(f"📝 Attempting manual JSON parsing...")
+
+            # Try manual parsing as fallback
+            import json
+            import re
+
+            # Try to extract JSON from response
+            content = response.content
+            json_match = re.search(r'\{[\s\S]*\}', content)
+
+            if json_match:
+                json_str = json_match.group(0)
+
+                try:
+                    data = json.loads(json_str)
+
+                    # Valid category enum values
+                    valid_categories = {
+                        'abstract_concept', 'concrete_example', 'process_flow',
+                        'code_example', 'definition', 'comparison_analysis',
+                        'historical_event', 'practice_exercise'
+                    }
+
+                    # Category mapping for common invalid values
+                    category_mapping = {
+                        'summary': 'abstract_concept',
+                        'introduction': 'abstract_concept',
+                        'overview': 'abstract_concept',
+                        'conclusion': 'abstract_concept',
+                        'example': 'concrete_example',
+                        'history': 'historical_event',
+                        'comparison': 'comparison_analysis',
+                        'practice': 'practice_exercise',
+                        'exercise': 'practice_exercise',
+                        'code': 'code_example',
+                        'flow': 'process_flow',
+                    }
+
+                    # Fix missing/invalid fields
+                    for section in data.get("sections", []):
+                        for node in section.get("nodes", []):
+                            # Fix 1: Missing knowledge_id
+                            if "knowledge_id" not in node or not node["knowledge_id"]:
+                                node_id = node.get("node_id", "")
+                                if node_id.startswith("node-"):
+                                    knowledge_id = "k-" + node_id[5:]
+                                else:
+                                    knowledge_id = "k-" + node_id
+                                node["knowledge_id"] = knowledge_id
+                                print(f"   🔧 Added missing knowledge_id: {knowledge_id} for node {node_id}")
+
+                            # Fix 2: Invalid category
+                            category = node.get("category", "")
+                            if category and category not in valid_categories:
+                                # Map to valid category
+                                new_category = category_mapping.get(category.lower(), 'abstract_concept')
+                                node["category"] = new_category
+                                print(f"   🔧 Fixed invalid category '{category}' -> '{new_category}' for node {node.get('node_id')}")
+
+                    # Re-parse with Pydantic
+                    result = PageSkeleton(**data)
+
+                    print(f"✅ Planner Agent: Generated {len(result.sections)} sections with "
+                          f"{sum(len(s.nodes) for s in result.sections)} total nodes (recovered)")
+
+                    # Validate
+                    self._validate_skeleton(result)
+                    record_parse("planner", REPAIRED)
+
+                    return result
+
+                except Exception as fallback_err:
+                    record_parse("planner", FAILED)
+                    print(f"❌ Fallback parsing also failed: {fallback_err}")
+                    raise ValueError(f"Failed to parse skeleton: {fallback_err}")
+
+            record_parse("planner", FAILED)
+            raise
 
     def _validate_skeleton(self, skeleton: PageSkeleton) -> None:
         """Validate the generated skeleton."""
@@ -25,6 +25,7 @@ from models.schemas import (
     PedagogicalIntent
 )
 from llm.client import create_llm_from_env
+from llm.structured import record_parse, PARSED, FAILED
 
 
 class VisualDirectorAgent:
@@ -75,7 +76,7 @@ class VisualDirectorAgent:
     }
 
     def __init__(self, model_name: str = "gpt-4o"):
-        # Use unified LLM client
+        # Shared LLM client (one per config, pooled connections)
         self.llm = create_llm_from_env()
         self.parser = PydanticOutputParser(pydantic_object=VisualMapping)
 
@@ -221,32 +222,60 @@ This applies regardless of the source content language.
         Returns:
             VisualMapping with component choices for each node
         """
+        messages = self._build_mapping_messages(skeleton)
+
+        try:
+            response = self.llm.invoke(messages, output_schema=VisualMapping)
+            return self._parse_mapping_response(response, skeleton)
+
+        except Exception as e:
+            print(f"❌ Visual Director error: {e}")
+            raise
+
+    async def amap_content_to_visuals(
+        self,
+        skeleton: PageSkeleton
+    ) -> VisualMapping:
+        """Async variant of map_content_to_visuals() (uses ainvoke)."""
+        messages = self._build_mapping_messages(skeleton)
+
+        try:
+            response = await self.llm.ainvoke(messages, output_schema=VisualMapping)
+            return self._parse_mapping_response(response, skeleton)
+
+        except Exception as e:
+            print(f"❌ Visual Director error: {e}")
+            raise
+
+    def _build_mapping_messages(self, skeleton: PageSkeleton) -> list:
+        """Build the LLM messages for whole-skeleton visual mapping."""
         print(f"🎨 Visual Director: Mapping {self._count_nodes(skeleton)} nodes to components...")
 
         # Build user prompt
         user_prompt = self._build_user_prompt(skeleton)
 
         # Build messages
-        messages = [
+        return [
             SystemMessage(content=self._build_system_prompt()),
             HumanMessage(content=user_prompt)
         ]
 
+    def _parse_mapping_response(self, response, skeleton: PageSkeleton) -> VisualMapping:
+        """Parse and validate a VisualMapping response."""
         try:
-            response = self.llm.invoke(messages)
             result = self.parser.parse(response.content)
+        except Exception:
+            record_parse("visual_director", FAILED)
+            raise
+        record_parse("visual_director", PARSED)
 
-            print(f"✅ Visual Director: Mapped {len(result.mappings)} nodes to components")
-
-            # Validate and print summary
-            self._validate_mapping(result, skeleton)
-            self._print_component_summary(result)
+        print(f"✅ Visual Director: Mapped {len(result.mappings)} nodes to components")
 
-            return result
+        # Validate and print summary
+        self._validate_mapping(result, skeleton)
+        self._print_component_summary(result)
 
-        except Exception as e:
-            print(f"❌ Visual Director error: {e}")
-            raise
+        return result
 
     def map_single_node(
         self,
@@ -320,6 +349,18 @@ This applies regardless of the source content language.
         print(f"  ✅ Mapped to {block_type.value} (role: {role})")
         return result
 
+    async def amap_single_node(
+        self,
+        node,
+        section_title: str
+    ) -> VisualComponent:
+        """
+        Async variant of map_single_node().
+
+        The mapping is rule-based (no LLM call), so this simply runs inline.
+        """
+        return self.map_single_node(node=node, section_title=section_title)
+
     def _count_nodes(self, skeleton: PageSkeleton) -> int:
         """Count total nodes in skeleton."""
         return sum(len(section.nodes) for section in skeleton.sections)
@@ -0,0 +1,180 @@
+"""
+Single-Flight Request Coalescing
+
+Identical generation requests that arrive while one is still running attach
+to that run instead of starting another pipeline (e.g. a class opening the
+same course page at once):
+- request_fingerprint(): content address of the normalized request
+- SingleFlight: fingerprint -> the in-flight run
+- StreamBroadcast: buffered fan-out of one streaming run's SSE events; a
+  subscriber that joins late (or reconnects with Last-Event-ID) first
+  replays what it missed
+
+Everything runs on the API's event loop, so no locking is needed.
+"""
+
+import re
+import json
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from models.schemas import GenerationRequest
+
+
+T = TypeVar("T")
+
+# Bump when the normalization changes
+FINGERPRINT_VERSION = 1
+
+
+def _normalize(value: Any) -> Any:
+    """Trim and collapse whitespace in every string; drop unset (None) fields."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def request_fingerprint(request: GenerationRequest, **scope: Any) -> str:
+    """
+    Content-address a generation request.
+
+    Args:
+        request: The pipeline request
+        **scope: Anything else that changes the run (endpoint, thread_id, resume)
+
+    Returns:
+        Hex digest (equal for requests that would generate the same page)
+    """
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "request": _normalize(request.model_dump(mode="json")),
+        "scope": _normalize(scope)
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SingleFlight(Generic[T]):
+    """In-flight runs by fingerprint."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: False: join() never finds a run (every request runs on its own)
+        """
+        self.enabled = enabled
+        self._inflight: Dict[str, T] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def join(self, fingerprint: str) -> Optional[T]:
+        """The run already serving this fingerprint, if any."""
+        if not self.enabled:
+            return None
+        run = self._inflight.get(fingerprint)
+        if run is not None:
+            self.coalesced += 1
+        return run
+
+    def start(self, fingerprint: str, run: T) -> None:
+        self.started += 1
+        if self.enabled:
+            self._inflight[fingerprint] = run
+
+    def finish(self, fingerprint: str, run: T) -> None:
+        """Forget the run (later requests start a new one)."""
+        if self._inflight.get(fingerprint) is run:
+            del self._inflight[fingerprint]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._inflight),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
+
+
+def format_sse(event_id: int, event_type: str, data: str) -> str:
+    """One SSE event with an id (what Last-Event-ID refers to)."""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+class StreamBroadcast:
+    """Every SSE event of one streaming run, for any number of subscribers."""
+
+    def __init__(self, task_id: str):
+        """
+        Args:
+            task_id: Task of the run (shared by all subscribers)
+        """
+        self.task_id = task_id
+        self._events: List[str] = []
+        self._changed = asyncio.Event()
+        self.closed = False
+        self.subscribers = 0
+
+    def publish(self, event_type: str, data: str) -> Tuple[int, str]:
+        """
+        Format and send one SSE event.
+
+        Args:
+            event_type: SSE event name
+            data: JSON payload
+
+        Returns:
+            (event_id, SSE event) - ids count up from 1
+        """
+        event_id = len(self._events) + 1
+        event = format_sse(event_id, event_type, data)
+        self._events.append(event)
+        self._notify()
+        return event_id, event
+
+    def close(self) -> None:
+        """No more events (subscribers finish once they have read everything)."""
+        self.closed = True
+        self._notify()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def join(self) -> None:
+        self.subscribers += 1
+
+    def leave(self) -> int:
+        """Returns the subscribers left."""
+        self.subscribers -= 1
+        return self.subscribers
+
+    async def events(self, after: int = 0, keepalive: float = 1.0) -> AsyncIterator[Optional[str]]:
+        """
+        Every event with an id above `after`, live events as they are published.
+
+        Args:
+            after: Last event id the subscriber already has (0: from the start)
+            keepalive: Yield None after this many seconds without an event
+
+        Yields:
+            SSE event strings, or None when idle; ends after close()
+        """
+        index = after
+        while True:
+            if index < len(self._events):
+                index += 1
+                yield self._events[index - 1]
+                continue
+            if self.closed:
+                return
+
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield None
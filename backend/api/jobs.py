@@ -0,0 +1,174 @@
+"""
+Generation Job Scheduling
+
+Bounds how many pipelines the API runs at once (/generate and
+/generate/stream share the limit). Every run first takes an Admission:
+- a slot is free: it starts right away
+- all max_concurrent slots are busy: it waits in a bounded priority queue
+  (higher priority first, FIFO within a priority)
+- the queue is full: admit() raises QueueFullError with a Retry-After
+  estimate, which the API turns into a 429
+
+Everything runs on the API's event loop, so no locking is needed.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class QueueFullError(Exception):
+    """No slot free and the wait queue is full."""
+
+    def __init__(self, queued: int, retry_after: float):
+        self.queued = queued
+        self.retry_after = retry_after
+        super().__init__(f"Generation queue is full ({queued} waiting); retry in ~{retry_after:.0f}s")
+
+
+class Admission:
+    """A run's claim on a generation slot (wait() for it, release() when done)."""
+
+    def __init__(self, scheduler: "GenerationScheduler", future: asyncio.Future):
+        self._scheduler = scheduler
+        self._future = future
+        self._started: Optional[float] = None
+        self._released = False
+
+    @property
+    def granted(self) -> bool:
+        return self._future.done() and not self._future.cancelled()
+
+    async def wait(self) -> None:
+        """Wait until the run may start (returns at once if a slot was free)."""
+        try:
+            await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            # Caller gave up while queued (e.g. client disconnected)
+            self.release()
+            raise
+        self._started = time.monotonic()
+
+    def release(self) -> None:
+        """Free the slot, or leave the queue if it was never granted (idempotent)."""
+        if self._released:
+            return
+        self._released = True
+
+        if self.granted:
+            duration = time.monotonic() - self._started if self._started is not None else None
+            self._scheduler._release(duration)
+        else:
+            self._future.cancel()
+
+    async def __aenter__(self) -> "Admission":
+        await self.wait()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+class GenerationScheduler:
+    """At most max_concurrent pipelines at once, up to max_queue more waiting."""
+
+    # Assumed run time until real runs have been observed
+    DEFAULT_JOB_SECONDS = 60.0
+    # Weight of the newest run in the moving average
+    SMOOTHING = 0.2
+
+    def __init__(self, max_concurrent: int = 5, max_queue: int = 20):
+        """
+        Args:
+            max_concurrent: Pipelines running at once
+            max_queue: Runs allowed to wait for a slot
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+
+        self._running = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []  # (-priority, seq, future)
+        self._seq = itertools.count()
+        self._average_seconds = self.DEFAULT_JOB_SECONDS
+
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+
+    # ============ Admission ============
+
+    def admit(self, priority: int = 0) -> Admission:
+        """
+        Claim a slot, or a place in the queue.
+
+        Args:
+            priority: Higher runs first among queued runs
+
+        Returns:
+            Admission to wait() on before running
+
+        Raises:
+            QueueFullError: All slots busy and the queue is full
+        """
+        self._prune()
+        future = asyncio.get_running_loop().create_future()
+
+        if self._running < self.max_concurrent and not self._queue:
+            self._running += 1
+            future.set_result(None)
+        elif len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(len(self._queue), self.retry_after())
+        else:
+            heapq.heappush(self._queue, (-priority, next(self._seq), future))
+
+        self.admitted += 1
+        return Admission(self, future)
+
+    def is_full(self) -> bool:
+        """Whether admit() would raise QueueFullError right now."""
+        self._prune()
+        return self._running >= self.max_concurrent and len(self._queue) >= self.max_queue
+
+    def retry_after(self) -> float:
+        """Rough seconds until a queue place frees up, i.e. until some running job finishes (Retry-After)."""
+        return max(1.0, self._average_seconds / self.max_concurrent)
+
+    def _release(self, duration: Optional[float]) -> None:
+        if duration is not None:
+            self._average_seconds += self.SMOOTHING * (duration - self._average_seconds)
+            self.completed += 1
+        self._running -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to the most urgent queued runs."""
+        while self._running < self.max_concurrent and self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if future.cancelled():
+                continue
+            self._running += 1
+            future.set_result(None)
+
+    def _prune(self) -> None:
+        """Drop queued runs whose caller gave up."""
+        if any(future.cancelled() for _, _, future in self._queue):
+            self._queue = [entry for entry in self._queue if not entry[2].cancelled()]
+            heapq.heapify(self._queue)
+
+    # ============ Stats ============
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune()
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": len(self._queue),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "average_seconds": round(self._average_seconds, 1)
+        }
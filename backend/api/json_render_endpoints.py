@@ -8,7 +8,7 @@ LLM streaming conditions with variable delays, stuttering, and nested structure
 import asyncio
 import random
 import json
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator, Tuple
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 from pathlib import Path
@@ -27,27 +27,34 @@ class StreamingJitterSimulator:
     Tests json-render's parser resilience under adverse conditions.
     """
 
-    def __init__(self, base_delay_ms: float = 30, jitter_factor: float = 3.0):
+    def __init__(
+        self,
+        base_delay_ms: float = 30,
+        jitter_factor: float = 3.0,
+        network_hiccup_rate: float = 0.01,
+        verbose: bool = True
+    ):
         self.base_delay_ms = base_delay_ms
         self.jitter_factor = jitter_factor  # Multiplier for burst delays
+        self.network_hiccup_rate = network_hiccup_rate  # Per-character probability of +200ms
+        self.verbose = verbose  # Log simulated hiccups
 
-    async def stream_with_jitter(self, json_string: str) -> AsyncGenerator[str, None]:
+    def char_delays(self, text: str) -> Iterator[Tuple[str, float]]:
         """
-        Stream JSON character-by-character with realistic delays.
+        Delay model: yield (char, delay_seconds) for each character.
 
         Simulates:
         - Base token emission rate (base_delay_ms)
         - Burst pauses (1-5x base_delay, random)
         - Nested structure delays (pause before closing braces/brackets)
         - Occasional longer hiccups (10-20x base_delay)
+        - Rare network hiccups (+200ms)
+
+        Shared by stream_with_jitter() and the stub LLM server (stub_llm_server.py).
         """
-        i = 0
-        chars = list(json_string)
         nesting_level = 0
 
-        while i < len(chars):
-            char = chars[i]
-
+        for char in text:
             # Calculate delay for this character
             delay_ms = self.base_delay_ms
 
@@ -68,20 +75,27 @@ class StreamingJitterSimulator:
             # (e.g., test_cases inside CodePlayground)
             if nesting_level >= 3 and random.random() < 0.1:  # 10% chance
                 delay_ms *= self.jitter_factor * 5  # Major pause
-                print(f"⏸️ Simulated LLM hiccup at nesting level {nesting_level}")
+                if self.verbose:
+                    print(f"⏸️ Simulated LLM hiccup at nesting level {nesting_level}")
 
             # Occasionally simulate network hiccup
-            if random.random() < 0.01:  # 1% chance
-                await asyncio.sleep(0.2)  # 200ms network delay
-                print(f"🌐 Simulated network hiccup")
+            if random.random() < self.network_hiccup_rate:  # 1% chance by default
+                delay_ms += 200  # 200ms network delay
+                if self.verbose:
+                    print(f"🌐 Simulated network hiccup")
+
+            yield char, delay_ms / 1000
 
+    async def stream_with_jitter(self, json_string: str) -> AsyncGenerator[str, None]:
+        """
+        Stream JSON character-by-character with realistic delays (see char_delays()).
+        """
+        for char, delay in self.char_delays(json_string):
             # Yield character
             yield char
 
             # Apply delay
-            await asyncio.sleep(delay_ms / 1000)
-
-            i += 1
+            await asyncio.sleep(delay)
 
 
 # ============ Test Schemas for json-render ============
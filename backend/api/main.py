@@ -9,18 +9,20 @@ Provides endpoints for:
 """
 
 import os
+import math
 import time
 import uuid
 import json
+import asyncio
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel, Field
@@ -34,10 +36,18 @@ from models.schemas import (
     GenerationResponse,
     DifficultyLevel,
     KnowledgePath,
-    KnowledgePoint
+    KnowledgePoint,
+    UsageReport,
+    StreamingEventType
 )
 from workflows.pipeline import ContentGenerationPipeline, create_pipeline
 from agents.assembler import AssemblerAgent
+from llm.client import get_llm_stats, get_llm_registry
+from llm.cancellation import CancellationToken, GenerationCancelled
+from api.jobs import GenerationScheduler, QueueFullError
+from api.task_store import TaskStore
+from api.coalescing import SingleFlight, StreamBroadcast, format_sse, request_fingerprint
+from api.stream_bridge import StreamExecutor, ThreadToLoopQueue
 
 
 # ============ Configuration ============
@@ -55,6 +65,15 @@ class Config:
     MODEL_NAME = os.getenv("GLM_MODEL") or os.getenv("LLM_MODEL") or os.getenv("MODEL_NAME", "glm-4-flash")
     CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "./checkpoints")
     MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", "5"))
+    GENERATION_QUEUE_SIZE = int(os.getenv("GENERATION_QUEUE_SIZE", "20"))
+    # Identical concurrent requests share one run
+    REQUEST_COALESCING = os.getenv("REQUEST_COALESCING", "true").lower() in ("1", "true", "yes")
+    # How long a stream keeps running without subscribers (time to reconnect)
+    STREAM_RECONNECT_GRACE_SECONDS = float(os.getenv("STREAM_RECONNECT_GRACE_SECONDS", "30"))
+    # Idle SSE connections get a keep-alive comment this often
+    STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+    # Worker threads running streaming pipelines (default: one per generation slot)
+    STREAM_EXECUTOR_WORKERS = int(os.getenv("STREAM_EXECUTOR_WORKERS", str(MAX_CONCURRENT_GENERATIONS)))
 
     @classmethod
     def validate(cls):
@@ -85,7 +104,16 @@ class GenerationRequestAPI(BaseModel):
     user_intent: Optional[str] = Field(None, description="Specific user goals or requests")
     max_sections: int = Field(default=6, ge=1, le=10, description="Maximum number of sections")
     include_interactive: bool = Field(default=True, description="Include interactive components")
+    scheduling_policy: Optional[str] = Field(
+        None, description="Streaming node order: viewport_first, longest_first, importance_first"
+    )
+    deadline_seconds: Optional[float] = Field(
+        None, gt=0, description="Latency budget in seconds; generation degrades gracefully to meet it"
+    )
+    force_regenerate: bool = Field(default=False, description="Regenerate every node instead of reusing unchanged ones")
     thread_id: Optional[str] = Field(None, description="Thread ID for conversation continuity")
+    resume: bool = Field(default=False, description="Resume the thread's interrupted run from its checkpoint")
+    priority: int = Field(default=0, ge=-10, le=10, description="Queue priority when all generation slots are busy (higher first)")
 
     # Page metadata
     page_id: Optional[str] = Field(None, description="Custom page ID")
@@ -95,12 +123,24 @@ class GenerationRequestAPI(BaseModel):
 class GenerationStatus(BaseModel):
     """Status of a generation task"""
     task_id: str
-    status: str  # pending, running, completed, failed
+    status: str  # pending, running, completed, failed, cancelled
     created_at: datetime
     updated_at: datetime
     request: GenerationRequestAPI
     error: Optional[str] = None
     progress: float = 0.0  # 0.0 to 1.0
+    tokens_used: Optional[int] = None
+    token_usage: Optional[UsageReport] = None
+    result: Optional[GenerationResponse] = None  # /generate jobs, once finished
+
+
+class GenerationAccepted(BaseModel):
+    """A /generate task that was queued (or joined) instead of finished"""
+    task_id: str
+    status: str  # pending, running
+    status_url: str
+    coalesced: bool = False  # Attached to an identical run already in flight
+    queue: Dict[str, Any] = Field(default_factory=dict)
 
 
 class HealthResponse(BaseModel):
@@ -113,7 +153,17 @@ class HealthResponse(BaseModel):
 
 # ============ Global State ============
 
-generation_tasks: dict[str, GenerationStatus] = {}
+task_store: Optional[TaskStore[GenerationStatus]] = None  # Opened in lifespan
+generation_jobs: dict[str, asyncio.Task] = {}  # Running /generate jobs (keeps them referenced)
+job_scheduler = GenerationScheduler(
+    max_concurrent=Config.MAX_CONCURRENT_GENERATIONS,
+    max_queue=Config.GENERATION_QUEUE_SIZE
+)
+# In-flight runs by request fingerprint: /generate task_ids, stream broadcasts
+generation_flights: SingleFlight[str] = SingleFlight(enabled=Config.REQUEST_COALESCING)
+stream_flights: SingleFlight[StreamBroadcast] = SingleFlight(enabled=Config.REQUEST_COALESCING)
+stream_runs: dict[str, StreamBroadcast] = {}  # Running streams by task_id
+stream_executor: Optional[StreamExecutor] = None  # Opened in lifespan
 pipeline: Optional[ContentGenerationPipeline] = None
 start_time: float = time.time()
 
@@ -142,10 +192,65 @@ async def lifespan(app: FastAPI):
         print(f"❌ Failed to initialize pipeline: {e}")
         raise
 
+    global task_store
+    task_store = TaskStore.from_env(GenerationStatus, Config.CHECKPOINT_PATH)
+    task_store.purge_expired()
+    # Tasks an earlier process of this worker left unfinished (crash / restart)
+    _interrupt_stale_tasks(own=True)
+    purge_task = asyncio.create_task(_purge_expired_tasks())
+    heartbeat_task = asyncio.create_task(_heartbeat_tasks())
+    print(f"🗂️  Task store: {task_store.path}")
+
+    global stream_executor
+    stream_executor = StreamExecutor(max_workers=Config.STREAM_EXECUTOR_WORKERS)
+
+    # Pre-open TLS connections so the first generation doesn't pay for handshakes
+    warmed = await get_llm_registry().awarm_up()
+    print(f"🔥 Warmed {warmed} LLM connection(s)")
+
     yield
 
     # Shutdown
     print("\n👋 Shutting down API...")
+    purge_task.cancel()
+    heartbeat_task.cancel()
+    stream_executor.shutdown()
+    await get_llm_registry().aclose()
+
+
+async def _purge_expired_tasks() -> None:
+    """Drop tasks past TASK_TTL_HOURS once an hour."""
+    while True:
+        await asyncio.sleep(3600)
+        try:
+            await asyncio.to_thread(task_store.purge_expired)
+        except Exception as e:
+            print(f"⚠️  Task purge failed: {e}")
+
+
+def _interrupt_stale_tasks(task_id: Optional[str] = None, own: bool = False) -> int:
+    """
+    Fail unfinished tasks whose worker stopped (see TaskStore.interrupt_stale).
+
+    Streamed tasks also get a final error event, so replays end like a failed run.
+    """
+    interrupted = task_store.interrupt_stale(task_id=task_id, own=own)
+    for task in interrupted:
+        event_id = task_store.last_event_id(task.task_id)
+        if event_id:
+            error_data = json.dumps({"task_id": task.task_id, "type": "error", "error": task.error}, ensure_ascii=False)
+            task_store.append_event(task.task_id, event_id + 1, format_sse(event_id + 1, "error", error_data))
+    return len(interrupted)
+
+
+async def _heartbeat_tasks() -> None:
+    """Keep this worker's unfinished tasks from being taken for interrupted ones."""
+    while True:
+        await asyncio.sleep(task_store.stale_seconds / 4)
+        try:
+            await asyncio.to_thread(task_store.heartbeat, list(generation_jobs))
+        except Exception as e:
+            print(f"⚠️  Task heartbeat failed: {e}")
 
 
 # ============ FastAPI App ============
@@ -196,10 +301,21 @@ async def health_check():
     )
 
 
-@app.post("/generate", response_model=GenerationResponse)
+@app.get("/llm/stats")
+async def llm_stats():
+    """LLM client statistics (response cache hits/misses, size)."""
+    return get_llm_stats()
+
+
+@app.post(
+    "/generate",
+    response_model=GenerationAccepted,
+    status_code=202,
+    responses={200: {"model": GenerationResponse, "description": "Finished within wait_seconds"}}
+)
 async def generate_content(
     request: GenerationRequestAPI,
-    background_tasks: BackgroundTasks
+    wait_seconds: float = Query(0, ge=0, le=600, description="Wait up to this long for the result")
 ):
     """
     Generate educational content using the multi-agent pipeline.
@@ -209,63 +325,164 @@ async def generate_content(
     2. Content Expert + Visual Director (parallel)
     3. Assembler merges and validates
 
-    Returns the final frontend-compatible JSON schema.
+    The generation is queued as a job: at most MAX_CONCURRENT_GENERATIONS
+    pipelines run at once, and up to GENERATION_QUEUE_SIZE more wait
+    (by priority). Returns 202 with the task_id right away (poll
+    GET /generate/{task_id}), or the GenerationResponse if the job finishes
+    within wait_seconds. A full queue answers 429 with Retry-After.
+
+    A request identical to one still queued or running (same normalized
+    request, thread_id and resume) attaches to that task instead of
+    starting another pipeline ("coalesced": true).
     """
     if not pipeline:
         raise HTTPException(status_code=503, detail="Pipeline not initialized")
 
-    # Create task ID
-    task_id = str(uuid.uuid4())
-
-    # Create status
-    status = GenerationStatus(
-        task_id=task_id,
-        status="running",
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-        request=request,
-        progress=0.0
+    fingerprint = _fingerprint(request, "generate")
+    task_id = generation_flights.join(fingerprint)
+    coalesced = task_id is not None
+
+    if coalesced:
+        print(f"🔗 Coalesced /generate request into task {task_id}")
+    else:
+        admission = _admit(request.priority)
+
+        # Create task ID
+        task_id = str(uuid.uuid4())
+
+        # Create status
+        status = GenerationStatus(
+            task_id=task_id,
+            status="running" if admission.granted else "pending",
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            request=request,
+            progress=0.0
+        )
+        task_store.save(status)
+
+        job = asyncio.create_task(_run_generation_job(task_id, status, request, admission))
+        generation_jobs[task_id] = job
+        generation_flights.start(fingerprint, task_id)
+
+        def job_done(_, task_id=task_id):
+            generation_jobs.pop(task_id, None)
+            generation_flights.finish(fingerprint, task_id)
+
+        job.add_done_callback(job_done)
+
+    job = generation_jobs[task_id]
+    if wait_seconds:
+        try:
+            response = await asyncio.wait_for(asyncio.shield(job), timeout=wait_seconds)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            if response is None:
+                raise HTTPException(status_code=500, detail=f"Generation failed: {task_store.get(task_id).error}")
+            return JSONResponse(status_code=200, content=response.model_dump(mode="json"))
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "task_id": task_id,
+            "status": task_store.get(task_id).status,
+            "status_url": f"/generate/{task_id}",
+            "coalesced": coalesced,
+            "queue": job_scheduler.stats()
+        }
     )
-    generation_tasks[task_id] = status
 
+
+def _fingerprint(request: GenerationRequestAPI, endpoint: str) -> str:
+    """Single-flight key of a request (priority does not change the page)."""
+    return request_fingerprint(
+        GenerationRequest(**request.model_dump()),
+        endpoint=endpoint,
+        thread_id=request.thread_id,
+        resume=request.resume
+    )
+
+
+def _admit(priority: int):
+    """Claim a generation slot / queue place, or answer 429 with Retry-After."""
     try:
-        print(f"\n📝 Task {task_id}: Starting generation")
+        return job_scheduler.admit(priority)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        ) from e
 
-        # Determine mode
-        if request.knowledge_path:
-            print(f"   Mode: Knowledge Path")
-            print(f"   Domain: {request.knowledge_path.domain}")
-            print(f"   Knowledge Points: {len(request.knowledge_path.knowledge_points)}")
-        else:
-            print(f"   Mode: Topic")
-            print(f"   Topic: {request.topic}")
-
-        print(f"   Audience: {request.target_audience}")
-
-        # Convert to internal request model
-        gen_request = GenerationRequest(
-            topic=request.topic,
-            knowledge_path=request.knowledge_path,
-            target_audience=request.target_audience,
-            difficulty=request.difficulty,
-            user_intent=request.user_intent,
-            max_sections=request.max_sections,
-            include_interactive=request.include_interactive,
-            page_id=request.page_id,
-            custom_title=request.custom_title
-        )
 
-        # Run pipeline
-        response = pipeline.run(
-            request=gen_request,
-            thread_id=request.thread_id
-        )
+async def _run_generation_job(
+    task_id: str,
+    status: GenerationStatus,
+    request: GenerationRequestAPI,
+    admission
+) -> Optional[GenerationResponse]:
+    """
+    Run one queued /generate job and record its outcome in the task store.
+
+    Returns:
+        The GenerationResponse, or None if the pipeline raised
+    """
+    try:
+        async with admission:
+            status.status = "running"
+            status.updated_at = datetime.now()
+            task_store.save(status)
+            print(f"\n📝 Task {task_id}: Starting generation")
+
+            # Determine mode
+            if request.knowledge_path:
+                print(f"   Mode: Knowledge Path")
+                print(f"   Domain: {request.knowledge_path.domain}")
+                print(f"   Knowledge Points: {len(request.knowledge_path.knowledge_points)}")
+            else:
+                print(f"   Mode: Topic")
+                print(f"   Topic: {request.topic}")
+
+            print(f"   Audience: {request.target_audience}")
+
+            # Convert to internal request model
+            gen_request = GenerationRequest(
+                topic=request.topic,
+                knowledge_path=request.knowledge_path,
+                target_audience=request.target_audience,
+                difficulty=request.difficulty,
+                user_intent=request.user_intent,
+                max_sections=request.max_sections,
+                include_interactive=request.include_interactive,
+                scheduling_policy=request.scheduling_policy,
+                deadline_seconds=request.deadline_seconds,
+                force_regenerate=request.force_regenerate,
+                page_id=request.page_id,
+                custom_title=request.custom_title
+            )
+
+            if request.resume and not (request.topic or request.knowledge_path):
+                gen_request = _checkpointed_request(request.thread_id) or gen_request
+
+            # Run pipeline (async path: keeps the event loop free for other requests)
+            response = await pipeline.arun(
+                request=gen_request,
+                thread_id=request.thread_id,
+                resume=request.resume
+            )
 
         # Update status
         status.status = "completed" if response.success else "failed"
         status.progress = 1.0
         status.updated_at = datetime.now()
         status.error = response.error
+        status.tokens_used = response.tokens_used
+        status.token_usage = response.token_usage
+        status.result = response
+        task_store.save(status)
+        if response.page_schema:
+            task_store.put_artifact(task_id, "page_schema", response.page_schema.model_dump(mode="json"))
 
         print(f"✅ Task {task_id}: Completed in {response.generation_time_seconds:.2f}s")
 
@@ -276,13 +493,23 @@ async def generate_content(
         status.status = "failed"
         status.error = str(e)
         status.updated_at = datetime.now()
+        task_store.save(status)
 
         print(f"❌ Task {task_id}: Failed - {e}")
+        return None
 
-        raise HTTPException(
-            status_code=500,
-            detail=f"Generation failed: {str(e)}"
-        )
+
+@app.get("/generate/queue")
+async def generation_queue():
+    """
+    Generation slots in use, queued runs, the average run time, coalesced
+    requests and the saturation of the streaming worker threads.
+    """
+    return {
+        **job_scheduler.stats(),
+        "coalescing": {"generate": generation_flights.stats(), "stream": stream_flights.stats()},
+        "stream_executor": stream_executor.stats() if stream_executor else None
+    }
 
 
 @app.get("/generate/{task_id}")
@@ -290,37 +517,73 @@ async def get_generation_status(task_id: str):
     """
     Get the status of a generation task.
 
-    Returns the current status, progress, and result if available.
+    Returns the current status (pending, running, completed, failed,
+    cancelled), progress, and result if available.
     """
-    if task_id not in generation_tasks:
+    status = task_store.get(task_id)
+    if status is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return generation_tasks[task_id]
+    if status.status in ("pending", "running") and task_id not in generation_jobs:
+        if _interrupt_stale_tasks(task_id):
+            status = task_store.get(task_id)
+
+    return status
 
 
 @app.get("/tasks")
 async def list_tasks(
     status_filter: Optional[str] = None,
-    limit: int = 50
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
 ):
     """
-    List recent generation tasks.
+    List recent generation tasks, most recent first (without results).
 
-    Optionally filter by status (pending, running, completed, failed).
+    Optionally filter by status (pending, running, completed, failed,
+    cancelled). Pass the returned next_cursor as cursor to get the next
+    page; it is null on the last page.
     """
-    tasks = list(generation_tasks.values())
+    try:
+        tasks, next_cursor = task_store.list(status=status_filter, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return {"tasks": tasks, "next_cursor": next_cursor}
+
+
+@app.get("/tasks/{task_id}/artifacts")
+async def list_task_artifacts(task_id: str):
+    """Artifacts stored for a task (e.g. page_schema)."""
+    if task_store.get(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-    if status_filter:
-        tasks = [t for t in tasks if t.status == status_filter]
+    return {"task_id": task_id, "artifacts": task_store.list_artifacts(task_id)}
 
-    # Sort by created_at, most recent first
-    tasks.sort(key=lambda t: t.created_at, reverse=True)
 
-    return tasks[:limit]
+@app.get("/tasks/{task_id}/artifacts/{name}")
+async def get_task_artifact(task_id: str, name: str):
+    """One stored artifact of a task."""
+    artifact = task_store.get_artifact(task_id, name)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    return artifact
+
+
+def _checkpointed_request(thread_id: Optional[str]) -> Optional[GenerationRequest]:
+    """
+    Stored request of an interrupted run, so resume=true works without
+    resending the topic / knowledge_path.
+    """
+    if not (thread_id and pipeline and pipeline.checkpoints):
+        return None
+    checkpoint = pipeline.checkpoints.load(thread_id)
+    return checkpoint.request if checkpoint else None
 
 
 @app.post("/generate/stream")
-async def generate_content_stream(request: GenerationRequestAPI):
+async def generate_content_stream(request: GenerationRequestAPI, http_request: Request):
     """
     Generate content with streaming progress updates.
 
@@ -328,118 +591,101 @@ async def generate_content_stream(request: GenerationRequestAPI):
     - stage_start: Stage beginning
     - stage_complete: Stage finished with metadata
     - skeleton_ready: Page structure available (show titles)
+    - block_placeholder: Rule-based blocks for every node (replaced by block_ready)
     - block_ready: Individual component ready to render
     - progress: Detailed progress "5/12 (42%)"
     - complete: Generation finished, auto-saved to JSON
     - error: Error occurred
+
+    Every event has an SSE id (1, 2, ...) and is logged per task: after a
+    dropped connection, GET /generate/{task_id}/events with Last-Event-ID
+    resumes the stream without another pipeline run.
+
+    A request identical to a stream still running (same normalized request,
+    thread_id and resume) subscribes to that run: it first receives every
+    event sent so far, then the live ones, under the same task_id.
+
+    If no subscriber reconnects within STREAM_RECONNECT_GRACE_SECONDS after
+    the last one disconnected, the generation is cancelled (no further LLM
+    calls) and the task is recorded as cancelled. Streams share the
+    generation slots of /generate: a stream may wait for a slot before the
+    first event, and a full queue answers 429 with Retry-After.
     """
     if not pipeline:
         raise HTTPException(status_code=503, detail="Pipeline not initialized")
 
-    task_id = str(uuid.uuid4())
+    fingerprint = _fingerprint(request, "stream")
+    broadcast = stream_flights.join(fingerprint)
+
+    if broadcast is not None:
+        print(f"🔗 Coalesced stream request into task {broadcast.task_id}")
+    else:
+        # Claimed here so an overflowing request gets its 429 before the
+        # stream starts; the job only waits for the slot
+        admission = _admit(request.priority)
+
+        task_id = str(uuid.uuid4())
+        status = GenerationStatus(
+            task_id=task_id,
+            status="running" if admission.granted else "pending",
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            request=request,
+            progress=0.0
+        )
+        task_store.save(status)
 
-    async def event_generator():
-        """Generate SSE events progressively"""
-        import sys
-        import asyncio
-        import concurrent.futures
-        import time as time_module
-        try:
-            # Log start
-            start_msg = f"[{time_module.time()}] event_generator() called for task {task_id}"
-            print(start_msg, flush=True)
-            sys.stderr.write(start_msg + "\n")
-            sys.stderr.flush()
-
-            # Convert to internal request
-            gen_request = GenerationRequest(**request.model_dump())
-
-            # Create a queue for real-time event streaming
-            event_queue = asyncio.Queue()
-
-            # Get the event loop BEFORE starting the thread
-            loop = asyncio.get_event_loop()
-
-            def run_pipeline():
-                """Run pipeline in thread pool and put events in queue"""
-                try:
-                    for event in pipeline.run_streaming(request=gen_request, thread_id=task_id):
-                        # Put event in queue (using the loop we captured earlier)
-                        asyncio.run_coroutine_threadsafe(
-                            event_queue.put(event),
-                            loop
-                        )
-                except Exception as e:
-                    # Put error in queue
-                    asyncio.run_coroutine_threadsafe(
-                        event_queue.put(e),
-                        loop
-                    )
-                finally:
-                    # Signal completion
-                    asyncio.run_coroutine_threadsafe(
-                        event_queue.put(None),
-                        loop
-                    )
-
-            # Start pipeline in thread pool
-            msg = f"📡 SSE: Starting pipeline in thread pool for task {task_id}"
-            print(msg, flush=True)
-            import sys
-            sys.stderr.write(msg + "\n")
-            sys.stderr.flush()
-            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            loop.run_in_executor(executor, run_pipeline)
-
-            # Yield events as they arrive
-            event_count = 0
-            while True:
-                # Wait for event (with timeout to allow checking for client disconnect)
-                try:
-                    event = await asyncio.wait_for(event_queue.get(), timeout=1.0)
-                except asyncio.TimeoutError:
-                    # No event yet, but keep connection alive
-                    yield ": keep-alive\n\n"
-                    continue
-
-                # Check for completion signal
-                if event is None:
-                    print(f"📡 SSE: Pipeline completed, sent {event_count} events")
-                    break
+        broadcast = StreamBroadcast(task_id)
+        job = asyncio.create_task(_run_stream_job(status, request, broadcast, admission))
+        generation_jobs[task_id] = job
+        stream_runs[task_id] = broadcast
+        stream_flights.start(fingerprint, broadcast)
 
-                # Check if event is an exception
-                if isinstance(event, Exception):
-                    raise event
+        def job_done(_, task_id=task_id, broadcast=broadcast, admission=admission):
+            # Also frees the slot of a job cancelled before it ever ran
+            admission.release()
+            generation_jobs.pop(task_id, None)
+            stream_runs.pop(task_id, None)
+            stream_flights.finish(fingerprint, broadcast)
 
-                event_count += 1
+        job.add_done_callback(job_done)
 
-                # Format as SSE
-                print(f"📡 SSE: Sending event #{event_count} - {event.type.value} for stage {event.stage}")
-                event_data = json.dumps({
-                    "task_id": task_id,
-                    "type": event.type.value,
-                    "stage": event.stage,
-                    "data": event.data,
-                    "timestamp": event.timestamp
-                }, ensure_ascii=False)
+    return _sse_response(_relay_events(broadcast, http_request))
 
-                # Yield SSE event
-                yield f"event: {event.type.value}\ndata: {event_data}\n\n"
 
-        except Exception as e:
-            import traceback
-            print(f"❌ SSE Error: {e}")
-            traceback.print_exc()
-            error_data = json.dumps({
-                "task_id": task_id,
-                "type": "error",
-                "error": str(e),
-                "traceback": traceback.format_exc()
-            }, ensure_ascii=False)
-            yield f"event: error\ndata: {error_data}\n\n"
+@app.get("/generate/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    http_request: Request,
+    after: int = Query(0, ge=0, description="Replay events with ids above this one"),
+    last_event_id: Optional[str] = Header(None, description="Last event id received (overrides after)")
+):
+    """
+    Resume a /generate/stream task's events.
+
+    Replays the logged events after Last-Event-ID (or ?after=), then follows
+    the live ones until the task finishes. Never starts a pipeline run: a
+    finished task is replayed from its event log.
+    """
+    if last_event_id is not None:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID: {last_event_id}") from None
+
+    broadcast = stream_runs.get(task_id)
+    if broadcast is not None:
+        print(f"🔁 Task {task_id}: client resumed after event {after}")
+        return _sse_response(_relay_events(broadcast, http_request, after))
 
+    if task_store.get(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return _sse_response(_replay_stored_events(task_id, http_request, after))
+
+
+def _sse_response(events) -> StreamingResponse:
     return StreamingResponse(
-        event_generator(),
+        events,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -449,13 +695,218 @@ async def generate_content_stream(request: GenerationRequestAPI):
     )
 
 
+async def _relay_events(broadcast: StreamBroadcast, http_request: Request, after: int = 0):
+    """Relay a running stream's events (those after `after`) to one client."""
+    broadcast.join()
+    try:
+        # Wait for events (with a heartbeat timeout to check for client disconnect)
+        async for event in broadcast.events(after=after, keepalive=Config.STREAM_HEARTBEAT_SECONDS):
+            if event is None:
+                if await http_request.is_disconnected():
+                    break
+                # No event yet, but keep connection alive
+                yield ": keep-alive\n\n"
+                continue
+            yield event
+    finally:
+        # Last client went away (disconnect / closed tab) before the run
+        # finished: stop the pipeline unless someone reconnects in time
+        if broadcast.leave() == 0 and not broadcast.closed:
+            asyncio.get_running_loop().call_later(
+                Config.STREAM_RECONNECT_GRACE_SECONDS, _cancel_abandoned_stream, broadcast
+            )
+
+
+def _cancel_abandoned_stream(broadcast: StreamBroadcast) -> None:
+    """Cancel a stream that still has no subscribers after the reconnect grace period."""
+    if broadcast.subscribers == 0 and not broadcast.closed:
+        job = generation_jobs.get(broadcast.task_id)
+        if job:
+            job.cancel()
+
+
+async def _replay_stored_events(task_id: str, http_request: Request, after: int):
+    """
+    Replay a task's logged events, polling for new ones while it is still
+    running (e.g. in another worker). A task whose worker stopped is marked
+    failed and ends with an error event.
+    """
+    last_sent = time.monotonic()
+    while True:
+        for event_id, event in task_store.events(task_id, after):
+            after = event_id
+            last_sent = time.monotonic()
+            yield event
+
+        status = task_store.get(task_id)
+        if status is not None and status.status in ("pending", "running") and _interrupt_stale_tasks(task_id):
+            continue  # Replays the error event, then sees the final status
+
+        if status is None or status.status not in ("pending", "running"):
+            # Events are logged before the final status, one last read gets them all
+            for _, event in task_store.events(task_id, after):
+                yield event
+            return
+
+        await asyncio.sleep(1.0)
+        if time.monotonic() - last_sent >= Config.STREAM_HEARTBEAT_SECONDS:
+            if await http_request.is_disconnected():
+                return
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+
+
+async def _run_stream_job(
+    status: GenerationStatus,
+    request: GenerationRequestAPI,
+    broadcast: StreamBroadcast,
+    admission
+) -> None:
+    """
+    Run one streaming generation and publish its SSE events to the broadcast.
+
+    `admission` is the run's generation slot claim (taken by the handler).
+    Cancelling this task (all subscribers gone) cancels the pipeline.
+    """
+    import time as time_module
+
+    task_id = status.task_id
+    # Checkpoints are keyed by thread_id; pass it back with resume=true to continue
+    thread_id = request.thread_id or task_id
+    cancel_token = CancellationToken()
+    try:
+        # Wait for a generation slot
+        await admission.wait()
+        status.status = "running"
+        status.updated_at = datetime.now()
+        task_store.save(status)
+
+        # Log start
+        start_msg = f"[{time_module.time()}] stream job started for task {task_id}"
+        print(start_msg, flush=True)
+        sys.stderr.write(start_msg + "\n")
+        sys.stderr.flush()
+
+        # Convert to internal request
+        gen_request = GenerationRequest(**request.model_dump())
+        if request.resume and not (request.topic or request.knowledge_path):
+            gen_request = _checkpointed_request(thread_id) or gen_request
+
+        # Create a queue for real-time event streaming (bound to this loop
+        # BEFORE starting the thread)
+        event_queue = ThreadToLoopQueue(asyncio.get_running_loop())
+
+        def run_pipeline():
+            """Run pipeline in thread pool and put events in queue"""
+            try:
+                for event in pipeline.run_streaming(
+                    request=gen_request, thread_id=thread_id, resume=request.resume,
+                    cancel_token=cancel_token
+                ):
+                    event_queue.put(event)
+            except GenerationCancelled:
+                print(f"🛑 Task {task_id}: pipeline stopped")
+            except Exception as e:
+                # Put error in queue
+                event_queue.put(e)
+            finally:
+                # Signal completion
+                event_queue.put(None)
+
+        # Start pipeline on the shared stream executor
+        msg = f"📡 SSE: Starting pipeline in thread pool for task {task_id}"
+        print(msg, flush=True)
+        sys.stderr.write(msg + "\n")
+        sys.stderr.flush()
+        stream_executor.run(run_pipeline)
+
+        # Publish events as they arrive
+        event_count = 0
+        while True:
+            event = await event_queue.get()
+
+            # Check for completion signal
+            if event is None:
+                print(f"📡 SSE: Pipeline completed, sent {event_count} events")
+                break
+
+            # Check if event is an exception
+            if isinstance(event, Exception):
+                raise event
+
+            event_count += 1
+
+            # Format as SSE
+            print(f"📡 SSE: Sending event #{event_count} - {event.type.value} for stage {event.stage}")
+            event_data = json.dumps({
+                "task_id": task_id,
+                "type": event.type.value,
+                "stage": event.stage,
+                "data": event.data,
+                "timestamp": event.timestamp
+            }, ensure_ascii=False)
+
+            # Log before updating the status, so replays that see the final
+            # status already have every event
+            task_store.append_event(task_id, *broadcast.publish(event.type.value, event_data))
+            _update_stream_status(status, event)
+
+    except Exception as e:
+        import traceback
+        print(f"❌ SSE Error: {e}")
+        traceback.print_exc()
+        error_data = json.dumps({
+            "task_id": task_id,
+            "type": "error",
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        }, ensure_ascii=False)
+        task_store.append_event(task_id, *broadcast.publish("error", error_data))
+        status.status = "failed"
+        status.error = str(e)
+        status.updated_at = datetime.now()
+        task_store.save(status)
+
+    finally:
+        admission.release()
+        # Cancelled before the run finished (every client disconnected)
+        if status.status in ("pending", "running"):
+            cancel_token.cancel(f"client disconnected from task {task_id}")
+            status.status = "cancelled"
+            status.error = "Client disconnected"
+            status.updated_at = datetime.now()
+            task_store.save(status)
+        broadcast.close()
+
+
+def _update_stream_status(status: GenerationStatus, event) -> None:
+    """Track a streaming task's progress / outcome from its events (persisted to the task store)."""
+    data = event.data or {}
+    if event.type == StreamingEventType.BLOCK_READY and data.get("progress"):
+        done, total = data["progress"].split(" ")[0].split("/")
+        status.progress = int(done) / max(1, int(total))
+    elif event.type == StreamingEventType.COMPLETE:
+        status.status = "completed"
+        status.progress = 1.0
+        status.tokens_used = data.get("tokens_used")
+        status.token_usage = UsageReport.model_validate(data["token_usage"]) if data.get("token_usage") else None
+        if data.get("schema"):
+            task_store.put_artifact(status.task_id, "page_schema", data["schema"])
+    elif event.type == StreamingEventType.ERROR:
+        status.status = "failed"
+        status.error = data.get("error")
+    else:
+        return
+    status.updated_at = datetime.now()
+    task_store.save(status)
+
+
 @app.delete("/tasks/{task_id}")
 async def delete_task(task_id: str):
     """Delete a task from history"""
-    if task_id not in generation_tasks:
+    if not task_store.delete(task_id):
         raise HTTPException(status_code=404, detail="Task not found")
 
-    del generation_tasks[task_id]
     return {"message": "Task deleted"}
 
 
@@ -470,7 +921,9 @@ async def root():
             "health": "/health",
             "generate": "/generate",
             "generate_stream": "/generate/stream",
+            "generate_queue": "/generate/queue",
             "tasks": "/tasks",
+            "llm_stats": "/llm/stats",
             "docs": "/docs"
         },
         "pipeline_stages": [
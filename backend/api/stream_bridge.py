@@ -0,0 +1,114 @@
+"""
+Thread-to-Event-Loop Bridge for Streaming Generation
+
+pipeline.run_streaming() is a blocking generator, so /generate/stream runs
+it on a worker thread and hands its events to the event loop:
+- StreamExecutor: one process-wide, sized thread pool for all streams, with
+  saturation metrics (busy workers, queued runs, queue wait)
+- ThreadToLoopQueue: an asyncio.Queue fed from a worker thread through
+  loop.call_soon_threadsafe() (no coroutine / future per event)
+"""
+
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+
+T = TypeVar("T")
+
+
+class StreamExecutor:
+    """Shared worker threads for blocking streaming pipelines."""
+
+    def __init__(self, max_workers: int = 5):
+        """
+        Args:
+            max_workers: Pipelines that can stream at once (more wait for a thread)
+        """
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stream")
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._active = 0
+        self._peak_active = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def run(self, fn: Callable[[], T]) -> "asyncio.Future[T]":
+        """
+        Run `fn` on a worker thread (call from the event loop).
+
+        Returns:
+            Future of fn's result
+        """
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.submitted += 1
+
+        def tracked() -> T:
+            wait = time.monotonic() - submitted_at
+            with self._lock:
+                self._active += 1
+                self._peak_active = max(self._peak_active, self._active)
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                result = fn()
+            except BaseException:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self.completed += 1
+            return result
+
+        return asyncio.get_running_loop().run_in_executor(self._executor, tracked)
+
+    def shutdown(self) -> None:
+        """Stop accepting work; runs not started yet are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self.submitted - started,
+                "saturation": round(self._active / self.max_workers, 2),
+                "peak_active": self._peak_active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "average_wait_ms": round(self._total_wait / started * 1000, 1) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 1)
+            }
+
+
+class ThreadToLoopQueue:
+    """Queue a worker thread puts into and an event loop coroutine reads from."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """
+        Args:
+            loop: The reading coroutine's loop (capture it before starting the thread)
+        """
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, item: Any) -> None:
+        """Thread-safe, non-blocking put (from any thread)."""
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        except RuntimeError:
+            pass  # Loop closed (server shutting down): nobody is reading
+
+    async def get(self) -> Any:
+        return await self._queue.get()
@@ -0,0 +1,368 @@
+"""
+Persistent Generation Task Store
+
+Replaces the API's in-memory task dict. Every task (GenerationStatus) is
+kept in SQLite (WAL mode), so it survives restarts and every uvicorn worker
+sharing the directory sees the same tasks:
+- tasks: status document per task_id, indexed on (created_at, task_id) and
+  (status, created_at, task_id) for lookups and newest-first pagination
+- task_results: the finished GenerationResponse (kept out of the listing path)
+- task_artifacts: named JSON artifacts of a task (e.g. the streamed page schema)
+- task_events: the SSE event log of a streaming task, by event id (replayed
+  to clients that reconnect with Last-Event-ID)
+
+Tasks not updated for TASK_TTL_HOURS are removed by purge_expired().
+
+Each task records the worker (host:pid) running it. The worker heartbeats
+its unfinished tasks (heartbeat()); interrupt_stale() marks pending /
+running tasks whose worker stopped heartbeating (crash, restart) as failed,
+so they do not report "running" forever.
+
+Storage: tasks.sqlite3 in the API's checkpoint directory.
+"""
+
+import os
+import json
+import time
+import base64
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class TaskStore(Generic[T]):
+    """SQLite-backed store of generation task statuses, results and artifacts."""
+
+    def __init__(
+        self,
+        model: Type[T],
+        directory: str = "./checkpoints",
+        ttl_seconds: Optional[float] = None,
+        stale_seconds: float = 60.0
+    ):
+        """
+        Open (or create) the task database.
+
+        Args:
+            model: Task status model (task_id, status, created_at, updated_at,
+                optional error / result)
+            directory: Storage directory (the API's checkpoint path)
+            ttl_seconds: Remove tasks not updated for this long (None: keep forever)
+            stale_seconds: An unfinished task without a heartbeat for this long
+                lost its worker (heartbeat every stale_seconds / 4)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "tasks.sqlite3")
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")  # Other workers may be writing
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                worker TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at, task_id);
+            CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks (status, created_at, task_id);
+            CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks (updated_at);
+
+            CREATE TABLE IF NOT EXISTS task_results (
+                task_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS task_artifacts (
+                task_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (task_id, name)
+            );
+
+            CREATE TABLE IF NOT EXISTS task_events (
+                task_id TEXT NOT NULL,
+                event_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (task_id, event_id)
+            ) WITHOUT ROWID;
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "worker" not in columns:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN worker TEXT")  # Databases created before workers were recorded
+
+    @classmethod
+    def from_env(cls, model: Type[T], directory: str) -> "TaskStore[T]":
+        """
+        Build a store from environment variables.
+
+        Environment variables:
+            TASK_TTL_HOURS: Remove tasks not updated for this many hours (default: 168, 0 = never)
+            TASK_STALE_SECONDS: Fail unfinished tasks whose worker has not heartbeated
+                for this long (default: 60)
+        """
+        ttl_hours = float(os.getenv("TASK_TTL_HOURS", "168"))
+        return cls(
+            model,
+            directory=directory,
+            ttl_seconds=ttl_hours * 3600 if ttl_hours > 0 else None,
+            stale_seconds=float(os.getenv("TASK_STALE_SECONDS", "60"))
+        )
+
+    # ============ Tasks ============
+
+    def save(self, task: T) -> None:
+        """Insert or update a task (its result too, once set); this worker becomes its owner."""
+        result = getattr(task, "result", None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks (task_id, status, created_at, updated_at, payload, worker) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(task_id) DO UPDATE SET status = excluded.status, "
+                "updated_at = excluded.updated_at, payload = excluded.payload, worker = excluded.worker",
+                (
+                    task.task_id,
+                    task.status,
+                    task.created_at.timestamp(),
+                    task.updated_at.timestamp(),
+                    task.model_dump_json(exclude={"result"}),
+                    self.worker
+                )
+            )
+            if result is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO task_results (task_id, payload) VALUES (?, ?)",
+                    (task.task_id, result.model_dump_json())
+                )
+
+    def get(self, task_id: str) -> Optional[T]:
+        """A task with its result (None if unknown)."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            result = self._conn.execute(
+                "SELECT payload FROM task_results WHERE task_id = ?", (task_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        if result is not None:
+            data["result"] = json.loads(result[0])
+        return self.model.model_validate(data)
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Tasks newest first, without results.
+
+        Args:
+            status: Only tasks with this status
+            limit: Page size
+            cursor: next_cursor of the previous page
+
+        Returns:
+            (tasks, next_cursor) - next_cursor is None on the last page
+        """
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if cursor:
+            created_at, task_id = self._decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND task_id < ?))")
+            params.extend([created_at, created_at, task_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT payload, created_at, task_id FROM tasks {where} "
+                "ORDER BY created_at DESC, task_id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+
+        tasks = [self.model.model_validate_json(payload) for payload, _, _ in rows[:limit]]
+        next_cursor = self._encode_cursor(rows[limit - 1][1], rows[limit - 1][2]) if len(rows) > limit else None
+        return tasks, next_cursor
+
+    def delete(self, task_id: str) -> bool:
+        """Remove a task with its result, artifacts and events (False if unknown)."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                deleted = self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,)).rowcount
+                self._conn.execute("DELETE FROM task_results WHERE task_id = ?", (task_id,))
+                self._conn.execute("DELETE FROM task_artifacts WHERE task_id = ?", (task_id,))
+                self._conn.execute("DELETE FROM task_events WHERE task_id = ?", (task_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted > 0
+
+    def purge_expired(self) -> int:
+        """Remove tasks not updated within the TTL; returns how many."""
+        if self.ttl_seconds is None:
+            return 0
+
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._conn.execute("DELETE FROM tasks WHERE updated_at < ?", (cutoff,)).rowcount
+                self._conn.execute("DELETE FROM task_results WHERE task_id NOT IN (SELECT task_id FROM tasks)")
+                self._conn.execute("DELETE FROM task_artifacts WHERE task_id NOT IN (SELECT task_id FROM tasks)")
+                self._conn.execute("DELETE FROM task_events WHERE task_id NOT IN (SELECT task_id FROM tasks)")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if removed:
+            print(f"🧹 Removed {removed} expired generation tasks")
+        return removed
+
+    # ============ Worker Liveness ============
+
+    def heartbeat(self, task_ids: List[str]) -> None:
+        """Mark this worker's unfinished tasks as alive (every stale_seconds / 4)."""
+        if not task_ids:
+            return
+        placeholders = ", ".join("?" for _ in task_ids)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE tasks SET updated_at = ? WHERE worker = ? AND task_id IN ({placeholders}) "
+                "AND status IN ('pending', 'running')",
+                (time.time(), self.worker, *task_ids)
+            )
+
+    def interrupt_stale(self, task_id: Optional[str] = None, own: bool = False) -> List[T]:
+        """
+        Mark unfinished tasks whose worker is gone as failed.
+
+        Args:
+            task_id: Only check this task
+            own: Also fail this worker's unfinished tasks (at startup: they were
+                left by an earlier process with the same host:pid)
+
+        Returns:
+            The tasks marked failed
+        """
+        clauses = ["status IN ('pending', 'running')", "(updated_at < ? OR worker IS NULL OR worker = ?)"]
+        params: List[Any] = [time.time() - self.stale_seconds, self.worker if own else None]
+        if task_id:
+            clauses.append("task_id = ?")
+            params.append(task_id)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT task_id, updated_at, payload, worker FROM tasks WHERE {' AND '.join(clauses)}", params
+            ).fetchall()
+
+        interrupted = []
+        for stale_id, updated_at, payload, worker in rows:
+            task = self.model.model_validate_json(payload).model_copy(update={
+                "status": "failed",
+                "error": f"Interrupted: worker {worker or 'unknown'} stopped before the task finished",
+                "updated_at": datetime.now()
+            })
+            with self._lock:
+                # Skip tasks whose worker touched them since they were read
+                changed = self._conn.execute(
+                    "UPDATE tasks SET status = ?, updated_at = ?, payload = ?, worker = ? "
+                    "WHERE task_id = ? AND updated_at = ?",
+                    (task.status, task.updated_at.timestamp(), task.model_dump_json(exclude={"result"}),
+                     self.worker, stale_id, updated_at)
+                ).rowcount
+            if changed:
+                interrupted.append(task)
+
+        if interrupted:
+            print(f"🪦 Marked {len(interrupted)} interrupted generation task(s) as failed")
+        return interrupted
+
+    # ============ Artifacts ============
+
+    def put_artifact(self, task_id: str, name: str, data: Any) -> None:
+        """Store a JSON-serializable artifact of a task (replaces one with the same name)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_artifacts (task_id, name, payload, created_at) VALUES (?, ?, ?, ?)",
+                (task_id, name, json.dumps(data, ensure_ascii=False), time.time())
+            )
+
+    def get_artifact(self, task_id: str, name: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM task_artifacts WHERE task_id = ? AND name = ?", (task_id, name)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_artifacts(self, task_id: str) -> List[Dict[str, Any]]:
+        """Name, size (bytes) and creation time of every artifact of a task."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, length(payload), created_at FROM task_artifacts WHERE task_id = ? ORDER BY name",
+                (task_id,)
+            ).fetchall()
+        return [{"name": name, "size": size, "created_at": created_at} for name, size, created_at in rows]
+
+    # ============ Events ============
+
+    def append_event(self, task_id: str, event_id: int, event: str) -> None:
+        """Log one formatted SSE event of a task."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_events (task_id, event_id, payload) VALUES (?, ?, ?)",
+                (task_id, event_id, event)
+            )
+
+    def last_event_id(self, task_id: str) -> int:
+        """Id of a task's last logged event (0: none)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(event_id) FROM task_events WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return row[0] or 0
+
+    def events(self, task_id: str, after: int = 0) -> List[Tuple[int, str]]:
+        """(event_id, SSE event) of a task with ids above `after`, in order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT event_id, payload FROM task_events WHERE task_id = ? AND event_id > ? ORDER BY event_id",
+                (task_id, after)
+            ).fetchall()
+
+    # ============ Cursors ============
+
+    @staticmethod
+    def _encode_cursor(created_at: float, task_id: str) -> str:
+        return base64.urlsafe_b64encode(f"{created_at!r}|{task_id}".encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, str]:
+        try:
+            created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            return float(created_at), task_id
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError(f"Invalid cursor: {cursor}") from None
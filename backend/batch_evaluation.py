@@ -150,6 +150,7 @@ def run_evaluation(eval_set, pipeline):
                 "success": True,
                 "generation_time": elapsed_time,
                 "tokens_used": response.tokens_used,
+                "token_usage": response.token_usage.model_dump() if response.token_usage else None,
                 "sections": len(response.page_schema.sections),
                 "components": len(response.page_schema.components),
                 "component_evaluation": component_eval,
@@ -215,7 +216,12 @@ def main():
     for i, eval_set in enumerate(EVALUATION_SETS, 1):
         print(f"  {i}. {eval_set['set_id']} - {eval_set['topic']} ({eval_set['domain']})")
 
-    choice = input("\n运行哪个评测集? (1-10, 或 'all'): ").strip().lower()
+    # 命令行参数优先 (非交互运行, 例如 python batch_evaluation.py all);
+    # 并发批量生成请使用 generate_batch.py
+    if len(sys.argv) > 1:
+        choice = sys.argv[1].strip().lower()
+    else:
+        choice = input("\n运行哪个评测集? (1-10, 或 'all'): ").strip().lower()
 
     results = []
     start_time = time.time()
@@ -257,10 +263,15 @@ def main():
 
     if successful > 0:
         total_tokens = sum(r.get("tokens_used", 0) for r in results if r.get("success"))
+        cached_tokens = sum(
+            (r.get("token_usage") or {}).get("total", {}).get("cached_tokens", 0)
+            for r in results if r.get("success")
+        )
         avg_time = sum(r.get("generation_time", 0) for r in results if r.get("success")) / successful
 
         print(f"\n📈 性能指标:")
         print(f"   总 Tokens: {total_tokens}")
+        print(f"   缓存 Tokens: {cached_tokens}")
         print(f"   平均用时: {avg_time:.1f}秒")
 
         # 组件覆盖统计
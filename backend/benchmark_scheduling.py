@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Node Scheduling Policy Benchmark
+
+Runs the async streaming pipeline on evaluation-set knowledge paths once
+per scheduling policy (workflows/scheduler.py) and compares:
+- first_block:  time to the first generated node
+- viewport:     time until every node of the first section is done
+- weighted:     importance-weighted mean node completion time
+- makespan:     time until the last node is done
+
+Times are measured from the start of node generation (planning excluded).
+A run fails (instead of timing placeholder content) if any node fell back
+to rule-based content or the provider was never called.
+Run it against the stub server for repeatable numbers:
+
+    python stub_llm_server.py --port 8900 --latency fixed --latency-ms 300 --tokens-per-second 400 &
+    GLM_API_KEY= LLM_PROVIDER=custom LLM_API_KEY=stub LLM_BASE_URL=http://127.0.0.1:8900/v1 \\
+        python benchmark_scheduling.py --sets 1,2,3 --workers 3 --repeats 2
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.schemas import StreamingEventType
+from workflows.pipeline import ContentGenerationPipeline
+from workflows.scheduler import SCHEDULING_POLICIES
+from batch_evaluation import convert_evaluation_set_to_request
+from evaluation_set import EVALUATION_SETS
+
+
+class TimedPipeline(ContentGenerationPipeline):
+    """Pipeline that timestamps the start of node generation and every generated node."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skeleton = None
+        self.started = 0.0
+        self.finished: Dict[str, float] = {}
+        self.failed: List[str] = []
+
+    def _node_jobs(self, skeleton):
+        self.skeleton = skeleton
+        self.started = time.perf_counter()
+        return super()._node_jobs(skeleton)
+
+    def _record_node(self, thread_id, node, result, outputs) -> None:
+        self.finished[node.node_id] = time.perf_counter()
+        if result.degraded or self.content_expert.is_fallback_content(node, result.content):
+            self.failed.append(node.node_id)
+        super()._record_node(thread_id, node, result, outputs)
+
+
+async def run_once(pipeline: TimedPipeline, request, policy: str) -> Dict[str, float]:
+    """
+    Generate one page with `policy` and return its timing metrics (seconds).
+
+    Raises:
+        RuntimeError: The run failed, a node fell back to placeholder content,
+            or no LLM call was made (e.g. unreachable provider)
+    """
+    request = request.model_copy(update={"scheduling_policy": policy})
+    pipeline.finished = {}
+    pipeline.failed = []
+    calls = 0
+
+    async for event in pipeline.arun_streaming(request):
+        if event.type == StreamingEventType.ERROR:
+            raise RuntimeError(event.data)
+        if event.type == StreamingEventType.COMPLETE:
+            calls = ((event.data.get("token_usage") or {}).get("total") or {}).get("calls", 0)
+
+    if pipeline.failed:
+        raise RuntimeError(f"{len(pipeline.failed)} node(s) fell back to placeholder content "
+                           f"({', '.join(pipeline.failed)}); check the provider settings")
+    if calls == 0:
+        raise RuntimeError("The run recorded no LLM calls (unreachable provider, or one that reports "
+                           "no token usage); check the provider settings - GLM_API_KEY in .env "
+                           "takes precedence over LLM_PROVIDER")
+
+    skeleton = pipeline.skeleton
+    nodes = [node for section in skeleton.sections for node in section.nodes]
+    done = {node_id: t - pipeline.started for node_id, t in pipeline.finished.items()}
+    viewport_ids = [node.node_id for node in skeleton.sections[0].nodes]
+    total_importance = sum(node.importance for node in nodes) or 1.0
+
+    return {
+        "first_block": min(done.values()),
+        "viewport": max(done[node_id] for node_id in viewport_ids),
+        "weighted": sum(node.importance * done[node.node_id] for node in nodes) / total_importance,
+        "makespan": max(done.values()),
+        "nodes": len(nodes)
+    }
+
+
+async def benchmark(set_numbers: List[int], policies: List[str], repeats: int) -> Dict[str, Dict[str, float]]:
+    """Mean metrics per policy over every (evaluation set, repeat)."""
+    pipeline = TimedPipeline()
+    pipeline.pages = None        # Incremental reuse would skip the generation we measure
+    pipeline.checkpoints = None
+
+    requests = [convert_evaluation_set_to_request(EVALUATION_SETS[n - 1]) for n in set_numbers]
+
+    # Warm-up: feeds the output length model longest_first relies on
+    print("\n🔥 Warm-up run...")
+    await run_once(pipeline, requests[0], policies[0])
+
+    results: Dict[str, List[Dict[str, float]]] = {policy: [] for policy in policies}
+    for repeat in range(repeats):
+        for request in requests:
+            # Rotate the policy order so no policy always runs on a cold provider
+            for policy in policies[repeat % len(policies):] + policies[:repeat % len(policies)]:
+                results[policy].append(await run_once(pipeline, request, policy))
+
+    return {
+        policy: {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+        for policy, runs in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming node scheduling policies")
+    parser.add_argument("--sets", default="1,2,3", help="Evaluation set numbers (1-based, comma-separated)")
+    parser.add_argument("--policies", default=",".join(SCHEDULING_POLICIES), help="Policies to compare")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent node workers (LLM_MAX_CONCURRENCY)")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if args.workers:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.workers)
+
+    set_numbers = [int(n) for n in args.sets.split(",") if n.strip()]
+    policies = [p.strip() for p in args.policies.split(",") if p.strip()]
+
+    summary = asyncio.run(benchmark(set_numbers, policies, args.repeats))
+
+    print("\n" + "=" * 70)
+    print("📊 Scheduling policy benchmark (seconds, lower is better)")
+    print("=" * 70)
+    print(f"{'policy':<18}{'first_block':>12}{'viewport':>10}{'weighted':>10}{'makespan':>10}")
+    for policy, metrics in summary.items():
+        print(f"{policy:<18}{metrics['first_block']:>12.2f}{metrics['viewport']:>10.2f}"
+              f"{metrics['weighted']:>10.2f}{metrics['makespan']:>10.2f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"sets": set_numbers, "repeats": args.repeats, "results": summary}, f, indent=2)
+        print(f"\n💾 Results saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
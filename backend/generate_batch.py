@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Batch Page Generation (non-interactive)
+
+Generates many pages with ContentGenerationPipeline.run_many(): all nodes of
+all pages share one rate-limited worker pool. Each page is saved to
+public/pages/<page_id>.json as it completes and one result line is appended
+to the results NDJSON file.
+
+Inputs:
+- a directory of *.json files, one GenerationRequest each
+- an NDJSON / JSONL file, one GenerationRequest per line
+- --evaluation-sets all|1,3,5: the built-in evaluation sets
+
+Usage:
+    python generate_batch.py --evaluation-sets all
+    python generate_batch.py requests/ --concurrency 6 --results output/batch.ndjson
+    python generate_batch.py pages.ndjson --policy longest_first
+
+Exit code: 0 if every page succeeded, 1 otherwise.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.schemas import GenerationRequest, GenerationResponse
+from workflows.pipeline import create_pipeline
+
+
+def load_requests(source: str) -> List[Tuple[str, GenerationRequest]]:
+    """
+    Read (label, request) pairs from a directory of JSON files or an NDJSON file.
+
+    Args:
+        source: Directory or .ndjson / .jsonl file
+
+    Returns:
+        Requests in file / line order, labelled with where they came from
+    """
+    requests = []
+
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith(".json"):
+                with open(os.path.join(source, name), encoding="utf-8") as f:
+                    requests.append((name, GenerationRequest.model_validate_json(f.read())))
+        return requests
+
+    with open(source, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                requests.append((f"{os.path.basename(source)}:{line_number}",
+                                 GenerationRequest.model_validate_json(line)))
+    return requests
+
+
+def load_evaluation_sets(selection: str) -> List[Tuple[str, GenerationRequest]]:
+    """Requests for the built-in evaluation sets ('all' or 1-based numbers, comma-separated)."""
+    from batch_evaluation import convert_evaluation_set_to_request
+    from evaluation_set import EVALUATION_SETS
+
+    if selection.strip().lower() == "all":
+        chosen = EVALUATION_SETS
+    else:
+        chosen = [EVALUATION_SETS[int(n) - 1] for n in selection.split(",") if n.strip()]
+
+    return [(eval_set["set_id"], convert_evaluation_set_to_request(eval_set)) for eval_set in chosen]
+
+
+def result_line(label: str, response: GenerationResponse) -> dict:
+    """One NDJSON result record."""
+    page_id = response.page_schema.page_id if response.page_schema else None
+    return {
+        "source": label,
+        "success": response.success,
+        "page_id": page_id,
+        "saved_to": f"public/pages/{page_id}.json" if page_id else None,
+        "generation_time": response.generation_time_seconds,
+        "tokens_used": response.tokens_used,
+        "error": response.error
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate many pages through one shared worker pool")
+    parser.add_argument("source", nargs="?", help="Directory of request JSON files, or an NDJSON file")
+    parser.add_argument("--evaluation-sets", default=None, help="'all' or evaluation set numbers, e.g. 1,3,5")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Node generations in flight across all pages (default: provider max_concurrency)")
+    parser.add_argument("--max-pages", type=int, default=None, help="Pages open at once (default: 2 x concurrency)")
+    parser.add_argument("--policy", default=None, help="Scheduling policy for requests that do not set one")
+    parser.add_argument("--results", default=None,
+                        help="Results NDJSON file (default: output/batch_results_<timestamp>.ndjson)")
+    args = parser.parse_args()
+
+    if bool(args.source) == bool(args.evaluation_sets):
+        parser.error("give either a source or --evaluation-sets")
+
+    labelled = load_evaluation_sets(args.evaluation_sets) if args.evaluation_sets else load_requests(args.source)
+    if not labelled:
+        print("❌ No requests found")
+        sys.exit(1)
+
+    labels = [label for label, _ in labelled]
+    requests = [request for _, request in labelled]
+    if args.policy:
+        requests = [
+            request if request.scheduling_policy else request.model_copy(update={"scheduling_policy": args.policy})
+            for request in requests
+        ]
+
+    results_path = args.results or f"output/batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+
+    print(f"\n🚀 Generating {len(requests)} pages")
+    print(f"📝 Results: {results_path}")
+
+    pipeline = create_pipeline()
+    start_time = time.time()
+
+    with open(results_path, "w", encoding="utf-8") as results_file:
+        def on_result(index: int, response: GenerationResponse) -> None:
+            results_file.write(json.dumps(result_line(labels[index], response), ensure_ascii=False) + "\n")
+            results_file.flush()
+
+        responses = pipeline.run_many(
+            requests,
+            max_concurrency=args.concurrency,
+            max_pages=args.max_pages,
+            on_result=on_result
+        )
+
+    total_time = time.time() - start_time
+    failed = [(label, r) for label, r in zip(labels, responses, strict=True) if not r.success]
+
+    print("\n" + "=" * 70)
+    print("📊 Batch summary")
+    print("=" * 70)
+    print(f"✅ Succeeded: {len(responses) - len(failed)}")
+    print(f"❌ Failed: {len(failed)}")
+    print(f"⏱️  Total time: {total_time:.1f}s")
+    print(f"🔢 Tokens: {sum(r.tokens_used or 0 for r in responses)}")
+    for label, response in failed:
+        print(f"   - {label}: {response.error}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
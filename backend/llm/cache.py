@@ -0,0 +1,255 @@
+"""
+Disk-backed LLM Response Cache
+
+Content-addressed cache for chat completions:
+- Key: SHA-256 of (provider, model, temperature, max_tokens, messages, call options)
+- Storage: single SQLite file (WAL mode, safe to share between threads)
+- Eviction: TTL on read + LRU by last access when the size limit is exceeded
+- Stats: hit / miss / eviction counters for monitoring
+
+Enable with LLM_CACHE_ENABLED=true (see .env.example).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with LRU size limit and TTL eviction.
+
+    One instance is shared by every agent in the process (see get_response_cache()).
+    """
+
+    # Run expired-entry cleanup every N writes
+    PURGE_INTERVAL = 100
+
+    def __init__(
+        self,
+        path: str = "./cache/llm_cache.sqlite3",
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path
+            max_bytes: Total payload size limit before LRU eviction kicks in
+            ttl_seconds: Entries older than this are treated as misses and deleted
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+
+        self._total_bytes = 0
+        self.purge_expired()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        """
+        Build a cache from environment variables, or None if disabled.
+
+        Environment variables:
+            LLM_CACHE_ENABLED: true/false (default: false)
+            LLM_CACHE_PATH: SQLite file (default: ./cache/llm_cache.sqlite3)
+            LLM_CACHE_MAX_MB: Size limit in MB (default: 256)
+            LLM_CACHE_TTL_SECONDS: Entry lifetime (default: 604800 = 7 days)
+        """
+        if os.getenv("LLM_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+
+        return cls(
+            path=os.getenv("LLM_CACHE_PATH", "./cache/llm_cache.sqlite3"),
+            max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        )
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Content-address a request payload (canonical JSON → SHA-256)."""
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        """Return the cached message for key, or None on miss/expiry."""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, size, created_at = row
+
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+
+        return messages_from_dict([json.loads(value)])[0]
+
+    def put(self, key: str, message: BaseMessage) -> None:
+        """Store a response message under key, evicting LRU entries if needed."""
+        value = json.dumps(message_to_dict(message), ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if previous:
+                self._total_bytes -= previous[0]
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total_bytes += size
+            self._writes += 1
+
+            if self._total_bytes > self.max_bytes:
+                self._evict_lru()
+
+        if self._writes % self.PURGE_INTERVAL == 0:
+            self.purge_expired()
+
+    def _evict_lru(self) -> None:
+        """Drop least-recently-used entries until under 90% of max_bytes (lock held)."""
+        target = int(self.max_bytes * 0.9)
+        to_free = self._total_bytes - target
+
+        victims = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ):
+            if freed >= to_free:
+                break
+            victims.append((key,))
+            freed += size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._total_bytes -= freed
+        self.evictions += len(victims)
+
+    def purge_expired(self) -> int:
+        """Delete all entries past their TTL. Returns number of rows removed."""
+        if not self.ttl_seconds:
+            return 0
+
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            freed = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses WHERE created_at < ?", (cutoff,)
+            ).fetchone()[0]
+            removed = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (cutoff,)
+            ).rowcount
+            self._total_bytes -= freed
+            self.expirations += removed
+
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": entries,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+# ============ Process-wide Instance ============
+
+_cache_lock = threading.Lock()
+_cache_loaded = False
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide response cache (created from env on first use).
+
+    Returns:
+        Shared LLMResponseCache, or None when LLM_CACHE_ENABLED is off
+    """
+    global _cache_loaded, _response_cache
+
+    with _cache_lock:
+        if not _cache_loaded:
+            _response_cache = LLMResponseCache.from_env()
+            _cache_loaded = True
+            if _response_cache:
+                print(f"💾 LLM response cache enabled: {_response_cache.path}")
+
+    return _response_cache
@@ -0,0 +1,131 @@
+"""
+Generation Cancellation
+
+A CancellationToken belongs to one run (e.g. one SSE stream). Whoever owns
+the run calls token.cancel() - typically because the client disconnected -
+and from then on:
+- every LLM call made under the token (ManagedChatModel.invoke / ainvoke,
+  including retries) raises GenerationCancelled before reaching the provider
+- a blocking call already in flight stops at its next streamed chunk
+  (ManagedChatModel.invoke streams while a token is active); it cannot be
+  interrupted while still waiting for the first token
+- callbacks registered with on_cancel() run, so a pipeline can cancel its
+  in-flight asyncio tasks (which aborts their HTTP requests)
+
+The token is found through a ContextVar, like usage scopes, so it follows
+asyncio tasks and worker threads started with contextvars.copy_context():
+
+    token = CancellationToken()
+    with cancellation_scope(token):
+        skeleton = planner.plan(request)
+
+GenerationCancelled derives from BaseException (like asyncio.CancelledError)
+so the agents' `except Exception` fallbacks and the failover / retry logic
+let it through instead of treating it as a provider failure.
+"""
+
+import threading
+import contextvars
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+
+class GenerationCancelled(BaseException):
+    """Raised inside a run whose CancellationToken was cancelled."""
+
+    def __init__(self, reason: str = "cancelled"):
+        self.reason = reason
+        super().__init__(f"Generation cancelled: {reason}")
+
+
+class CancellationToken:
+    """Thread-safe, one-shot cancellation flag of one run."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """
+        Cancel the run (later calls are no-ops).
+
+        Returns:
+            True if this call cancelled the run
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        print(f"🛑 Generation cancelled: {reason}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Cancellation callback failed: {e}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Run `callback` on cancel (immediately if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def child(self) -> "CancellationToken":
+        """Token for one part of the run: cancelled with this one, or on its own."""
+        child = CancellationToken()
+        self.on_cancel(lambda: child.cancel(self.reason or "cancelled"))
+        return child
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise GenerationCancelled(self.reason or "cancelled")
+
+
+# Token of the current call chain
+_current: ContextVar[Optional[CancellationToken]] = ContextVar("generation_cancellation", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]) -> Iterator[None]:
+    """Make LLM calls inside the block honour `token` (None: no-op)."""
+    if token is None:
+        yield
+        return
+
+    reset = _current.set(token)
+    try:
+        yield
+    finally:
+        _current.reset(reset)
+
+
+def cancellable_context(token: Optional[CancellationToken]) -> contextvars.Context:
+    """Copy of the current context with `token` installed (for executor / task workers)."""
+    context = contextvars.copy_context()
+    if token is not None:
+        context.run(_current.set, token)
+    return context
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Token of the current call chain (None outside a cancellable run)."""
+    return _current.get()
+
+
+def check_cancelled() -> None:
+    """Raise GenerationCancelled if the current run was cancelled."""
+    token = _current.get()
+    if token is not None:
+        token.raise_if_cancelled()
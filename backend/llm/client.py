@@ -7,11 +7,51 @@ Supports:
 - SiliconFlow (OpenAI-compatible)
 - GLM (智谱)
 - Any other OpenAI-compatible API
+
+Every client returned by create_llm() is a ManagedChatModel: a thin wrapper
+around ChatOpenAI that adds a disk-backed response cache (llm/cache.py),
+a shared RPM/TPM token-bucket limiter per provider (llm/rate_limit.py),
+retries with a per-provider circuit breaker (llm/resilience.py), token
+usage accounting from the provider's usage metadata (llm/usage.py),
+run cancellation (llm/cancellation.py) and optional JSON-mode /
+JSON-schema output (llm/structured.py).
+
+Agents get their client from the process-wide LLMClientRegistry (get_llm /
+create_llm_from_env), so all agents and pipelines share one ChatOpenAI and
+one keep-alive HTTP connection pool per configuration (async pools: one per
+event loop, since an httpx.AsyncClient only works on the loop that first
+used it). With LLM_PROVIDERS
+set, create_llm_from_env() returns a FailoverChatModel (llm/failover.py)
+spanning the configured providers.
 """
 
 import os
-from typing import Optional, Literal, Dict
+import time
+import asyncio
+import weakref
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Literal, Dict, List, Tuple, Union
+
+import httpx
 from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessage, BaseMessage, message_chunk_to_message
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from llm.cache import LLMResponseCache, get_response_cache
+from llm.failover import FailoverChatModel
+from llm.rate_limit import RateLimiter, get_rate_limiter, get_rate_limiter_stats
+from llm.resilience import ResilienceGuard, get_resilience_guard, get_resilience_stats
+from llm.usage import record_usage, get_usage_stats
+from llm.cancellation import check_cancelled, current_token
+from llm.structured import normalize_mode, response_format_for, get_parse_stats
+
+
+def _env_int(name: str) -> Optional[int]:
+    """Read an optional integer environment variable."""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
 
 
 class LLMConfig:
@@ -42,6 +82,26 @@ class LLMConfig:
         "custom": ""
     }
 
+    # Default (requests/min, tokens/min) per provider - conservative entry-tier
+    # quotas; override with LLM_RPM / LLM_TPM to match your account
+    DEFAULT_RATE_LIMITS: Dict[str, Tuple[Optional[int], Optional[int]]] = {
+        "openai": (500, 200000),
+        "azure": (300, 120000),
+        "siliconflow": (1000, 50000),
+        "glm": (300, 100000),
+        "custom": (None, None)  # Unknown quota: unlimited unless LLM_RPM / LLM_TPM are set
+    }
+
+    # Default number of concurrent requests per provider (per-node generation
+    # in streaming mode); override with LLM_MAX_CONCURRENCY
+    DEFAULT_MAX_CONCURRENCY: Dict[str, int] = {
+        "openai": 8,
+        "azure": 6,
+        "siliconflow": 8,
+        "glm": 4,
+        "custom": 4
+    }
+
     @classmethod
     def from_env(cls):
         """Load configuration from environment variables"""
@@ -55,7 +115,11 @@ class LLMConfig:
                 base_url=os.getenv("GLM_BASE_URL", "https://open.bigmodel.cn/api/paas/v4/"),
                 model=os.getenv("GLM_MODEL", "glm-4-flash"),
                 temperature=float(os.getenv("LLM_TEMPERATURE", "0.3")),
-                max_tokens=int(os.getenv("LLM_MAX_TOKENS", "4096"))
+                max_tokens=int(os.getenv("LLM_MAX_TOKENS", "4096")),
+                rpm=_env_int("LLM_RPM"),
+                tpm=_env_int("LLM_TPM"),
+                structured_output=os.getenv("LLM_STRUCTURED_OUTPUT"),
+                max_concurrency=_env_int("LLM_MAX_CONCURRENCY")
             )
 
         return cls(
@@ -64,9 +128,63 @@ class LLMConfig:
             base_url=os.getenv("LLM_BASE_URL", os.getenv("OPENAI_BASE_URL")),
             model=os.getenv("LLM_MODEL"),
             temperature=float(os.getenv("LLM_TEMPERATURE", "0.3")),
-            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "4096"))
+            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "4096")),
+            rpm=_env_int("LLM_RPM"),
+            tpm=_env_int("LLM_TPM"),
+            structured_output=os.getenv("LLM_STRUCTURED_OUTPUT"),
+            max_concurrency=_env_int("LLM_MAX_CONCURRENCY")
         )
 
+    @classmethod
+    def from_env_for(cls, provider: str):
+        """
+        Load one provider's configuration from prefixed environment variables.
+
+        Reads {PROVIDER}_API_KEY, {PROVIDER}_BASE_URL, {PROVIDER}_MODEL,
+        {PROVIDER}_RPM, {PROVIDER}_TPM, {PROVIDER}_STRUCTURED_OUTPUT and
+        {PROVIDER}_MAX_CONCURRENCY (e.g. GLM_API_KEY, OPENAI_BASE_URL).
+        Temperature and max tokens are shared (LLM_TEMPERATURE / LLM_MAX_TOKENS);
+        structured output and concurrency fall back to the LLM_* variables.
+        """
+        prefix = provider.upper()
+        return cls(
+            provider=provider,
+            api_key=os.getenv(f"{prefix}_API_KEY", ""),
+            base_url=os.getenv(f"{prefix}_BASE_URL"),
+            model=os.getenv(f"{prefix}_MODEL"),
+            temperature=float(os.getenv("LLM_TEMPERATURE", "0.3")),
+            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "4096")),
+            rpm=_env_int(f"{prefix}_RPM"),
+            tpm=_env_int(f"{prefix}_TPM"),
+            structured_output=os.getenv(
+                f"{prefix}_STRUCTURED_OUTPUT", os.getenv("LLM_STRUCTURED_OUTPUT")
+            ),
+            max_concurrency=_env_int(f"{prefix}_MAX_CONCURRENCY") or _env_int("LLM_MAX_CONCURRENCY")
+        )
+
+    @classmethod
+    def list_from_env(cls) -> List["LLMConfig"]:
+        """
+        Ordered provider list for failover.
+
+        LLM_PROVIDERS is a comma-separated priority list (e.g. "siliconflow,glm,openai");
+        each entry is configured via from_env_for(). Entries without an API key
+        are skipped. Without LLM_PROVIDERS this is just [from_env()].
+        """
+        names = [n.strip() for n in os.getenv("LLM_PROVIDERS", "").split(",") if n.strip()]
+        if not names:
+            return [cls.from_env()]
+
+        configs = []
+        for name in names:
+            config = cls.from_env_for(name)
+            if not config.api_key:
+                print(f"⚠️  Skipping LLM provider '{name}': {name.upper()}_API_KEY not set")
+                continue
+            configs.append(config)
+
+        return configs or [cls.from_env()]
+
     def __init__(
         self,
         provider: str = "custom",
@@ -74,7 +192,11 @@ class LLMConfig:
         base_url: Optional[str] = None,
         model: Optional[str] = None,
         temperature: float = 0.3,
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        structured_output: Optional[str] = None,
+        max_concurrency: Optional[int] = None
     ):
         self.provider = provider
         self.api_key = api_key
@@ -83,6 +205,34 @@ class LLMConfig:
         self.temperature = temperature
         self.max_tokens = max_tokens
 
+        # Rate limits (0 disables a limit; None falls back to provider defaults)
+        default_rpm, default_tpm = self.DEFAULT_RATE_LIMITS.get(provider, (None, None))
+        self.rpm = default_rpm if rpm is None else rpm
+        self.tpm = default_tpm if tpm is None else tpm
+
+        # off / json_object / json_schema (see llm/structured.py)
+        self.structured_output = normalize_mode(structured_output)
+
+        # Concurrent requests the pipeline may keep in flight against this provider
+        self.max_concurrency = max(1, max_concurrency or self.DEFAULT_MAX_CONCURRENCY.get(provider, 4))
+
+    @property
+    def effective_base_url(self) -> str:
+        """Base URL actually used for requests (explicit, provider default, or OpenAI)."""
+        return self.base_url or self.BASE_URLS.get(self.provider) or self.BASE_URLS["openai"]
+
+    def key(self) -> Tuple:
+        """Hashable identity used by the client registry."""
+        return (
+            self.provider,
+            self.api_key,
+            self.effective_base_url,
+            self.model,
+            self.temperature,
+            self.max_tokens,
+            self.structured_output
+        )
+
     def validate(self):
         """Validate configuration"""
         if not self.api_key:
@@ -95,43 +245,619 @@ class LLMConfig:
             )
 
 
-def create_llm(config: Optional[LLMConfig] = None) -> ChatOpenAI:
+# ============ Managed Client ============
+
+class ManagedChatModel(Runnable):
+    """
+    ChatOpenAI wrapper used by all agents.
+
+    Drop-in for the agents' `self.llm.invoke(messages)` / `ainvoke(messages)`
+    calls. Responses are looked up in the shared response cache before the
+    provider is called, and provider calls wait on the shared rate limiter
+    only when the RPM/TPM budget is exhausted. Transient failures are retried
+    with backoff behind a per-provider circuit breaker. An `output_schema`
+    kwarg (Pydantic model) becomes a provider response_format when the
+    configured structured output mode allows it. Anything not
+    overridden here (bind, model_name, ...) is delegated to the
+    wrapped ChatOpenAI.
+
+    Async calls go through a ChatOpenAI bound to the running event loop's
+    connection pool (built on first use per loop by `async_llm_factory`),
+    so the client keeps working across asyncio.run() calls.
+    """
+
+    # Guards the per-loop async ChatOpenAI map (shared by with_model() views)
+    _async_lock = threading.Lock()
+
+    def __init__(
+        self,
+        llm: ChatOpenAI,
+        config: LLMConfig,
+        cache: Optional[LLMResponseCache] = None,
+        model_override: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        guard: Optional[ResilienceGuard] = None,
+        async_llm_factory: Optional[Callable[[], ChatOpenAI]] = None
+    ):
+        self.llm = llm
+        self.config = config
+        self.cache = cache
+        self.model_override = model_override
+        self.rate_limiter = rate_limiter
+        self.guard = guard
+        self.async_llm_factory = async_llm_factory
+        self._async_llms: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ChatOpenAI]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def with_model(self, model: str) -> "ManagedChatModel":
+        """
+        View of this client that calls a different model.
+
+        Shares the underlying ChatOpenAI and its connection pool; the model
+        name is passed per call instead of building a new client.
+        """
+        if model == (self.model_override or self.config.model):
+            return self
+        view = ManagedChatModel(
+            self.llm,
+            self.config,
+            cache=self.cache,
+            model_override=model,
+            rate_limiter=self.rate_limiter,
+            guard=self.guard,
+            async_llm_factory=self.async_llm_factory
+        )
+        view._async_llms = self._async_llms
+        return view
+
+    def _async_llm(self) -> ChatOpenAI:
+        """ChatOpenAI bound to the running event loop's connection pool."""
+        if self.async_llm_factory is None:
+            return self.llm
+
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            llm = self._async_llms.get(loop)
+        if llm is None:
+            llm = self.async_llm_factory()
+            with self._async_lock:
+                llm = self._async_llms.setdefault(loop, llm)
+        return llm
+
+    def _call_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the model override and structured output mode to per-call kwargs."""
+        kwargs = dict(kwargs)
+        response_format = response_format_for(
+            kwargs.pop("output_schema", None), self.config.structured_output
+        )
+        if response_format and "response_format" not in kwargs:
+            kwargs["response_format"] = response_format
+        if self.model_override and "model" not in kwargs:
+            kwargs["model"] = self.model_override
+        return kwargs
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def _to_messages(self, input: Any) -> List[BaseMessage]:
+        """Normalize str / PromptValue / message list input to a message list."""
+        return self.llm._convert_input(input).to_messages()
+
+    def _cache_key(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> Optional[str]:
+        """Build the content-addressed cache key for a call (None if cache disabled)."""
+        if self.cache is None:
+            return None
+
+        return LLMResponseCache.make_key({
+            "provider": self.config.provider,
+            "model": kwargs.get("model", self.config.model),
+            "temperature": kwargs.get("temperature", self.config.temperature),
+            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
+            "messages": [
+                {"role": m.type, "content": m.content}
+                for m in messages
+            ],
+            "options": {k: v for k, v in sorted(kwargs.items())
+                        if k not in ("model", "temperature", "max_tokens")}
+        })
+
+    def _reserve(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> Optional[int]:
+        """Token reservation for the rate limiter (None if unlimited)."""
+        if self.rate_limiter is None:
+            return None
+        max_tokens = kwargs.get("max_tokens", self.config.max_tokens)
+        return self.rate_limiter.estimate_tokens(messages, max_tokens)
+
+    def _settle(self, reserved: Optional[int], response: Optional[BaseMessage]) -> None:
+        """
+        Record provider-reported usage and settle the rate-limit reservation.
+
+        Charges the reported usage (the estimate if the provider reports none);
+        a failed attempt (no response) gives its reservation back.
+        """
+        actual = 0
+        if response is not None:
+            record_usage(response)
+            actual = (getattr(response, "usage_metadata", None) or {}).get("total_tokens")
+
+        if reserved is not None:
+            self.rate_limiter.reconcile(reserved, actual)
+
+    def _record_latency(self, seconds: float) -> None:
+        """Feed provider latency (excluding cache hits and limiter waits) to the guard."""
+        if self.guard is not None:
+            self.guard.latency.record(seconds)
+
+    def _invoke_cancellable(
+        self,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig],
+        kwargs: Dict[str, Any]
+    ) -> BaseMessage:
+        """
+        Blocking call of a cancellable run, made as a stream so a cancel stops
+        it at the next chunk (closing the stream drops the HTTP request).
+        """
+        response = None
+        chunks = self.llm.stream(messages, config, stream_usage=True, **kwargs)
+        try:
+            for chunk in chunks:
+                check_cancelled()
+                response = chunk if response is None else response + chunk
+        finally:
+            chunks.close()
+        return message_chunk_to_message(response) if response is not None else AIMessage(content="")
+
+    def invoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any
+    ) -> BaseMessage:
+        """Call the model, serving from cache when possible and retrying transient errors."""
+        kwargs = self._call_kwargs(kwargs)
+        messages = self._to_messages(input)
+        key = self._cache_key(messages, kwargs)
+
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        def attempt() -> BaseMessage:
+            # Also stops retries of a run cancelled during the backoff
+            check_cancelled()
+            reserved = self._reserve(messages, kwargs)
+            if reserved is not None:
+                self.rate_limiter.acquire(reserved)
+
+            result = None
+            try:
+                started = time.perf_counter()
+                if current_token() is None:
+                    result = self.llm.invoke(messages, config, **kwargs)
+                else:
+                    result = self._invoke_cancellable(messages, config, kwargs)
+                self._record_latency(time.perf_counter() - started)
+            finally:
+                self._settle(reserved, result)
+            return result
+
+        response = self.guard.call(attempt) if self.guard else attempt()
+
+        if key:
+            self.cache.put(key, response)
+
+        return response
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any
+    ) -> BaseMessage:
+        """Async variant of invoke()."""
+        kwargs = self._call_kwargs(kwargs)
+        messages = self._to_messages(input)
+        key = self._cache_key(messages, kwargs)
+
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def attempt() -> BaseMessage:
+            check_cancelled()
+            reserved = self._reserve(messages, kwargs)
+            if reserved is not None:
+                await self.rate_limiter.aacquire(reserved)
+
+            result = None
+            try:
+                started = time.perf_counter()
+                result = await self._async_llm().ainvoke(messages, config, **kwargs)
+                self._record_latency(time.perf_counter() - started)
+            finally:
+                self._settle(reserved, result)
+            return result
+
+        response = await (self.guard.acall(attempt) if self.guard else attempt())
+
+        if key:
+            self.cache.put(key, response)
+
+        return response
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        """Token streaming bypasses the cache; stops at the next chunk once the run is cancelled."""
+        chunks = self.llm.stream(input, config, **self._call_kwargs(kwargs))
+        try:
+            for chunk in chunks:
+                check_cancelled()
+                yield chunk
+        finally:
+            chunks.close()
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        """Async token streaming bypasses the cache; stops at the next chunk once the run is cancelled."""
+        chunks = self._async_llm().astream(input, config, **self._call_kwargs(kwargs))
+        try:
+            async for chunk in chunks:
+                check_cancelled()
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+
+# ============ Client Registry ============
+
+class LLMClientRegistry:
+    """
+    Process-wide registry of shared LLM clients.
+
+    - One ManagedChatModel per LLMConfig (agents and pipelines share it)
+    - One keep-alive httpx connection pool per base URL: the sync pool is
+      process-wide, async pools exist per event loop (an httpx.AsyncClient
+      is bound to the loop that first used it)
+    - HTTP/2 when the optional `h2` package is installed
+    - warm_up() / awarm_up() pre-open TLS connections at API startup
+    """
+
+    # Warm-up is best-effort; never hold up startup for long
+    WARM_UP_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 120.0,
+        timeout: float = 120.0,
+        http2: Optional[bool] = None,
+        warm_connections: int = 2
+    ):
+        """
+        Args:
+            max_connections: Pool size per base URL
+            max_keepalive_connections: Idle connections kept open per base URL
+            keepalive_expiry: Seconds an idle connection is kept alive
+            timeout: Request timeout in seconds
+            http2: Use HTTP/2 (None = auto-detect the `h2` package)
+            warm_connections: Connections opened per pool by warm_up()
+        """
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.http2 = http2
+        self.warm_connections = warm_connections
+
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple, ManagedChatModel] = {}
+        self._failover_clients: Dict[Tuple, FailoverChatModel] = {}
+        self._http_clients: Dict[str, httpx.Client] = {}
+        self._async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def from_env(cls) -> "LLMClientRegistry":
+        """
+        Build a registry from environment variables.
+
+        Environment variables:
+            LLM_POOL_MAX_CONNECTIONS: Pool size per base URL (default: 50)
+            LLM_POOL_MAX_KEEPALIVE: Idle keep-alive connections (default: 20)
+            LLM_POOL_KEEPALIVE_EXPIRY: Idle connection lifetime in seconds (default: 120)
+            LLM_REQUEST_TIMEOUT: Request timeout in seconds (default: 120)
+            LLM_HTTP2: true/false (default: auto-detect `h2`)
+            LLM_POOL_WARM_CONNECTIONS: Connections opened at startup (default: 2)
+        """
+        http2_env = os.getenv("LLM_HTTP2")
+        return cls(
+            max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "120")),
+            timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "120")),
+            http2=None if http2_env is None else http2_env.lower() in ("1", "true", "yes"),
+            warm_connections=int(os.getenv("LLM_POOL_WARM_CONNECTIONS", "2"))
+        )
+
+    def http_client(self, base_url: str) -> httpx.Client:
+        """Shared sync httpx client for a base URL (process-wide)."""
+        with self._lock:
+            if base_url not in self._http_clients:
+                self._http_clients[base_url] = httpx.Client(
+                    limits=self.limits, timeout=self.timeout, http2=self.http2
+                )
+            return self._http_clients[base_url]
+
+    def async_http_client(self, base_url: str) -> httpx.AsyncClient:
+        """Async httpx client for a base URL on the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_http_clients.setdefault(loop, {})
+            if base_url not in clients:
+                clients[base_url] = httpx.AsyncClient(
+                    limits=self.limits, timeout=self.timeout, http2=self.http2
+                )
+            return clients[base_url]
+
+    def get(self, config: Optional[LLMConfig] = None, model: Optional[str] = None) -> ManagedChatModel:
+        """
+        Return the shared client for a configuration.
+
+        Args:
+            config: LLM configuration. If None, loads from environment.
+            model: Optional per-request model override (no new client is built)
+
+        Returns:
+            Shared ManagedChatModel
+        """
+        if config is None:
+            config = LLMConfig.from_env()
+
+        key = config.key()
+        with self._lock:
+            client = self._clients.get(key)
+
+        if client is None:
+            client = create_llm(config, registry=self)
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+
+        return client.with_model(model) if model else client
+
+    def get_failover(self, configs: List[LLMConfig]) -> FailoverChatModel:
+        """
+        Return the shared failover client for an ordered provider list.
+
+        Args:
+            configs: Provider configurations in priority order
+
+        Returns:
+            Shared FailoverChatModel over one shared client per provider
+        """
+        key = tuple(config.key() for config in configs)
+        with self._lock:
+            client = self._failover_clients.get(key)
+
+        if client is None:
+            client = FailoverChatModel.from_env([self.get(config) for config in configs])
+            with self._lock:
+                client = self._failover_clients.setdefault(key, client)
+
+        return client
+
+    def _warm_up_targets(self) -> List[Tuple[str, str]]:
+        """(base_url, api_key) pairs for every registered client."""
+        with self._lock:
+            return list({
+                (c.config.effective_base_url, c.config.api_key)
+                for c in self._clients.values()
+            })
+
+    def warm_up(self) -> int:
+        """
+        Open keep-alive connections to every registered provider (blocking).
+
+        Sends lightweight GET /models requests so TLS handshakes happen before
+        the first generation. Failures are ignored.
+
+        Returns:
+            Number of warm-up requests that got an HTTP response
+        """
+        def ping(base_url: str, api_key: str) -> bool:
+            sync_client = self.http_client(base_url)
+            try:
+                sync_client.get(
+                    base_url.rstrip("/") + "/models",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    timeout=self.WARM_UP_TIMEOUT
+                )
+                return True
+            except httpx.HTTPError:
+                return False
+
+        jobs = [t for t in self._warm_up_targets() for _ in range(self.warm_connections)]
+        if not jobs:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            return sum(pool.map(lambda t: ping(*t), jobs))
+
+    async def awarm_up(self) -> int:
+        """
+        Warm the running loop's async pools and the sync pools.
+
+        The API serves /generate on the async pools and /generate/stream on
+        the sync pools (run_streaming on worker threads), so both are warmed.
+
+        Returns:
+            Number of warm-up requests that got an HTTP response
+        """
+        async def ping(base_url: str, api_key: str) -> bool:
+            async_client = self.async_http_client(base_url)
+            try:
+                await async_client.get(
+                    base_url.rstrip("/") + "/models",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    timeout=self.WARM_UP_TIMEOUT
+                )
+                return True
+            except httpx.HTTPError:
+                return False
+
+        jobs = [t for t in self._warm_up_targets() for _ in range(self.warm_connections)]
+        results = await asyncio.gather(asyncio.to_thread(self.warm_up), *(ping(*t) for t in jobs))
+        return sum(results)
+
+    async def aclose_loop(self) -> None:
+        """Close the running loop's async pools (call before the loop shuts down)."""
+        with self._lock:
+            async_clients = self._async_http_clients.pop(asyncio.get_running_loop(), {})
+        for async_client in async_clients.values():
+            await async_client.aclose()
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self.aclose_loop()
+        with self._lock:
+            sync_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+            # Pools of other (finished) loops can no longer be closed cleanly
+            self._async_http_clients.clear()
+            self._clients.clear()
+            self._failover_clients.clear()
+
+        for sync_client in sync_clients:
+            sync_client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Registry size and pool settings."""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "connection_pools": len(self._http_clients),
+                "async_connection_pools": sum(len(clients) for clients in self._async_http_clients.values()),
+                "failover": [c.stats() for c in self._failover_clients.values()],
+                "http2": self.http2,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry
+            }
+
+
+_registry_lock = threading.Lock()
+_registry: Optional[LLMClientRegistry] = None
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """Return the process-wide client registry (created from env on first use)."""
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry.from_env()
+        return _registry
+
+
+def get_llm(config: Optional[LLMConfig] = None, model: Optional[str] = None) -> ManagedChatModel:
     """
-    Create a ChatOpenAI instance with the given configuration.
+    Shared client for a configuration (see LLMClientRegistry.get).
 
     Args:
         config: LLM configuration. If None, loads from environment.
+        model: Optional per-request model override
 
     Returns:
-        Configured ChatOpenAI instance
+        Shared ManagedChatModel
+    """
+    return get_llm_registry().get(config, model=model)
+
+
+def get_llm_stats() -> Dict[str, Any]:
+    """Process-wide LLM client statistics (for /llm/stats and logging)."""
+    cache = get_response_cache()
+    return {
+        "cache": cache.stats() if cache else {"enabled": False},
+        "registry": get_llm_registry().stats(),
+        "rate_limits": get_rate_limiter_stats(),
+        "resilience": get_resilience_stats(),
+        "usage": get_usage_stats(),
+        "parsing": get_parse_stats()
+    }
+
+
+def create_llm(
+    config: Optional[LLMConfig] = None,
+    registry: Optional[LLMClientRegistry] = None
+) -> ManagedChatModel:
+    """
+    Create a managed chat model with the given configuration.
+
+    Prefer get_llm() in application code: it returns a shared client.
+
+    Args:
+        config: LLM configuration. If None, loads from environment.
+        registry: Registry whose pooled HTTP connections to use (default: process-wide)
+
+    Returns:
+        ManagedChatModel wrapping a configured ChatOpenAI instance
     """
     if config is None:
         config = LLMConfig.from_env()
 
     config.validate()
 
+    if registry is None:
+        registry = get_llm_registry()
+
+    base_url = config.effective_base_url
+
     # Create ChatOpenAI instance
     kwargs = {
         "model": config.model,
         "api_key": config.api_key,
         "temperature": config.temperature,
         "max_tokens": config.max_tokens,
+        # Retries are handled by ResilienceGuard; avoid retrying twice
+        "max_retries": 0,
     }
 
     # Add base_url if provided (for custom APIs like SiliconFlow)
     if config.base_url:
         kwargs["base_url"] = config.base_url
 
-    llm = ChatOpenAI(**kwargs)
+    llm = ChatOpenAI(**kwargs, http_client=registry.http_client(base_url))
+
+    def async_llm() -> ChatOpenAI:
+        # Called on the loop the client is for (see ManagedChatModel._async_llm)
+        return ChatOpenAI(**kwargs, http_async_client=registry.async_http_client(base_url))
 
-    return llm
+    return ManagedChatModel(
+        llm,
+        config,
+        cache=get_response_cache(),
+        rate_limiter=get_rate_limiter(config),
+        guard=get_resilience_guard(config),
+        async_llm_factory=async_llm
+    )
 
 
 # ============ Convenience Functions ============
 
-def create_llm_from_env() -> ChatOpenAI:
+def create_llm_from_env() -> Union[ManagedChatModel, FailoverChatModel]:
     """
-    Create LLM instance from environment variables.
+    Get the shared LLM client configured from environment variables.
 
     Environment variables:
         LLM_PROVIDER: Provider type (default: custom)
@@ -140,11 +866,21 @@ def create_llm_from_env() -> ChatOpenAI:
         LLM_MODEL: Model name
         LLM_TEMPERATURE: Temperature (default: 0.3)
         LLM_MAX_TOKENS: Max tokens (default: 4096)
+        LLM_CACHE_ENABLED: Enable disk response cache (default: false)
+        LLM_RPM / LLM_TPM: Rate limits (default: per-provider, 0 = unlimited)
+        LLM_MAX_RETRIES: Retries for transient errors (default: 3)
+        LLM_PROVIDERS: Ordered failover list, e.g. "siliconflow,glm" (optional)
+        LLM_STRUCTURED_OUTPUT: off / json_object / json_schema (default: off)
+        LLM_MAX_CONCURRENCY: Concurrent per-node requests (default: per-provider)
 
     Returns:
-        Configured ChatOpenAI instance
+        Shared ManagedChatModel (one per configuration per process), or a
+        shared FailoverChatModel when several providers are configured
     """
-    return create_llm(LLMConfig.from_env())
+    configs = LLMConfig.list_from_env()
+    if len(configs) > 1:
+        return get_llm_registry().get_failover(configs)
+    return get_llm(configs[0])
 
 
 # ============ Example Usage ============
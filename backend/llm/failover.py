@@ -0,0 +1,384 @@
+"""
+Multi-Provider Failover and Hedged Requests
+
+FailoverChatModel fronts an ordered list of ManagedChatModels (one per
+provider, see LLMConfig.list_from_env):
+- Providers are tried in priority order; providers whose circuit breaker is
+  open are skipped
+- A provider that fails (after its own retries) hands over to the next one
+- Optional hedging: if the primary has not answered after its p95 latency,
+  the same request goes to the next provider and the first answer wins;
+  the slower request is cancelled (a blocking one at its next streamed
+  chunk). Sync calls run the primary on the caller's thread; only hedged
+  requests use the hedge thread pool
+
+Enable with LLM_PROVIDERS=... (and LLM_HEDGE_ENABLED=true), see .env.example.
+"""
+
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from llm.resilience import CircuitBreaker
+from llm.cancellation import (
+    CancellationToken,
+    GenerationCancelled,
+    cancellable_context,
+    cancellation_scope,
+    current_token
+)
+
+
+class FailoverState:
+    """Hedge thread pool and counters, shared by a failover client and its with_model() views."""
+
+    def __init__(self, providers: List[str]):
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.calls = 0
+        self.failovers = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.wins: Dict[str, int] = {provider: 0 for provider in providers}
+
+
+class FailoverChatModel(Runnable):
+    """
+    Drop-in replacement for ManagedChatModel spanning several providers.
+
+    Agents call invoke()/ainvoke() exactly as before; everything else
+    (model_name, stream, ...) is delegated to the current primary provider.
+    """
+
+    # Hedge percentile of the primary provider's latency
+    HEDGE_PERCENTILE = 95
+
+    def __init__(
+        self,
+        members: List[Any],
+        hedge: bool = False,
+        hedge_min_delay: float = 1.0,
+        hedge_default_delay: float = 8.0,
+        state: Optional[FailoverState] = None
+    ):
+        """
+        Args:
+            members: ManagedChatModels in priority order
+            hedge: Send a duplicate request to the next provider when the primary is slow
+            hedge_min_delay: Lower bound for the hedge delay (seconds)
+            hedge_default_delay: Hedge delay until enough latency samples exist
+            state: Hedge pool and counters to share (None: new ones)
+        """
+        if not members:
+            raise ValueError("FailoverChatModel needs at least one provider")
+
+        self.members = members
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+
+        self._state = state or FailoverState([m.config.provider for m in members])
+
+    @classmethod
+    def from_env(cls, members: List[Any]) -> "FailoverChatModel":
+        """
+        Build a failover client from environment variables.
+
+        Environment variables:
+            LLM_HEDGE_ENABLED: true/false (default: false)
+            LLM_HEDGE_MIN_DELAY: Minimum hedge delay in seconds (default: 1.0)
+            LLM_HEDGE_DEFAULT_DELAY: Hedge delay before p95 is known (default: 8.0)
+        """
+        return cls(
+            members,
+            hedge=os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+            hedge_min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0")),
+            hedge_default_delay=float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "8.0"))
+        )
+
+    # ============ Provider Selection ============
+
+    @property
+    def config(self):
+        """Configuration of the current primary provider."""
+        return self._available()[0].config
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself
+        if name in ("members", "_state"):
+            raise AttributeError(name)
+        return getattr(self.members[0], name)
+
+    def _available(self) -> List[Any]:
+        """Members whose breaker is not open (all members if every breaker is open)."""
+        available = [
+            m for m in self.members
+            if m.guard is None or m.guard.breaker.state != CircuitBreaker.OPEN
+        ]
+        return available or list(self.members)
+
+    def hedge_delay(self, member: Any) -> float:
+        """Seconds to wait on `member` before sending a hedged request."""
+        p95 = member.guard.latency.percentile(self.HEDGE_PERCENTILE) if member.guard else None
+        if p95 is None:
+            return max(self.hedge_min_delay, self.hedge_default_delay)
+        return max(self.hedge_min_delay, p95)
+
+    def with_model(self, model: str) -> "FailoverChatModel":
+        """
+        Model override applies to the primary provider only (names differ per provider).
+
+        The view shares this client's hedge pool and counters.
+        """
+        members = [self.members[0].with_model(model)] + self.members[1:]
+        return FailoverChatModel(
+            members, self.hedge, self.hedge_min_delay, self.hedge_default_delay, state=self._state
+        )
+
+    def _record(self, winner: Any, hedged: bool = False) -> None:
+        state = self._state
+        with state.lock:
+            state.wins[winner.config.provider] = state.wins.get(winner.config.provider, 0) + 1
+            if hedged:
+                state.hedges_won += 1
+
+    def _log_failover(self, member: Any, error: BaseException) -> None:
+        with self._state.lock:
+            self._state.failovers += 1
+        print(f"⚠️  LLM provider '{member.config.provider}' failed "
+              f"({type(error).__name__}); failing over")
+
+    # ============ Sync Path ============
+
+    def _pool(self) -> ThreadPoolExecutor:
+        state = self._state
+        with state.lock:
+            if state.executor is None:
+                state.executor = ThreadPoolExecutor(
+                    max_workers=max(4, 2 * len(self.members)),
+                    thread_name_prefix="llm-hedge"
+                )
+            return state.executor
+
+    def _hedged_invoke(
+        self,
+        primary: Any,
+        secondary: Any,
+        input: Any,
+        config: Optional[RunnableConfig],
+        kwargs: Dict[str, Any]
+    ) -> BaseMessage:
+        """
+        Race primary (on the calling thread) against a delayed secondary (hedge pool).
+
+        Each side runs under its own child cancellation token. The loser's
+        token is cancelled, so its streamed call stops at the next chunk. A
+        primary that loses while still waiting for its first token holds the
+        calling thread until that token arrives.
+        """
+        parent = current_token()
+        primary_token = parent.child() if parent else CancellationToken()
+        secondary_token = parent.child() if parent else CancellationToken()
+
+        hedge: List[Future] = []
+        hedge_lock = threading.Lock()
+        primary_done = False
+
+        def stop_primary(future: Future) -> None:
+            if future.exception() is None:
+                primary_token.cancel("hedged request won")
+
+        def start_hedge() -> None:
+            # Timer thread: the primary has not answered within the hedge delay
+            with hedge_lock:
+                if primary_done:
+                    return
+                with self._state.lock:
+                    self._state.hedges_sent += 1
+                future = self._pool().submit(
+                    cancellable_context(secondary_token).run, secondary.invoke, input, config, **kwargs
+                )
+                future.add_done_callback(stop_primary)
+                hedge.append(future)
+
+        def finish_primary() -> None:
+            nonlocal primary_done
+            with hedge_lock:
+                primary_done = True
+            timer.cancel()
+
+        timer = threading.Timer(self.hedge_delay(primary), start_hedge)
+        timer.daemon = True
+        timer.start()
+
+        try:
+            with cancellation_scope(primary_token):
+                response = primary.invoke(input, config, **kwargs)
+        except GenerationCancelled:
+            finish_primary()
+            if not hedge or (parent is not None and parent.cancelled):
+                raise
+            # Stopped because the hedged request answered first
+        except Exception as e:
+            finish_primary()
+            self._log_failover(primary, e)
+        else:
+            finish_primary()
+            if hedge:
+                secondary_token.cancel("primary answered first")
+            self._record(primary)
+            return response
+
+        if not hedge:
+            # Primary failed before the hedge delay: plain failover
+            try:
+                response = secondary.invoke(input, config, **kwargs)
+            except Exception as e:
+                self._log_failover(secondary, e)
+                raise
+            self._record(secondary)
+            return response
+
+        try:
+            response = hedge[0].result()
+        except Exception as e:
+            self._log_failover(secondary, e)
+            raise
+        self._record(secondary, hedged=True)
+        return response
+
+    def invoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any
+    ) -> BaseMessage:
+        """Call providers in priority order (hedging the first two if enabled)."""
+        with self._state.lock:
+            self._state.calls += 1
+
+        candidates = self._available()
+        last_error: Optional[BaseException] = None
+
+        if self.hedge and len(candidates) > 1:
+            primary, secondary = candidates[0], candidates[1]
+            try:
+                return self._hedged_invoke(primary, secondary, input, config, kwargs)
+            except Exception as e:
+                last_error = e
+            candidates = candidates[2:]
+
+        for member in candidates:
+            try:
+                response = member.invoke(input, config, **kwargs)
+            except Exception as e:
+                self._log_failover(member, e)
+                last_error = e
+                continue
+            self._record(member)
+            return response
+
+        raise last_error
+
+    # ============ Async Path ============
+
+    async def _ahedged_invoke(
+        self,
+        primary: Any,
+        secondary: Any,
+        input: Any,
+        config: Optional[RunnableConfig],
+        kwargs: Dict[str, Any]
+    ) -> BaseMessage:
+        """Race primary against a delayed secondary; the loser is cancelled."""
+        tasks = {asyncio.ensure_future(primary.ainvoke(input, config, **kwargs)): primary}
+
+        done, _ = await asyncio.wait(set(tasks), timeout=self.hedge_delay(primary))
+        hedged = not done
+        if hedged:
+            with self._state.lock:
+                self._state.hedges_sent += 1
+        if hedged or next(iter(done)).exception() is not None:
+            # Primary is slow (hedge) or already failed (plain failover)
+            tasks[asyncio.ensure_future(secondary.ainvoke(input, config, **kwargs))] = secondary
+
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    member = tasks[task]
+                    error = task.exception()
+                    if error is None:
+                        self._record(member, hedged=hedged and member is secondary)
+                        return task.result()
+                    self._log_failover(member, error)
+                    last_error = error
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any
+    ) -> BaseMessage:
+        """Async variant of invoke()."""
+        with self._state.lock:
+            self._state.calls += 1
+
+        candidates = self._available()
+        last_error: Optional[BaseException] = None
+
+        if self.hedge and len(candidates) > 1:
+            primary, secondary = candidates[0], candidates[1]
+            try:
+                return await self._ahedged_invoke(primary, secondary, input, config, kwargs)
+            except Exception as e:
+                last_error = e
+            candidates = candidates[2:]
+
+        for member in candidates:
+            try:
+                response = await member.ainvoke(input, config, **kwargs)
+            except Exception as e:
+                self._log_failover(member, e)
+                last_error = e
+                continue
+            self._record(member)
+            return response
+
+        raise last_error
+
+    # ============ Streaming ============
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        """Token streaming uses the first available provider (no failover mid-stream)."""
+        return self._available()[0].stream(input, config, **kwargs)
+
+    def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        """Async token streaming uses the first available provider."""
+        return self._available()[0].astream(input, config, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Failover / hedging counters (including every with_model() view)."""
+        state = self._state
+        with state.lock:
+            return {
+                "providers": [m.config.provider for m in self.members],
+                "hedging": self.hedge,
+                "calls": state.calls,
+                "failovers": state.failovers,
+                "hedges_sent": state.hedges_sent,
+                "hedges_won": state.hedges_won,
+                "wins": dict(state.wins)
+            }
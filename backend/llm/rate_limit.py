@@ -0,0 +1,210 @@
+"""
+Shared RPM / TPM Rate Limiting
+
+Token-bucket limiter for provider quotas:
+- One bucket for requests per minute, one for tokens per minute
+- One limiter per provider account, shared by every agent and pipeline
+- Callers only wait when the budget is actually exhausted
+- Token reservations are reconciled with real usage after each call
+
+Limits come from LLMConfig (rpm / tpm, see LLM_RPM / LLM_TPM).
+"""
+
+import time
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously at `rate` per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add tokens accrued since the last update."""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        deficit = amount - self.tokens
+        return deficit / self.rate if deficit > 0 else 0.0
+
+
+class RateLimiter:
+    """
+    Combined requests-per-minute and tokens-per-minute limiter.
+
+    Thread-safe; acquire() blocks the calling thread, aacquire() awaits.
+    """
+
+    # Rough chars-per-token ratio for mixed Chinese/English prompts
+    CHARS_PER_TOKEN = 2
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, name: str = ""):
+        """
+        Args:
+            rpm: Requests per minute (None = unlimited)
+            tpm: Tokens per minute (None = unlimited)
+            name: Label used in stats and logs
+        """
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm, rpm / 60.0) if rpm else None
+        self._tokens = TokenBucket(tpm, tpm / 60.0) if tpm else None
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+
+    def estimate_tokens(self, messages: List[BaseMessage], max_tokens: int = 0) -> int:
+        """Estimate tokens for a call: prompt size plus the completion budget."""
+        chars = sum(len(m.content) if isinstance(m.content, str) else len(str(m.content)) for m in messages)
+        return chars // self.CHARS_PER_TOKEN + (max_tokens or 0)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take the budget if available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+
+            if self._requests:
+                self._requests.refill(now)
+                wait = max(wait, self._requests.wait_time(1))
+
+            if self._tokens:
+                # A single call larger than the whole bucket only needs a full bucket
+                amount = min(tokens, self._tokens.capacity)
+                self._tokens.refill(now)
+                wait = max(wait, self._tokens.wait_time(amount))
+
+            if wait > 0:
+                return wait
+
+            if self._requests:
+                self._requests.tokens -= 1
+            if self._tokens:
+                self._tokens.tokens -= tokens
+            self.acquired += 1
+            return 0.0
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.waits += 1
+            self.total_wait_seconds += waited
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request and `tokens` tokens are available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+
+        if waited:
+            self._record_wait(waited)
+        return waited
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Async variant of acquire()."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+
+        if waited:
+            self._record_wait(waited)
+        return waited
+
+    def reconcile(self, reserved: int, actual: Optional[int]) -> None:
+        """
+        Correct a reservation once the provider reports real usage.
+
+        Unused tokens go back to the bucket; overruns are debited (the bucket
+        may go negative, which delays the next callers).
+        """
+        if not self._tokens or actual is None:
+            return
+
+        with self._lock:
+            self._tokens.tokens = min(
+                self._tokens.capacity,
+                self._tokens.tokens + (reserved - actual)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Current budget and wait counters."""
+        with self._lock:
+            now = time.monotonic()
+            if self._requests:
+                self._requests.refill(now)
+            if self._tokens:
+                self._tokens.refill(now)
+
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "requests_available": round(self._requests.tokens, 2) if self._requests else None,
+                "tokens_available": round(self._tokens.tokens) if self._tokens else None,
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "total_wait_seconds": round(self.total_wait_seconds, 3)
+            }
+
+
+# ============ Process-wide Limiters ============
+
+_limiters_lock = threading.Lock()
+_limiters: Dict[Tuple, RateLimiter] = {}
+
+
+def get_rate_limiter(config) -> Optional[RateLimiter]:
+    """
+    Shared limiter for a provider account (provider + base URL + API key).
+
+    Args:
+        config: LLMConfig carrying rpm / tpm
+
+    Returns:
+        RateLimiter, or None if the config sets no limits
+    """
+    if not config.rpm and not config.tpm:
+        return None
+
+    key = (config.provider, config.effective_base_url, config.api_key)
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rpm=config.rpm, tpm=config.tpm, name=config.provider)
+        return _limiters[key]
+
+
+def get_rate_limiter_stats() -> Dict[str, Any]:
+    """Stats for every limiter created in this process."""
+    with _limiters_lock:
+        limiters = list(_limiters.items())
+
+    return {
+        f"{provider}@{base_url}": limiter.stats()
+        for (provider, base_url, _), limiter in limiters
+    }
@@ -0,0 +1,467 @@
+"""
+LLM Call Resilience
+
+Retry and circuit breaking for provider calls:
+- Errors are classified as retryable (timeouts, connection errors, 408/409/429/5xx)
+  or permanent (bad request, auth, content policy, ...)
+- Retries use exponential backoff with full jitter
+- Retry-After / retry-after-ms response headers are honored
+- One circuit breaker per provider account: after repeated failures calls
+  fail fast with CircuitOpenError until a probe call succeeds
+- Rolling latency percentiles per provider (used for hedging, llm/failover.py)
+
+Configured from environment variables (see ResilienceGuard.from_env).
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+import openai
+
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(
+            f"LLM provider '{name}' circuit is open; retry in {retry_in:.1f}s"
+        )
+
+
+# ============ Error Classification ============
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed provider call is worth retrying.
+
+    Args:
+        error: Exception raised by the provider call
+
+    Returns:
+        True for transient failures (timeouts, dropped connections, rate
+        limits, server errors), False for permanent ones
+    """
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+
+    if isinstance(error, openai.APIStatusError):
+        status = error.status_code
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Server-requested delay from Retry-After / retry-after-ms headers.
+
+    Returns:
+        Seconds to wait, or None if the response carries no hint
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            # HTTP-date form
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    return None
+
+
+# ============ Circuit Breaker ============
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    → calls pass; `failure_threshold` failures in a row open it
+    open      → calls fail fast until `recovery_timeout` has elapsed
+    half_open → a single probe call passes; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str = "", failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        """State with the open → half_open timeout applied (lock held)."""
+        if self._state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through (0 if not open)."""
+        with self._lock:
+            if self._current_state(time.monotonic()) != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def before_call(self) -> None:
+        """
+        Gate a call through the breaker.
+
+        Raises:
+            CircuitOpenError: If the breaker is open (or a probe is already running)
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+
+            if state == self.CLOSED:
+                return
+
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            self.rejected += 1
+            retry_in = max(0.0, self.recovery_timeout - (now - self._opened_at))
+
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Let another probe through after one was abandoned (e.g. cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            reopen = self._state == self.HALF_OPEN
+            if reopen or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                    print(f"⚠️  LLM circuit opened for '{self.name}' "
+                          f"after {self._consecutive_failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(time.monotonic()),
+                "consecutive_failures": self._consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
+
+
+# ============ Latency Tracking ============
+
+class LatencyTracker:
+    """Rolling window of successful provider-call latencies."""
+
+    # Percentiles are unreliable below this many samples
+    MIN_SAMPLES = 10
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        p-th percentile latency in seconds.
+
+        Returns:
+            Latency, or None until MIN_SAMPLES calls have been recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+
+        index = min(len(samples) - 1, int(round(p / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        with self._lock:
+            count = len(self._samples)
+        return {
+            "samples": count,
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None
+        }
+
+
+# ============ Retry + Breaker ============
+
+class ResilienceGuard:
+    """
+    Retry policy plus circuit breaker for one provider account.
+
+    call() / acall() run a zero-argument provider call, retrying transient
+    failures with jittered exponential backoff. Only retryable errors count
+    against the breaker; permanent errors (e.g. 400) propagate immediately.
+    The guard wraps a single attempt, so rate-limit acquisition inside `fn`
+    is repeated for every retry.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0
+    ):
+        """
+        Args:
+            name: Label used in stats and logs
+            max_retries: Retries after the first attempt
+            base_delay: Backoff before the first retry (seconds, doubled per retry)
+            max_delay: Upper bound for a single backoff or Retry-After wait
+            failure_threshold: Consecutive failures that open the breaker
+            recovery_timeout: Seconds the breaker stays open before a probe
+        """
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(name, failure_threshold, recovery_timeout)
+        self.latency = LatencyTracker()
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.gave_up = 0
+        self.total_backoff_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, name: str = "") -> "ResilienceGuard":
+        """
+        Build a guard from environment variables.
+
+        Environment variables:
+            LLM_MAX_RETRIES: Retries per call (default: 3)
+            LLM_RETRY_BASE_DELAY: First backoff in seconds (default: 1.0)
+            LLM_RETRY_MAX_DELAY: Backoff cap in seconds (default: 30)
+            LLM_CIRCUIT_FAILURE_THRESHOLD: Failures that open the breaker (default: 5)
+            LLM_CIRCUIT_RECOVERY_SECONDS: Open duration before a probe (default: 30)
+        """
+        return cls(
+            name=name,
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "30")),
+            failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            recovery_timeout=float(os.getenv("LLM_CIRCUIT_RECOVERY_SECONDS", "30"))
+        )
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """
+        Delay before retry number `attempt` (0-based).
+
+        Full jitter over the exponential window; a Retry-After hint from the
+        provider is used as a lower bound.
+        """
+        window = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, window)
+
+        hinted = retry_after_seconds(error)
+        if hinted is not None:
+            delay = max(delay, min(hinted, self.max_delay))
+
+        return delay
+
+    def _on_failure(self, attempt: int, error: BaseException) -> Optional[float]:
+        """
+        Record a failed attempt.
+
+        Returns:
+            Seconds to wait before retrying, or None to re-raise
+        """
+        retryable = is_retryable(error)
+        if retryable:
+            self.breaker.record_failure()
+        elif isinstance(error, openai.APIStatusError):
+            # The provider answered (e.g. 400) - it is up, the request was bad
+            self.breaker.record_success()
+        else:
+            # Local error (bug, rejected input, ...): says nothing about the provider
+            self.breaker.release_probe()
+
+        with self._lock:
+            self.failures += 1
+            if not retryable:
+                return None
+            if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                self.gave_up += 1
+                return None
+
+            delay = self.backoff(attempt, error)
+            self.retries += 1
+            self.total_backoff_seconds += delay
+
+        print(f"⚠️  LLM call to '{self.name}' failed ({type(error).__name__}); "
+              f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run a provider call with retries and circuit breaking (blocking)."""
+        with self._lock:
+            self.calls += 1
+
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._on_failure(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of call()."""
+        with self._lock:
+            self.calls += 1
+
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._on_failure(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled mid-call: don't leave a half-open probe dangling
+                self.breaker.release_probe()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Retry counters and breaker state."""
+        with self._lock:
+            retry_stats = {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "gave_up": self.gave_up,
+                "total_backoff_seconds": round(self.total_backoff_seconds, 3),
+                "max_retries": self.max_retries
+            }
+        return {
+            **retry_stats,
+            "circuit": self.breaker.stats(),
+            "latency": self.latency.stats()
+        }
+
+
+# ============ Process-wide Guards ============
+
+_guards_lock = threading.Lock()
+_guards: Dict[Tuple, ResilienceGuard] = {}
+
+
+def get_resilience_guard(config) -> ResilienceGuard:
+    """
+    Shared guard (retry policy + breaker) for a provider account.
+
+    Args:
+        config: LLMConfig identifying the provider
+
+    Returns:
+        ResilienceGuard keyed by provider + base URL + API key
+    """
+    key = (config.provider, config.effective_base_url, config.api_key)
+    with _guards_lock:
+        if key not in _guards:
+            _guards[key] = ResilienceGuard.from_env(name=config.provider)
+        return _guards[key]
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """Stats for every guard created in this process."""
+    with _guards_lock:
+        guards = list(_guards.items())
+
+    return {
+        f"{provider}@{base_url}": guard.stats()
+        for (provider, base_url, _), guard in guards
+    }
@@ -0,0 +1,103 @@
+"""
+Structured Output (JSON mode / JSON schema)
+
+Agents pass the Pydantic model they expect as `output_schema=...` on
+invoke()/ainvoke(). Each ManagedChatModel translates that hint into a
+provider `response_format` according to its LLMConfig.structured_output:
+
+- off:         no response_format (prompt-only JSON, the default)
+- json_object: {"type": "json_object"} - valid JSON guaranteed (DeepSeek, GLM, ...)
+- json_schema: the model's JSON schema - output follows the schema (OpenAI, ...)
+
+The agents' regex / escape-repair parsing stays in place as a fallback;
+record_parse() counts how often it was still needed (see /llm/stats).
+"""
+
+import threading
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+
+MODE_OFF = "off"
+MODE_JSON_OBJECT = "json_object"
+MODE_JSON_SCHEMA = "json_schema"
+MODES = (MODE_OFF, MODE_JSON_OBJECT, MODE_JSON_SCHEMA)
+
+# Parse outcomes
+PARSED = "parsed"        # Parsed directly into the schema
+REPAIRED = "repaired"    # Needed the regex / JSON-repair fallback
+FAILED = "failed"        # Could not be parsed at all
+
+
+def normalize_mode(value: Optional[str]) -> str:
+    """Map an env value (off/json_object/json_schema, true/false) to a mode."""
+    value = (value or MODE_OFF).strip().lower()
+    if value in ("1", "true", "yes", "json"):
+        return MODE_JSON_OBJECT
+    if value in ("0", "false", "no", "none", ""):
+        return MODE_OFF
+    if value not in MODES:
+        print(f"⚠️  Unknown structured output mode '{value}', using '{MODE_OFF}'")
+        return MODE_OFF
+    return value
+
+
+def response_format_for(schema: Optional[Type[BaseModel]], mode: str) -> Optional[Dict[str, Any]]:
+    """
+    Provider response_format for a Pydantic output schema.
+
+    Args:
+        schema: Expected output model (PageSkeleton, ContentBlock, ...)
+        mode: Structured output mode of the provider
+
+    Returns:
+        response_format dict, or None if structured output is off
+    """
+    if schema is None or mode == MODE_OFF:
+        return None
+
+    if mode == MODE_JSON_OBJECT:
+        return {"type": "json_object"}
+
+    # Non-strict: strict mode rejects schemas with optional / default fields
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": schema.model_json_schema(),
+            "strict": False
+        }
+    }
+
+
+# ============ Parse Statistics ============
+
+_lock = threading.Lock()
+_parse_counts: Dict[str, Dict[str, int]] = {}
+
+
+def record_parse(stage: str, outcome: str) -> None:
+    """
+    Count one response parse.
+
+    Args:
+        stage: Agent / stage name (planner, content_expert, ...)
+        outcome: PARSED, REPAIRED or FAILED
+    """
+    with _lock:
+        counts = _parse_counts.setdefault(stage, {PARSED: 0, REPAIRED: 0, FAILED: 0})
+        counts[outcome] += 1
+
+
+def get_parse_stats() -> Dict[str, Any]:
+    """Parse outcomes per stage, with the share that needed repair."""
+    with _lock:
+        stats = {}
+        for stage, counts in _parse_counts.items():
+            total = sum(counts.values())
+            stats[stage] = {
+                **counts,
+                "repair_rate": round((counts[REPAIRED] + counts[FAILED]) / total, 4) if total else 0.0
+            }
+        return stats
@@ -0,0 +1,95 @@
+"""
+LLM Token Usage Accounting
+
+Every real provider call reports its usage metadata (prompt, completion and
+cached prompt tokens) here. Callers open a usage_scope() to label calls with
+a pipeline stage / content node and to collect them into a UsageReport;
+request reports also keep a per-call log, so prefix-cache hits can be
+checked call by call:
+
+    report = UsageReport()
+    with usage_scope(stage="planner", report=report):
+        skeleton = planner.plan(request)
+
+Scopes live in a ContextVar, so they follow asyncio tasks and nest
+(an inner scope inherits the outer labels and reports). A process-wide
+report is always updated as well (see get_usage_stats()).
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from models.schemas import TokenUsage, UsageReport
+
+
+# (stage, node, reports) for the current call chain
+_scope: ContextVar[Tuple[Optional[str], Optional[str], Tuple[UsageReport, ...]]] = ContextVar(
+    "llm_usage_scope", default=(None, None, ())
+)
+
+# Reports may be shared by concurrent tasks/threads
+_lock = threading.Lock()
+_process_report = UsageReport()
+
+
+@contextmanager
+def usage_scope(
+    stage: Optional[str] = None,
+    node: Optional[str] = None,
+    report: Optional[UsageReport] = None
+) -> Iterator[None]:
+    """
+    Label LLM calls made inside the block and collect them into `report`.
+
+    Args:
+        stage: Pipeline stage (planner, content_expert, ...); inherited if None
+        node: Content node id; inherited if None
+        report: Report that receives every call made in this scope
+    """
+    parent_stage, parent_node, parent_reports = _scope.get()
+    reports = parent_reports + (report,) if report is not None else parent_reports
+    token = _scope.set((stage or parent_stage, node or parent_node, reports))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def record_usage(message: Any) -> Optional[TokenUsage]:
+    """
+    Record one provider call against the current scope.
+
+    Args:
+        message: Chat response carrying usage_metadata (ignored if it has none)
+
+    Returns:
+        The recorded TokenUsage, or None if there was nothing to record
+    """
+    usage = TokenUsage.from_message(message)
+    if usage is None:
+        return None
+
+    stage, node, reports = _scope.get()
+
+    with _lock:
+        # The process-wide report only aggregates (no unbounded call log)
+        _process_report.record(usage, stage=stage, log_call=False)
+        for report in reports:
+            report.record(usage, stage=stage, node=node)
+
+    return usage
+
+
+def get_usage_stats() -> Dict[str, Any]:
+    """Process-wide token usage per stage (for /llm/stats)."""
+    with _lock:
+        return {
+            "total": _process_report.total.model_dump(),
+            "prompt_cache_hit_rate": round(_process_report.total.cache_hit_rate, 4),
+            "by_stage": {
+                stage: {**usage.model_dump(), "prompt_cache_hit_rate": round(usage.cache_hit_rate, 4)}
+                for stage, usage in _process_report.by_stage.items()
+            }
+        }
@@ -9,8 +9,9 @@ Defines data models for each stage:
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Dict, Optional, Literal, Any, Callable
+from typing import List, Dict, Optional, Literal, Any, Callable, Annotated, Union
 from enum import Enum
+import operator
 import time
 
 
@@ -323,8 +324,8 @@ class FrontendBlock(BaseModel):
     type: BlockType
     role: Optional[str] = None
 
-    # Content (different per type)
-    content: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    # Content (different per type; Markdown blocks carry a plain string)
+    content: Optional[Union[Dict[str, Any], str]] = Field(default_factory=dict)
 
     # Allow additional fields
     title: Optional[str] = None
@@ -385,6 +386,18 @@ class GenerationRequest(BaseModel):
     # Configuration
     max_sections: int = Field(default=6, ge=1, le=10, description="Maximum number of sections")
     include_interactive: bool = Field(default=True, description="Include interactive components")
+    scheduling_policy: Optional[str] = Field(
+        None,
+        description="Streaming node order: viewport_first, longest_first, importance_first (default: SCHEDULING_POLICY)"
+    )
+    deadline_seconds: Optional[float] = Field(
+        None, gt=0,
+        description="Latency budget; generation degrades gracefully as it runs out (see workflows/deadline.py)"
+    )
+    force_regenerate: bool = Field(
+        default=False,
+        description="Generate every node, even ones unchanged since the page's last run (see workflows/incremental.py)"
+    )
 
     # Page metadata (optional)
     page_id: Optional[str] = Field(None, description="Custom page ID (auto-generated if not provided)")
@@ -423,6 +436,102 @@ class GenerationRequest(BaseModel):
         return "General"
 
 
+# ============ Token Usage ============
+
+class TokenUsage(BaseModel):
+    """Token counts reported by the provider (response usage metadata)"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # Prompt tokens served from the provider's prompt cache
+    total_tokens: int = 0
+
+    @classmethod
+    def from_metadata(cls, usage_metadata: Dict[str, Any]) -> "TokenUsage":
+        """Build from a LangChain AIMessage.usage_metadata dict."""
+        details = usage_metadata.get("input_token_details") or {}
+        prompt = usage_metadata.get("input_tokens", 0) or 0
+        completion = usage_metadata.get("output_tokens", 0) or 0
+        return cls(
+            calls=1,
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            cached_tokens=details.get("cache_read", 0) or 0,
+            total_tokens=usage_metadata.get("total_tokens") or prompt + completion
+        )
+
+    @classmethod
+    def from_message(cls, message: Any) -> Optional["TokenUsage"]:
+        """
+        Build from a chat response message (None if it carries no usage).
+
+        Uses usage_metadata; cached tokens fall back to the raw provider usage
+        for APIs that report them outside prompt_tokens_details
+        (e.g. DeepSeek's prompt_cache_hit_tokens).
+        """
+        usage_metadata = getattr(message, "usage_metadata", None)
+        if not usage_metadata:
+            return None
+
+        usage = cls.from_metadata(usage_metadata)
+        if not usage.cached_tokens:
+            raw = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+            usage.cached_tokens = raw.get("prompt_cache_hit_tokens", 0) or 0
+        return usage
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prefix cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def add(self, other: "TokenUsage") -> None:
+        """Accumulate another usage record in place."""
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self.total_tokens += other.total_tokens
+
+
+class CallUsage(TokenUsage):
+    """Usage of a single LLM call, with its stage / node labels"""
+    stage: Optional[str] = None
+    node: Optional[str] = None
+
+
+class UsageReport(BaseModel):
+    """Token usage aggregated per request, per stage and per content node"""
+    total: TokenUsage = Field(default_factory=TokenUsage)
+    by_stage: Dict[str, TokenUsage] = Field(default_factory=dict)
+    by_node: Dict[str, TokenUsage] = Field(default_factory=dict)
+    call_log: List[CallUsage] = Field(default_factory=list, description="Per-call usage in call order")
+
+    def record(
+        self,
+        usage: TokenUsage,
+        stage: Optional[str] = None,
+        node: Optional[str] = None,
+        log_call: bool = True
+    ) -> None:
+        """Add one call's usage under its stage / node labels."""
+        if log_call:
+            self.call_log.append(CallUsage(**usage.model_dump(), stage=stage, node=node))
+        self.total.add(usage)
+        if stage:
+            self.by_stage.setdefault(stage, TokenUsage()).add(usage)
+        if node:
+            self.by_node.setdefault(node, TokenUsage()).add(usage)
+
+    def merge(self, other: "UsageReport") -> None:
+        """Fold another report into this one."""
+        self.total.add(other.total)
+        for stage, usage in other.by_stage.items():
+            self.by_stage.setdefault(stage, TokenUsage()).add(usage)
+        for node, usage in other.by_node.items():
+            self.by_node.setdefault(node, TokenUsage()).add(usage)
+        self.call_log.extend(other.call_log)
+
+
 class GenerationResponse(BaseModel):
     """Output from the multi-agent pipeline"""
     success: bool
@@ -433,9 +542,11 @@ class GenerationResponse(BaseModel):
 
     # Metadata
     tokens_used: Optional[int] = None
+    token_usage: Optional[UsageReport] = None
     generation_time_seconds: Optional[float] = None
     error: Optional[str] = None
     warnings: List[str] = Field(default_factory=list)
+    degradations: List[str] = Field(default_factory=list, description="Deadline degradations applied, in order")
 
 
 # ============ Streaming Types ============
@@ -445,6 +556,7 @@ class StreamingEventType(str, Enum):
     STAGE_START = "stage_start"
     STAGE_COMPLETE = "stage_complete"
     SKELETON_READY = "skeleton_ready"  # Show structure early
+    BLOCK_PLACEHOLDER = "block_placeholder"  # Rule-based blocks, replaced by BLOCK_READY (same index / id)
     BLOCK_READY = "block_ready"
     HEARTBEAT = "heartbeat"  # Keep-alive during slow generation
     PROGRESS = "progress"  # Detailed progress updates
@@ -480,9 +592,23 @@ def validate_timeline_items(items: List[TimelineItem]) -> bool:
 
 # ============ Workflow State ============
 
+def merge_usage_reports(left: UsageReport, right: UsageReport) -> UsageReport:
+    """LangGraph reducer: combine the usage reported by parallel nodes."""
+    merged = left.model_copy(deep=True)
+    merged.merge(right)
+    return merged
+
+
 class WorkflowState(BaseModel):
-    """State passed between LangGraph nodes"""
+    """
+    State passed between LangGraph nodes.
+
+    Nodes return partial updates. Content Expert and Visual Director run in
+    the same superstep, so the fields they both write are reducer fields
+    (updates are accumulated instead of overwritten).
+    """
     request: GenerationRequest
+    thread_id: Optional[str] = None  # Checkpoint key (None: not checkpointed)
 
     # Stage outputs
     skeleton: Optional[PageSkeleton] = None
@@ -492,11 +618,13 @@ class WorkflowState(BaseModel):
     # Final output
     final_schema: Optional[FrontendPageSchema] = None
 
-    # Error tracking
-    errors: List[str] = Field(default_factory=list)
-    warnings: List[str] = Field(default_factory=list)
+    # Error tracking (accumulated across parallel nodes)
+    errors: Annotated[List[str], operator.add] = Field(default_factory=list)
+    warnings: Annotated[List[str], operator.add] = Field(default_factory=list)
+    degradations: Annotated[List[str], operator.add] = Field(default_factory=list)  # Deadline degradations
 
     # Metadata
     start_time: float = Field(default_factory=lambda: 0)
     end_time: Optional[float] = None
-    tokens_used: int = Field(default=0)
+    tokens_used: Annotated[int, operator.add] = Field(default=0)
+    token_usage: Annotated[UsageReport, merge_usage_reports] = Field(default_factory=UsageReport)
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Stub LLM Server (OpenAI-compatible)
+
+Local stand-in for the chat-completions API so the whole pipeline can be
+run and load-tested without network access or provider spend:
+- POST /v1/chat/completions (JSON and SSE streaming, with usage)
+- GET  /v1/models (used by the connection warm-up)
+- Canned JSON for planner, content-expert (single node + collection) and
+  visual-director prompts, shaped like real model output
+- Configurable time-to-first-token distribution and tokens/second; the
+  per-character delay model is StreamingJitterSimulator's
+- 429 injection (with Retry-After) and truncation injection (finish_reason=length)
+- Prompt-cache simulation: a repeated system prompt is reported as cached tokens
+
+Usage:
+    python stub_llm_server.py --port 8900 --latency lognormal --latency-ms 800
+
+    # then point the backend at it
+    export GLM_API_KEY=  # a set GLM key takes precedence over LLM_PROVIDER
+    export LLM_PROVIDER=custom
+    export LLM_API_KEY=stub
+    export LLM_BASE_URL=http://127.0.0.1:8900/v1
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api.json_render_endpoints import StreamingJitterSimulator
+
+
+# Rough English chars-per-token ratio used for usage reporting and pacing
+CHARS_PER_TOKEN = 4
+
+
+# ============ Configuration ============
+
+class StubConfig:
+    """Latency, throughput and fault-injection settings."""
+
+    LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+    def __init__(
+        self,
+        latency: str = "lognormal",
+        latency_ms: float = 800.0,
+        latency_spread: float = 0.5,
+        tokens_per_second: float = 60.0,
+        jitter_factor: float = 3.0,
+        hiccup_rate: float = 0.002,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: float = 1.0,
+        truncate_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            latency: Time-to-first-token distribution (fixed, uniform, lognormal)
+            latency_ms: Median time to first token in milliseconds
+            latency_spread: uniform: ±fraction of latency_ms; lognormal: sigma
+            tokens_per_second: Completion speed (0 = no generation delay)
+            jitter_factor: StreamingJitterSimulator burst multiplier
+            hiccup_rate: Per-token probability of a 200ms network hiccup
+            rate_limit_rate: Probability of answering 429
+            retry_after_seconds: Retry-After sent with injected 429s
+            truncate_rate: Probability of cutting the completion short (finish_reason=length)
+            seed: Random seed for reproducible runs
+        """
+        if latency not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency must be one of {self.LATENCY_DISTRIBUTIONS}")
+
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.tokens_per_second = tokens_per_second
+        self.jitter_factor = jitter_factor
+        self.hiccup_rate = hiccup_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.truncate_rate = truncate_rate
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        """
+        Load settings from environment variables.
+
+        Environment variables:
+            STUB_LLM_LATENCY: fixed / uniform / lognormal (default: lognormal)
+            STUB_LLM_LATENCY_MS: Median time to first token (default: 800)
+            STUB_LLM_LATENCY_SPREAD: Distribution spread (default: 0.5)
+            STUB_LLM_TOKENS_PER_SECOND: Completion speed (default: 60)
+            STUB_LLM_JITTER_FACTOR: Burst multiplier (default: 3.0)
+            STUB_LLM_HICCUP_RATE: Per-token network hiccup probability (default: 0.002)
+            STUB_LLM_RATE_LIMIT_RATE: 429 probability (default: 0)
+            STUB_LLM_RETRY_AFTER: Retry-After seconds for 429s (default: 1)
+            STUB_LLM_TRUNCATE_RATE: Truncation probability (default: 0)
+            STUB_LLM_SEED: Random seed (optional)
+        """
+        seed = os.getenv("STUB_LLM_SEED")
+        return cls(
+            latency=os.getenv("STUB_LLM_LATENCY", "lognormal"),
+            latency_ms=float(os.getenv("STUB_LLM_LATENCY_MS", "800")),
+            latency_spread=float(os.getenv("STUB_LLM_LATENCY_SPREAD", "0.5")),
+            tokens_per_second=float(os.getenv("STUB_LLM_TOKENS_PER_SECOND", "60")),
+            jitter_factor=float(os.getenv("STUB_LLM_JITTER_FACTOR", "3.0")),
+            hiccup_rate=float(os.getenv("STUB_LLM_HICCUP_RATE", "0.002")),
+            rate_limit_rate=float(os.getenv("STUB_LLM_RATE_LIMIT_RATE", "0")),
+            retry_after_seconds=float(os.getenv("STUB_LLM_RETRY_AFTER", "1")),
+            truncate_rate=float(os.getenv("STUB_LLM_TRUNCATE_RATE", "0")),
+            seed=int(seed) if seed else None
+        )
+
+    def sample_latency(self) -> float:
+        """Draw a time-to-first-token in seconds."""
+        base = self.latency_ms / 1000
+        if self.latency == "fixed":
+            return base
+        if self.latency == "uniform":
+            return max(0.0, random.uniform(base * (1 - self.latency_spread), base * (1 + self.latency_spread)))
+        return random.lognormvariate(0, self.latency_spread) * base
+
+    def simulator(self) -> StreamingJitterSimulator:
+        """Per-character delay model matching tokens_per_second."""
+        base_delay_ms = 1000 / (self.tokens_per_second * CHARS_PER_TOKEN) if self.tokens_per_second else 0
+        return StreamingJitterSimulator(
+            base_delay_ms=base_delay_ms,
+            jitter_factor=self.jitter_factor,
+            network_hiccup_rate=self.hiccup_rate / CHARS_PER_TOKEN,
+            verbose=False
+        )
+
+
+# ============ Canned Responses ============
+
+# Category → component, mirroring VisualDirectorAgent.map_single_node
+CATEGORY_COMPONENTS = {
+    "code_example": ("CodePlayground", "practice"),
+    "process_flow": ("Timeline", "core-concept"),
+    "historical_event": ("Timeline", "core-concept"),
+    "comparison_analysis": ("CardGrid", "comparison"),
+    "practice_exercise": ("Flashcard", "assessment"),
+    "definition": ("Flashcard", "core-concept"),
+    "abstract_concept": ("Flashcard", "core-concept"),
+    "concrete_example": ("CardGrid", "core-concept")
+}
+
+# Body length per category (paragraphs): real models write far more for a
+# concept or code walkthrough than for a quiz, which matters to node scheduling
+CATEGORY_PARAGRAPHS = {
+    "abstract_concept": 6,
+    "code_example": 8,
+    "process_flow": 5,
+    "comparison_analysis": 5,
+    "historical_event": 4,
+    "definition": 3,
+    "concrete_example": 3,
+    "practice_exercise": 2
+}
+
+SECTION_PLAN = [
+    ("Concept", ["definition", "abstract_concept", "comparison_analysis"]),
+    ("Theory", ["abstract_concept", "process_flow", "concrete_example"]),
+    ("Application", ["concrete_example", "code_example"]),
+    ("Practice", ["practice_exercise", "practice_exercise"]),
+    ("History", ["historical_event", "historical_event"]),
+    ("Summary", ["abstract_concept"])
+]
+
+NODE_PATTERN = re.compile(
+    r'"node_id": "((?:[^"\\]|\\.)*)",\s*"title": "((?:[^"\\]|\\.)*)",\s*"category": "([a-z_]+)"'
+)
+
+
+def _field(prompt: str, name: str, default: str = "") -> str:
+    """Value of a '- **Name**: value' line in an agent prompt."""
+    match = re.search(rf"\*\*{re.escape(name)}\*\*: (.+)", prompt)
+    return match.group(1).strip() if match else default
+
+
+def _paragraphs(title: str, count: int) -> str:
+    """Markdown body of roughly `count` paragraphs about `title`."""
+    body = [f"## {title}\n"]
+    for i in range(count):
+        body.append(
+            f"{title} is best understood by connecting it to what the learner already knows. "
+            f"Point {i + 1}: start from a concrete situation, name the moving parts, and then "
+            f"generalise. Watch for the places where intuition breaks down - that is where "
+            f"**{title}** earns its keep.\n"
+        )
+    return "\n".join(body)
+
+
+def build_planner_response(prompt: str) -> Dict[str, Any]:
+    """PageSkeleton JSON for a topic-mode planner prompt."""
+    topic_match = re.search(r"## Topic\n(.+)", prompt)
+    topic = topic_match.group(1).strip() if topic_match else "Untitled Topic"
+    audience_match = re.search(r"## Target Audience\n(.+)", prompt)
+    audience = audience_match.group(1).strip() if audience_match else "general learners"
+    difficulty_match = re.search(r"## Difficulty Level\n(\w+)", prompt)
+    difficulty = difficulty_match.group(1) if difficulty_match else "intermediate"
+    max_match = re.search(r"Maximum sections: (\d+)", prompt)
+    max_sections = int(max_match.group(1)) if max_match else 4
+
+    sections = []
+    previous: Optional[str] = None
+    for s_idx, (section_type, categories) in enumerate(SECTION_PLAN[:max(1, min(max_sections, 4))]):
+        nodes = []
+        for n_idx, category in enumerate(categories):
+            node_id = f"node-{s_idx + 1}-{n_idx + 1}"
+            nodes.append({
+                "node_id": node_id,
+                "knowledge_id": node_id,
+                "title": f"{topic}: {section_type} {n_idx + 1}",
+                "category": category,
+                "difficulty": difficulty,
+                "estimated_time_minutes": 10,
+                "prerequisites": [previous] if previous else [],
+                "learning_objectives": [f"Explain {section_type.lower()} aspect {n_idx + 1} of {topic}"],
+                "keywords": [topic.split()[0] if topic.split() else topic, section_type.lower()]
+            })
+            previous = node_id
+        sections.append({
+            "section_id": f"section-{s_idx + 1}",
+            "section_type": section_type,
+            "title": f"{section_type}: {topic}",
+            "nodes": nodes,
+            "pedagogical_goal": f"Build {section_type.lower()}-level understanding of {topic}"
+        })
+
+    return {
+        "page_id": re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:48] or "stub-page",
+        "title": topic,
+        "summary": f"A structured introduction to {topic} for {audience}.",
+        "target_audience": audience,
+        "sections": sections,
+        "total_estimated_time": 10 * sum(len(s["nodes"]) for s in sections)
+    }
+
+
+def build_node_response(prompt: str) -> Dict[str, Any]:
+    """Single-node content JSON (the object format the node prompt asks for)."""
+    title = _field(prompt, "Title", "Untitled")
+    category = _field(prompt, "Category", "abstract_concept")
+    return {
+        "node_id": _field(prompt, "Node ID", "node"),
+        "title": title,
+        "category": category,
+        "main_content": _paragraphs(title, CATEGORY_PARAGRAPHS.get(category, 4)),
+        "key_points": [f"{title}: key idea {i + 1}" for i in range(4)],
+        "examples": [
+            f"Everyday example of {title}: a short worked scenario.",
+            f"Technical example of {title}: a precise, minimal case."
+        ],
+        "analogies": f"Think of {title} like a recipe: inputs, steps, result.",
+        "difficulty": "intermediate",
+        "keywords": [w for w in re.findall(r"\w+", title)[:5]] or ["concept"],
+        "common_misconceptions": [f"{title} is only theoretical (it has direct applications)"],
+        "quiz_questions": [f"Which statement about {title} is correct?"],
+        "quiz_answers": ["The one that restates its key idea."]
+    }
+
+
+def build_collection_response(prompt: str) -> Dict[str, Any]:
+    """ContentCollection JSON for a whole-skeleton content prompt."""
+    contents = []
+    for node_id, title, category in NODE_PATTERN.findall(prompt):
+        contents.append({
+            "node_id": node_id,
+            "title": title,
+            "category": category,
+            "main_content": _paragraphs(title, 3),
+            "key_points": [f"{title}: key idea {i + 1}" for i in range(3)],
+            "examples": [f"Example of {title}"],
+            "analogies": f"{title} works like a map: it tells you where things are.",
+            "difficulty": "intermediate",
+            "keywords": [w for w in re.findall(r"\w+", title)[:5]] or ["concept"],
+            "common_misconceptions": [f"{title} is only theoretical"],
+            "quiz_questions": [f"What is the main idea of {title}?"],
+            "quiz_answers": ["Its key idea, restated in your own words."]
+        })
+    return {"contents": contents}
+
+
+def build_mapping_response(prompt: str) -> Dict[str, Any]:
+    """VisualMapping JSON for a visual-director prompt."""
+    mappings = []
+    for node_id, _, category in NODE_PATTERN.findall(prompt):
+        block_type, role = CATEGORY_COMPONENTS.get(category, ("Flashcard", "core-concept"))
+        mappings.append({
+            "node_id": node_id,
+            "block_type": block_type,
+            "role": role,
+            "config": {},
+            "rationale": f"{block_type} suits {category} content"
+        })
+    return {"mappings": mappings}
+
+
+def detect_prompt_kind(messages: List[Dict[str, Any]]) -> str:
+    """Classify a request as planner / node / collection / visual / other."""
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    user = str(messages[-1].get("content", "")) if messages else ""
+
+    if "Map the following content nodes" in user:
+        return "visual"
+    if "SINGLE learning node" in user or "SINGLE learning node" in system:
+        return "node"
+    if "Course Designer" in system or "Design a learning page structure" in user:
+        return "planner"
+    if "Generate educational content for the following learning page" in user:
+        return "collection"
+    return "other"
+
+
+def build_completion_text(messages: List[Dict[str, Any]]) -> str:
+    """Canned completion for a chat request."""
+    kind = detect_prompt_kind(messages)
+    user = str(messages[-1].get("content", "")) if messages else ""
+
+    builders = {
+        "planner": build_planner_response,
+        "node": build_node_response,
+        "collection": build_collection_response,
+        "visual": build_mapping_response
+    }
+    if kind in builders:
+        return json.dumps(builders[kind](user), ensure_ascii=False, indent=2)
+
+    return "This is a stub response from the local LLM server."
+
+
+# ============ Server ============
+
+class StubLLMServer:
+    """FastAPI app serving the OpenAI chat-completions subset."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        if config.seed is not None:
+            random.seed(config.seed)
+
+        self._seen_prefixes: set = set()
+        self.stats = {
+            "requests": 0,
+            "streaming_requests": 0,
+            "structured_requests": 0,
+            "rate_limited": 0,
+            "truncated": 0,
+            "by_kind": {}
+        }
+
+        self.app = FastAPI(title="Stub LLM Server", version="1.0.0")
+        self._register_routes()
+
+    def _register_routes(self) -> None:
+        app = self.app
+
+        @app.get("/v1/models")
+        @app.get("/models")
+        async def list_models():
+            return {"object": "list", "data": [{"id": "stub-model", "object": "model", "owned_by": "stub"}]}
+
+        @app.get("/stats")
+        async def stats():
+            return self.stats
+
+        @app.post("/v1/chat/completions")
+        @app.post("/chat/completions")
+        async def chat_completions(request: Request):
+            return await self.handle_chat(await request.json())
+
+    def _usage(self, messages: List[Dict[str, Any]], completion: str) -> Dict[str, Any]:
+        """OpenAI usage block, reporting a repeated system prompt as cached."""
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+        prompt_tokens = max(1, prompt_chars // CHARS_PER_TOKEN)
+        completion_tokens = max(1, len(completion) // CHARS_PER_TOKEN)
+
+        system = "".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        cached_tokens = 0
+        if system:
+            digest = hashlib.sha256(system.encode("utf-8")).hexdigest()
+            if digest in self._seen_prefixes:
+                cached_tokens = len(system) // CHARS_PER_TOKEN
+            self._seen_prefixes.add(digest)
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+
+    def _rate_limited(self) -> JSONResponse:
+        self.stats["rate_limited"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": str(self.config.retry_after_seconds)},
+            content={"error": {
+                "message": "Rate limit reached (injected by stub server)",
+                "type": "rate_limit_error",
+                "code": "rate_limit_exceeded"
+            }}
+        )
+
+    def _truncate(self, text: str) -> Tuple[str, str]:
+        """Maybe cut the completion short; returns (text, finish_reason)."""
+        if text and random.random() < self.config.truncate_rate:
+            self.stats["truncated"] += 1
+            return text[:int(len(text) * random.uniform(0.3, 0.9))], "length"
+        return text, "stop"
+
+    async def handle_chat(self, body: Dict[str, Any]) -> Any:
+        """Serve one chat-completions request."""
+        messages = body.get("messages", [])
+        model = body.get("model", "stub-model")
+        stream = bool(body.get("stream"))
+
+        kind = detect_prompt_kind(messages)
+        self.stats["requests"] += 1
+        self.stats["by_kind"][kind] = self.stats["by_kind"].get(kind, 0) + 1
+        if body.get("response_format"):
+            # Canned completions are already bare JSON; just count the requests
+            self.stats["structured_requests"] += 1
+
+        if random.random() < self.config.rate_limit_rate:
+            return self._rate_limited()
+
+        text, finish_reason = self._truncate(build_completion_text(messages))
+        usage = self._usage(messages, text)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if stream:
+            self.stats["streaming_requests"] += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                self._stream(completion_id, created, model, text, finish_reason, usage, include_usage),
+                media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(self.config.sample_latency())
+        generation_delay = sum(delay for _, delay in self.config.simulator().char_delays(text))
+        await asyncio.sleep(generation_delay)
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": finish_reason
+            }],
+            "usage": usage
+        }
+
+    async def _stream(
+        self,
+        completion_id: str,
+        created: int,
+        model: str,
+        text: str,
+        finish_reason: str,
+        usage: Dict[str, Any],
+        include_usage: bool
+    ):
+        """SSE chunks, one token (~CHARS_PER_TOKEN chars) at a time."""
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        await asyncio.sleep(self.config.sample_latency())
+        yield chunk({"role": "assistant", "content": ""})
+
+        token = ""
+        pending_delay = 0.0
+        for char, delay in self.config.simulator().char_delays(text):
+            token += char
+            pending_delay += delay
+            if len(token) >= CHARS_PER_TOKEN:
+                await asyncio.sleep(pending_delay)
+                yield chunk({"content": token})
+                token, pending_delay = "", 0.0
+
+        if token:
+            await asyncio.sleep(pending_delay)
+            yield chunk({"content": token})
+
+        yield chunk({}, finish_reason)
+        if include_usage:
+            yield f"data: {json.dumps({'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    """Build the stub app (config defaults to environment variables)."""
+    return StubLLMServer(config or StubConfig.from_env()).app
+
+
+# ============ CLI ============
+
+def main():
+    import uvicorn
+
+    defaults = StubConfig.from_env()
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default=os.getenv("STUB_LLM_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("STUB_LLM_PORT", "8900")))
+    parser.add_argument("--latency", choices=StubConfig.LATENCY_DISTRIBUTIONS, default=defaults.latency)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-spread", type=float, default=defaults.latency_spread)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--jitter-factor", type=float, default=defaults.jitter_factor)
+    parser.add_argument("--hiccup-rate", type=float, default=defaults.hiccup_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after_seconds)
+    parser.add_argument("--truncate-rate", type=float, default=defaults.truncate_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        tokens_per_second=args.tokens_per_second,
+        jitter_factor=args.jitter_factor,
+        hiccup_rate=args.hiccup_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+        truncate_rate=args.truncate_rate,
+        seed=args.seed
+    )
+
+    print("\n" + "="*60)
+    print("🧪 Stub LLM Server (OpenAI-compatible)")
+    print("="*60)
+    print(f"   URL: http://{args.host}:{args.port}/v1")
+    print(f"   Latency: {config.latency} ~{config.latency_ms:.0f}ms, {config.tokens_per_second:.0f} tok/s")
+    print(f"   Injection: 429={config.rate_limit_rate:.0%}, truncate={config.truncate_rate:.0%}")
+    print(f"\n   export GLM_API_KEY= LLM_PROVIDER=custom LLM_API_KEY=stub LLM_BASE_URL=http://{args.host}:{args.port}/v1")
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
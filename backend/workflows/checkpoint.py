@@ -0,0 +1,201 @@
+"""
+Durable Pipeline Checkpoints
+
+Stage outputs are persisted as they finish, keyed by thread_id:
+- request: the GenerationRequest that started the run
+- skeleton / content / visual_mapping: LangGraph stage outputs
+- node: per-node ContentBlock + VisualComponent (streaming mode)
+
+A run started with resume=True on the same thread_id skips every stage
+(and every node) that is already checkpointed. Checkpoints of runs that
+complete successfully are deleted unless CHECKPOINT_KEEP_COMPLETED is set.
+
+Storage: one SQLite file in the pipeline's checkpoint_path (WAL mode, safe
+to share between the worker threads of a streaming run).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from models.schemas import (
+    GenerationRequest,
+    PageSkeleton,
+    ContentCollection,
+    ContentBlock,
+    VisualMapping,
+    VisualComponent
+)
+
+
+class NodeCheckpoint(BaseModel):
+    """Generated output of one content node"""
+    content: ContentBlock
+    visual: VisualComponent
+
+
+class RunCheckpoint(BaseModel):
+    """Everything persisted for one thread_id"""
+    thread_id: str
+    request: Optional[GenerationRequest] = None
+    skeleton: Optional[PageSkeleton] = None
+    content: Optional[ContentCollection] = None
+    visual_mapping: Optional[VisualMapping] = None
+    nodes: Dict[str, NodeCheckpoint] = Field(default_factory=dict)
+
+
+class CheckpointStore:
+    """SQLite-backed checkpoint store shared by all runs of a pipeline."""
+
+    # Stage kinds stored as whole models
+    STAGE_MODELS = {
+        "request": GenerationRequest,
+        "skeleton": PageSkeleton,
+        "content": ContentCollection,
+        "visual_mapping": VisualMapping
+    }
+
+    def __init__(self, directory: str = "./checkpoints", keep_completed: bool = False):
+        """
+        Open (or create) the checkpoint database.
+
+        Args:
+            directory: Checkpoint directory (the pipeline's checkpoint_path)
+            keep_completed: Keep checkpoints of successful runs
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "checkpoints.sqlite3")
+        self.keep_completed = keep_completed
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL DEFAULT '',
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, kind, key)
+            )
+            """
+        )
+
+    @classmethod
+    def from_env(cls, directory: str) -> Optional["CheckpointStore"]:
+        """
+        Build a store from environment variables, or None if disabled.
+
+        Environment variables:
+            CHECKPOINT_ENABLED: true/false (default: true)
+            CHECKPOINT_KEEP_COMPLETED: Keep checkpoints of successful runs (default: false)
+        """
+        if os.getenv("CHECKPOINT_ENABLED", "true").lower() not in ("1", "true", "yes"):
+            return None
+
+        return cls(
+            directory=directory,
+            keep_completed=os.getenv("CHECKPOINT_KEEP_COMPLETED", "false").lower() in ("1", "true", "yes")
+        )
+
+    # ============ Writes ============
+
+    def _put(self, thread_id: str, kind: str, key: str, payload: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, kind, key, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (thread_id, kind, key, payload, time.time())
+            )
+
+    def save_stage(self, thread_id: str, kind: str, model: BaseModel) -> None:
+        """Persist a stage output (request / skeleton / content / visual_mapping)."""
+        if kind not in self.STAGE_MODELS:
+            raise ValueError(f"Unknown checkpoint kind: {kind}")
+        self._put(thread_id, kind, "", model.model_dump_json())
+
+    def save_node(self, thread_id: str, node_id: str, content: ContentBlock, visual: VisualComponent) -> None:
+        """Persist one finished content node."""
+        self._put(thread_id, "node", node_id, NodeCheckpoint(content=content, visual=visual).model_dump_json())
+
+    def delete(self, thread_id: str) -> None:
+        """Remove every checkpoint of a thread."""
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+
+    def finish(self, thread_id: str) -> None:
+        """Mark a run as successfully completed."""
+        if not self.keep_completed:
+            self.delete(thread_id)
+
+    # ============ Reads ============
+
+    def load(self, thread_id: str) -> Optional[RunCheckpoint]:
+        """Load everything stored for a thread (None if nothing is stored)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, key, payload FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        checkpoint = RunCheckpoint(thread_id=thread_id)
+        for kind, key, payload in rows:
+            try:
+                if kind == "node":
+                    checkpoint.nodes[key] = NodeCheckpoint.model_validate_json(payload)
+                elif kind in self.STAGE_MODELS:
+                    setattr(checkpoint, kind, self.STAGE_MODELS[kind].model_validate_json(payload))
+            except ValueError as e:
+                # Schema changed since the checkpoint was written: recompute that part
+                print(f"⚠️  Ignoring unreadable checkpoint {thread_id}/{kind}/{key}: {e}")
+
+        return checkpoint
+
+    def begin(self, thread_id: str, request: GenerationRequest, resume: bool = False) -> RunCheckpoint:
+        """
+        Start (or resume) a run.
+
+        Without resume, or when the stored request differs from `request`,
+        old checkpoints of the thread are discarded.
+
+        Returns:
+            Checkpoint to resume from (empty for a fresh run)
+        """
+        checkpoint = self.load(thread_id) if resume else None
+
+        if checkpoint and checkpoint.request and not self._same_request(checkpoint.request, request):
+            print(f"⚠️  Checkpoint {thread_id} was created for a different request; starting fresh")
+            checkpoint = None
+
+        if checkpoint is None:
+            self.delete(thread_id)
+            checkpoint = RunCheckpoint(thread_id=thread_id)
+        else:
+            print(f"♻️  Resuming {thread_id}: skeleton={'yes' if checkpoint.skeleton else 'no'}, "
+                  f"{len(checkpoint.nodes)} nodes checkpointed")
+
+        checkpoint.request = request
+        self.save_stage(thread_id, "request", request)
+        return checkpoint
+
+    @staticmethod
+    def _same_request(a: GenerationRequest, b: GenerationRequest) -> bool:
+        return json.dumps(a.model_dump(mode="json"), sort_keys=True) == \
+            json.dumps(b.model_dump(mode="json"), sort_keys=True)
+
+    def list_threads(self) -> List[str]:
+        """Thread ids that currently have checkpoints."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT thread_id FROM checkpoints ORDER BY thread_id"
+            )]
@@ -0,0 +1,131 @@
+"""
+Deadline-Aware Generation
+
+GenerationRequest.deadline_seconds gives a page a latency budget.
+DeadlineBudget tracks elapsed time against it, and the pipeline degrades
+step by step as the budget runs out:
+
+    used >= 50%   short_output             new LLM calls get a lower max_tokens and a brevity note
+    used >= 70%   skipped_expansion_nodes  example / practice expansion nodes not started yet are dropped
+    used >= 90%   cached_blocks /          remaining nodes come from the page's last stored run, or are
+                  rule_based_blocks        built from the skeleton's own metadata (no LLM call)
+    deadline      (same as 90%)            in-flight node calls are abandoned and served that way
+    used >= 50%   rule_based_visuals       graph path: the rule-based mapper replaces the Visual Director call
+
+The streaming paths check the levels whenever a node is dispatched. The
+graph path checks them at the start of each stage; arun() additionally
+abandons a stage call at the deadline, run() cannot interrupt a blocking call.
+
+Every applied degradation is recorded once, in order
+(GenerationResponse.degradations and the COMPLETE event's data). Degraded
+outputs are never checkpointed or stored for incremental regeneration.
+"""
+
+import time
+import threading
+from typing import List, Optional, Set
+
+from models.schemas import PageSkeleton
+
+
+# Degradation codes
+SHORT_OUTPUT = "short_output"
+SKIPPED_EXPANSION_NODES = "skipped_expansion_nodes"
+CACHED_BLOCKS = "cached_blocks"
+RULE_BASED_BLOCKS = "rule_based_blocks"
+RULE_BASED_VISUALS = "rule_based_visuals"
+
+
+class DeadlineBudget:
+    """Latency budget of one run (a no-op when deadline_seconds is None)."""
+
+    # Share of the budget used before each degradation kicks in
+    SHORT_OUTPUT_AT = 0.5
+    SKIP_EXPANSION_AT = 0.7
+    FALLBACK_AT = 0.9
+
+    # max_tokens under short_output, as a share of the provider's max_tokens
+    SHORT_OUTPUT_TOKENS = 0.5
+
+    def __init__(self, deadline_seconds: Optional[float], start_time: Optional[float] = None):
+        """
+        Args:
+            deadline_seconds: Budget for the whole run (None: no deadline)
+            start_time: time.time() the run started (default: now)
+        """
+        self.deadline_seconds = deadline_seconds
+        self.start_time = start_time if start_time is not None else time.time()
+        self._lock = threading.Lock()
+        self._degradations: List[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.deadline_seconds is not None
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (None without a deadline, never negative)."""
+        if not self.enabled:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed())
+
+    def used(self) -> float:
+        """Share of the budget used so far (0.0 without a deadline)."""
+        if not self.enabled:
+            return 0.0
+        return self.elapsed() / self.deadline_seconds if self.deadline_seconds > 0 else 1.0
+
+    # ============ Degradation Levels ============
+
+    def short_output(self) -> bool:
+        return self.used() >= self.SHORT_OUTPUT_AT
+
+    def skip_expansion(self) -> bool:
+        return self.used() >= self.SKIP_EXPANSION_AT
+
+    def fallback(self) -> bool:
+        return self.used() >= self.FALLBACK_AT
+
+    def expired(self) -> bool:
+        return self.used() >= 1.0
+
+    def max_tokens(self, configured: int) -> Optional[int]:
+        """max_tokens override for a new LLM call (None: keep the provider's)."""
+        if not self.short_output():
+            return None
+        self.record(SHORT_OUTPUT)
+        return max(256, int(configured * self.SHORT_OUTPUT_TOKENS))
+
+    # ============ Bookkeeping ============
+
+    def record(self, degradation: str) -> None:
+        """Note an applied degradation (logged the first time)."""
+        with self._lock:
+            if degradation in self._degradations:
+                return
+            self._degradations.append(degradation)
+        print(f"⏳ Deadline: {degradation} ({self.elapsed():.1f}s of {self.deadline_seconds}s used)")
+
+    @property
+    def degradations(self) -> List[str]:
+        with self._lock:
+            return list(self._degradations)
+
+
+def expansion_node_ids(skeleton: PageSkeleton) -> Set[str]:
+    """
+    Nodes that expand a knowledge point (examples, practice) rather than introduce it.
+
+    Every node after the first one of its knowledge_id counts as expansion
+    (see knowledge_point_to_expanded_nodes()).
+    """
+    seen: Set[str] = set()
+    expansion: Set[str] = set()
+    for section in skeleton.sections:
+        for node in section.nodes:
+            if node.knowledge_id in seen:
+                expansion.add(node.node_id)
+            seen.add(node.knowledge_id)
+    return expansion
@@ -0,0 +1,234 @@
+"""
+Incremental Regeneration
+
+Editors usually tweak one knowledge point and regenerate the whole page.
+Every node gets a fingerprint over the ContentNode fields (plus section and
+audience) that feed the Content Expert / Visual Director prompts, folded
+with the fingerprints of its prerequisites (whose content is summarized
+into its prompt, see workflows/scheduler.py). The
+outputs of the last successful run are stored per page_id with those
+fingerprints; the next run of the same page only generates nodes whose
+fingerprint changed and reuses the stored ContentBlock / VisualComponent
+for the rest. GenerationRequest.force_regenerate skips the reuse.
+
+Storage: pages.sqlite3 next to the run checkpoints (checkpoint_path).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.schemas import ContentNode, PageSkeleton, SectionPlan
+from workflows.checkpoint import NodeCheckpoint
+
+
+# Bump when prompt templates change enough that stored outputs are stale
+FINGERPRINT_VERSION = 1
+
+# ContentNode fields that end up in (or derive) the generation prompts
+NODE_PROMPT_FIELDS = (
+    "node_id",
+    "knowledge_id",
+    "title",
+    "category",
+    "difficulty",
+    "cognitive_level",
+    "estimated_time_minutes",
+    "prerequisites",
+    "learning_objectives",
+    "mastery_criteria",
+    "keywords",
+    "original_description",
+    "application_scenarios",
+    "common_misconceptions"
+)
+
+
+def node_fingerprint(node: ContentNode, section: SectionPlan, target_audience: str) -> str:
+    """
+    Stable hash of everything about a node that reaches its prompts.
+
+    Args:
+        node: Skeleton node
+        section: Section the node belongs to
+        target_audience: Request audience
+
+    Returns:
+        Hex digest (changes iff the node's prompt inputs change)
+    """
+    node_data = node.model_dump(mode="json")
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "node": {field: node_data.get(field) for field in NODE_PROMPT_FIELDS},
+        "section": {
+            "title": section.title,
+            "section_type": section.section_type.value,
+            "pedagogical_goal": section.pedagogical_goal
+        },
+        "target_audience": target_audience
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def page_fingerprints(skeleton: PageSkeleton, target_audience: str) -> Dict[str, str]:
+    """
+    Fingerprint every node of a skeleton, including its prerequisites.
+
+    A node's fingerprint folds in those of its prerequisites (resolved by
+    node_id or knowledge_id, like the node scheduler), so regenerating a
+    prerequisite also regenerates its dependents. Unknown references and
+    links closing a cycle are ignored.
+
+    Args:
+        skeleton: Page skeleton
+        target_audience: Request audience
+
+    Returns:
+        node_id -> hex digest
+    """
+    nodes: Dict[str, ContentNode] = {}
+    own: Dict[str, str] = {}
+    by_knowledge_id: Dict[str, str] = {}
+    for section in skeleton.sections:
+        for node in section.nodes:
+            if node.node_id not in nodes:
+                nodes[node.node_id] = node
+                own[node.node_id] = node_fingerprint(node, section, target_audience)
+            by_knowledge_id.setdefault(node.knowledge_id, node.node_id)
+
+    fingerprints: Dict[str, str] = {}
+    visiting: Set[str] = set()
+
+    def resolve(node_id: str) -> str:
+        if node_id in fingerprints:
+            return fingerprints[node_id]
+
+        visiting.add(node_id)
+        prerequisites: List[str] = []
+        for reference in nodes[node_id].prerequisites:
+            target = reference if reference in nodes else by_knowledge_id.get(reference)
+            if target is not None and target != node_id and target not in visiting:
+                prerequisites.append(resolve(target))
+        visiting.discard(node_id)
+
+        fingerprint = own[node_id]
+        if prerequisites:
+            combined = "|".join([fingerprint] + sorted(prerequisites)).encode("utf-8")
+            fingerprint = hashlib.sha256(combined).hexdigest()
+        fingerprints[node_id] = fingerprint
+        return fingerprint
+
+    for node_id in nodes:
+        resolve(node_id)
+    return fingerprints
+
+
+class PageNodeStore:
+    """Node outputs of the last successful run of each page."""
+
+    def __init__(self, directory: str = "./checkpoints"):
+        """
+        Open (or create) the page store.
+
+        Args:
+            directory: Storage directory (the pipeline's checkpoint_path)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "pages.sqlite3")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_nodes (
+                page_id TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (page_id, node_id)
+            )
+            """
+        )
+
+    @classmethod
+    def from_env(cls, directory: str) -> Optional["PageNodeStore"]:
+        """
+        Build a store from environment variables, or None if disabled.
+
+        Environment variables:
+            INCREMENTAL_REGENERATION: true/false (default: true)
+        """
+        if os.getenv("INCREMENTAL_REGENERATION", "true").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(directory=directory)
+
+    def load(self, page_id: str) -> Dict[str, Tuple[str, NodeCheckpoint]]:
+        """Stored (fingerprint, outputs) per node_id of a page."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node_id, fingerprint, payload FROM page_nodes WHERE page_id = ?", (page_id,)
+            ).fetchall()
+
+        nodes = {}
+        for node_id, fingerprint, payload in rows:
+            try:
+                nodes[node_id] = (fingerprint, NodeCheckpoint.model_validate_json(payload))
+            except ValueError as e:
+                print(f"⚠️  Ignoring unreadable stored node {page_id}/{node_id}: {e}")
+        return nodes
+
+    def reusable(self, page_id: str, fingerprints: Dict[str, str]) -> Dict[str, NodeCheckpoint]:
+        """
+        Diff a new skeleton against the page's stored run.
+
+        Args:
+            page_id: Page being generated
+            fingerprints: node_id -> fingerprint of the new skeleton
+
+        Returns:
+            Stored outputs of every node whose fingerprint is unchanged
+        """
+        stored = self.load(page_id)
+        reused = {
+            node_id: outputs
+            for node_id, (fingerprint, outputs) in stored.items()
+            if fingerprints.get(node_id) == fingerprint
+        }
+
+        if stored:
+            print(f"♻️  Incremental: {len(reused)}/{len(fingerprints)} nodes of '{page_id}' unchanged, "
+                  f"{len(fingerprints) - len(reused)} to generate")
+        return reused
+
+    def save(self, page_id: str, nodes: Dict[str, Tuple[str, NodeCheckpoint]]) -> None:
+        """Replace the stored run of a page with (fingerprint, outputs) per node_id."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM page_nodes WHERE page_id = ?", (page_id,))
+                self._conn.executemany(
+                    "INSERT INTO page_nodes (page_id, node_id, fingerprint, payload, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (page_id, node_id, fingerprint, outputs.model_dump_json(), now)
+                        for node_id, (fingerprint, outputs) in nodes.items()
+                    ]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, page_id: str) -> None:
+        """Forget a page (its next run regenerates every node)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM page_nodes WHERE page_id = ?", (page_id,))
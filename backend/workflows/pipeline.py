@@ -7,16 +7,58 @@ This module defines the complete workflow using LangGraph:
 3. Assembler merges and validates output
 """
 
+import os
 import time
-from typing import Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 from langgraph.graph import StateGraph, END
-
-from models.schemas import WorkflowState, GenerationRequest, GenerationResponse
+from langchain_core.runnables import RunnableLambda
+
+from models.schemas import (
+    WorkflowState,
+    GenerationRequest,
+    GenerationResponse,
+    PageSkeleton,
+    ContentCollection,
+    VisualMapping,
+    FrontendSection,
+    FrontendBlock,
+    FrontendPageSchema,
+    StreamingEvent,
+    StreamingEventType,
+    ContentBlock,
+    VisualComponent,
+    UsageReport
+)
 from agents.planner import PlannerAgent
 from agents.content_expert import ContentExpertAgent
 from agents.visual_director import VisualDirectorAgent
 from agents.assembler import AssemblerAgent
+from llm.usage import usage_scope
+from llm.client import get_llm_registry
+from llm.cancellation import CancellationToken, cancellation_scope, cancellable_context
+from workflows.scheduler import NodeScheduler, NodeJob, DEFAULT_SCHEDULING_POLICY, output_lengths
+from workflows.checkpoint import CheckpointStore, RunCheckpoint, NodeCheckpoint
+from workflows.incremental import PageNodeStore, page_fingerprints
+from workflows.deadline import (
+    DeadlineBudget,
+    expansion_node_ids,
+    SHORT_OUTPUT,
+    SKIPPED_EXPANSION_NODES,
+    CACHED_BLOCKS,
+    RULE_BASED_BLOCKS,
+    RULE_BASED_VISUALS
+)
+
+
+class NodeResult(NamedTuple):
+    """Output of one per-node generation job"""
+    content: Optional[ContentBlock]
+    visual: Optional[VisualComponent]
+    block: Optional[FrontendBlock]
+    degraded: bool = False    # Skipped / cached / rule-based under a deadline (never stored)
 
 
 class ContentGenerationPipeline:
@@ -72,9 +114,17 @@ class ContentGenerationPipeline:
 
         Args:
             model_name: Anthropic model to use for all agents
-            checkpoint_path: Path for LangGraph checkpointing (optional, not used currently)
+            checkpoint_path: Directory for durable stage / node checkpoints
+                (see workflows/checkpoint.py; disable with CHECKPOINT_ENABLED=false)
+                and the per-page node store used for incremental regeneration
+                (see workflows/incremental.py; disable with INCREMENTAL_REGENERATION=false)
         """
         self.model_name = model_name
+        self.checkpoints = CheckpointStore.from_env(checkpoint_path)
+        self.pages = PageNodeStore.from_env(checkpoint_path)
+
+        # Streaming node order when the request does not pick one (workflows/scheduler.py)
+        self.scheduling_policy = os.getenv("SCHEDULING_POLICY", DEFAULT_SCHEDULING_POLICY)
 
         # Initialize agents
         self.planner = PlannerAgent(model_name=model_name)
@@ -91,98 +141,264 @@ class ContentGenerationPipeline:
         # Define the graph
         workflow = StateGraph(WorkflowState)
 
-        # Add nodes
-        workflow.add_node("planner", self._planner_node)
-        workflow.add_node("content_expert", self._content_expert_node)
-        workflow.add_node("visual_director", self._visual_director_node)
-        workflow.add_node("assembler", self._assembler_node)
+        # Add nodes (each has a sync and an async implementation, so the same
+        # graph serves both workflow.invoke() and workflow.ainvoke())
+        workflow.add_node("planner", RunnableLambda(self._planner_node, afunc=self._aplanner_node))
+        workflow.add_node("content_expert", RunnableLambda(self._content_expert_node, afunc=self._acontent_expert_node))
+        workflow.add_node("visual_director", RunnableLambda(self._visual_director_node, afunc=self._avisual_director_node))
+        workflow.add_node("assembler", RunnableLambda(self._assembler_node, afunc=self._aassembler_node))
 
         # Define edges
         workflow.set_entry_point("planner")
 
-        # After planner, run workers sequentially (avoid concurrent API calls)
+        # Fan out: both workers start from the planner in the same superstep
+        # (request/token budgets are enforced by the shared rate limiter in llm/)
         workflow.add_edge("planner", "content_expert")
-        workflow.add_edge("content_expert", "visual_director")
-        workflow.add_edge("visual_director", "assembler")
+        workflow.add_edge("planner", "visual_director")
+
+        # Fan in: the assembler waits for both workers
+        workflow.add_edge(["content_expert", "visual_director"], "assembler")
 
         # End after assembler
         workflow.add_edge("assembler", END)
 
-        # Compile workflow (without checkpointer for now)
+        # Stage outputs are checkpointed by the nodes themselves (CheckpointStore),
+        # so the graph is compiled without a LangGraph checkpointer
         return workflow.compile()
 
-    def _planner_node(self, state: WorkflowState) -> WorkflowState:
+    # ============ Graph Nodes ============
+    #
+    # Nodes return partial state updates rather than the mutated state:
+    # errors / warnings / tokens_used / token_usage are reducer fields in
+    # WorkflowState, so returning the whole state would count them twice.
+
+    def _checkpoint_stage(self, thread_id: Optional[str], kind: str, output) -> None:
+        """Persist a stage output for resume (runs without a thread_id are not checkpointed)."""
+        if self.checkpoints and thread_id:
+            self.checkpoints.save_stage(thread_id, kind, output)
+
+    @staticmethod
+    def _usage_update(usage: UsageReport) -> Dict[str, Any]:
+        """State update for the tokens a node consumed."""
+        return {"token_usage": usage, "tokens_used": usage.total.total_tokens}
+
+    def _planner_node(self, state: WorkflowState) -> Dict[str, Any]:
         """Planner Agent node."""
         print("\n" + "="*60)
         print("🏗️  STAGE 1: PLANNER AGENT")
         print("="*60)
 
+        if state.skeleton:
+            print("♻️  Reusing checkpointed skeleton")
+            return {}
+
+        usage = UsageReport()
         try:
-            skeleton = self.planner.plan(state.request)
-            state.skeleton = skeleton
-            state.tokens_used += 2000  # Estimated token usage
+            with usage_scope(stage="planner", report=usage):
+                skeleton = self.planner.plan(state.request)
+            self._checkpoint_stage(state.thread_id, "skeleton", skeleton)
+            budget = self._graph_budget(state)
+            return {
+                "skeleton": self._deadline_skeleton(skeleton, budget),
+                "degradations": budget.degradations,
+                **self._usage_update(usage)
+            }
 
         except Exception as e:
-            state.errors.append(f"Planner failed: {e}")
+            return {"errors": [f"Planner failed: {e}"], **self._usage_update(usage)}
+
+    async def _aplanner_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Planner Agent node (async)."""
+        print("\n" + "="*60)
+        print("🏗️  STAGE 1: PLANNER AGENT")
+        print("="*60)
+
+        if state.skeleton:
+            print("♻️  Reusing checkpointed skeleton")
+            return {}
 
-        return state
+        usage = UsageReport()
+        try:
+            with usage_scope(stage="planner", report=usage):
+                skeleton = await self.planner.aplan(state.request)
+            self._checkpoint_stage(state.thread_id, "skeleton", skeleton)
+            budget = self._graph_budget(state)
+            return {
+                "skeleton": self._deadline_skeleton(skeleton, budget),
+                "degradations": budget.degradations,
+                **self._usage_update(usage)
+            }
+
+        except Exception as e:
+            return {"errors": [f"Planner failed: {e}"], **self._usage_update(usage)}
 
-    def _content_expert_node(self, state: WorkflowState) -> WorkflowState:
+    def _content_expert_node(self, state: WorkflowState) -> Dict[str, Any]:
         """Content Expert Agent node."""
         print("\n" + "="*60)
         print("📚 STAGE 2A: CONTENT EXPERT AGENT")
         print("="*60)
 
-        # Add delay to avoid API rate limiting
-        import time
-        time.sleep(2)
-
         # Only proceed if skeleton exists
         if not state.skeleton:
-            state.errors.append("Content Expert: No skeleton to work with")
-            return state
+            return {"errors": ["Content Expert: No skeleton to work with"]}
 
+        if state.content:
+            print("♻️  Reusing checkpointed content")
+            return {}
+
+        usage = UsageReport()
+        budget = self._graph_budget(state)
         try:
-            content = self.content_expert.generate_content(
-                skeleton=state.skeleton,
-                target_audience=state.request.target_audience
-            )
-            state.content = content
-            state.tokens_used += 5000  # Estimated token usage
+            # Only nodes that changed since the page's last run are generated
+            reused = self._reusable_nodes(state.request, state.skeleton)
+            pending = self._pending_skeleton(state.skeleton, reused)
+            generated = ContentCollection(contents=[])
+            if pending and budget.fallback():
+                generated = ContentCollection(contents=self._fallback_contents(pending, budget))
+            elif pending:
+                with usage_scope(stage="content_expert", report=usage):
+                    generated = self.content_expert.generate_content(
+                        skeleton=pending,
+                        target_audience=state.request.target_audience,
+                        max_tokens=budget.max_tokens(self.content_expert.llm.config.max_tokens)
+                    )
+            content = ContentCollection(contents=self._merge_reused(
+                state.skeleton, generated.contents, {k: v.content for k, v in reused.items()}
+            ))
+            if not self._served_degraded(budget.degradations):
+                self._checkpoint_stage(state.thread_id, "content", content)
+            return {"content": content, "degradations": budget.degradations, **self._usage_update(usage)}
 
         except Exception as e:
-            state.errors.append(f"Content Expert failed: {e}")
+            return {"errors": [f"Content Expert failed: {e}"], **self._usage_update(usage)}
+
+    async def _acontent_expert_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Content Expert Agent node (async)."""
+        print("\n" + "="*60)
+        print("📚 STAGE 2A: CONTENT EXPERT AGENT")
+        print("="*60)
 
-        return state
+        # Only proceed if skeleton exists
+        if not state.skeleton:
+            return {"errors": ["Content Expert: No skeleton to work with"]}
+
+        if state.content:
+            print("♻️  Reusing checkpointed content")
+            return {}
+
+        usage = UsageReport()
+        budget = self._graph_budget(state)
+        try:
+            # Only nodes that changed since the page's last run are generated
+            reused = self._reusable_nodes(state.request, state.skeleton)
+            pending = self._pending_skeleton(state.skeleton, reused)
+            generated = ContentCollection(contents=[])
+            if pending and budget.fallback():
+                generated = ContentCollection(contents=self._fallback_contents(pending, budget))
+            elif pending:
+                try:
+                    with usage_scope(stage="content_expert", report=usage):
+                        generated = await asyncio.wait_for(
+                            self.content_expert.agenerate_content(
+                                skeleton=pending,
+                                target_audience=state.request.target_audience,
+                                max_tokens=budget.max_tokens(self.content_expert.llm.config.max_tokens)
+                            ),
+                            timeout=budget.remaining()
+                        )
+                except asyncio.TimeoutError:
+                    generated = ContentCollection(contents=self._fallback_contents(pending, budget))
+            content = ContentCollection(contents=self._merge_reused(
+                state.skeleton, generated.contents, {k: v.content for k, v in reused.items()}
+            ))
+            if not self._served_degraded(budget.degradations):
+                self._checkpoint_stage(state.thread_id, "content", content)
+            return {"content": content, "degradations": budget.degradations, **self._usage_update(usage)}
+
+        except Exception as e:
+            return {"errors": [f"Content Expert failed: {e}"], **self._usage_update(usage)}
 
-    def _visual_director_node(self, state: WorkflowState) -> WorkflowState:
+    def _visual_director_node(self, state: WorkflowState) -> Dict[str, Any]:
         """Visual Director Agent node."""
         print("\n" + "="*60)
         print("🎨 STAGE 2B: VISUAL DIRECTOR AGENT")
         print("="*60)
 
-        # Add delay to avoid API rate limiting
-        import time
-        time.sleep(2)
-
         # Only proceed if skeleton exists
         if not state.skeleton:
-            state.errors.append("Visual Director: No skeleton to work with")
-            return state
+            return {"errors": ["Visual Director: No skeleton to work with"]}
+
+        if state.visual_mapping:
+            print("♻️  Reusing checkpointed visual mapping")
+            return {}
 
+        usage = UsageReport()
+        budget = self._graph_budget(state)
         try:
-            visual_mapping = self.visual_director.map_content_to_visuals(
-                skeleton=state.skeleton
-            )
-            state.visual_mapping = visual_mapping
-            state.tokens_used += 1500  # Estimated token usage
+            # Only nodes that changed since the page's last run are mapped
+            reused = self._reusable_nodes(state.request, state.skeleton)
+            pending = self._pending_skeleton(state.skeleton, reused)
+            generated = VisualMapping(mappings=[])
+            if pending and budget.short_output():
+                generated = VisualMapping(mappings=self._fallback_visuals(pending, budget))
+            elif pending:
+                with usage_scope(stage="visual_director", report=usage):
+                    generated = self.visual_director.map_content_to_visuals(
+                        skeleton=pending
+                    )
+            visual_mapping = VisualMapping(mappings=self._merge_reused(
+                state.skeleton, generated.mappings, {k: v.visual for k, v in reused.items()}
+            ))
+            if not self._served_degraded(budget.degradations):
+                self._checkpoint_stage(state.thread_id, "visual_mapping", visual_mapping)
+            return {"visual_mapping": visual_mapping, "degradations": budget.degradations, **self._usage_update(usage)}
 
         except Exception as e:
-            state.errors.append(f"Visual Director failed: {e}")
+            return {"errors": [f"Visual Director failed: {e}"], **self._usage_update(usage)}
+
+    async def _avisual_director_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Visual Director Agent node (async)."""
+        print("\n" + "="*60)
+        print("🎨 STAGE 2B: VISUAL DIRECTOR AGENT")
+        print("="*60)
 
-        return state
+        # Only proceed if skeleton exists
+        if not state.skeleton:
+            return {"errors": ["Visual Director: No skeleton to work with"]}
+
+        if state.visual_mapping:
+            print("♻️  Reusing checkpointed visual mapping")
+            return {}
+
+        usage = UsageReport()
+        budget = self._graph_budget(state)
+        try:
+            # Only nodes that changed since the page's last run are mapped
+            reused = self._reusable_nodes(state.request, state.skeleton)
+            pending = self._pending_skeleton(state.skeleton, reused)
+            generated = VisualMapping(mappings=[])
+            if pending and budget.short_output():
+                generated = VisualMapping(mappings=self._fallback_visuals(pending, budget))
+            elif pending:
+                try:
+                    with usage_scope(stage="visual_director", report=usage):
+                        generated = await asyncio.wait_for(
+                            self.visual_director.amap_content_to_visuals(skeleton=pending),
+                            timeout=budget.remaining()
+                        )
+                except asyncio.TimeoutError:
+                    generated = VisualMapping(mappings=self._fallback_visuals(pending, budget))
+            visual_mapping = VisualMapping(mappings=self._merge_reused(
+                state.skeleton, generated.mappings, {k: v.visual for k, v in reused.items()}
+            ))
+            if not self._served_degraded(budget.degradations):
+                self._checkpoint_stage(state.thread_id, "visual_mapping", visual_mapping)
+            return {"visual_mapping": visual_mapping, "degradations": budget.degradations, **self._usage_update(usage)}
+
+        except Exception as e:
+            return {"errors": [f"Visual Director failed: {e}"], **self._usage_update(usage)}
 
-    def _assembler_node(self, state: WorkflowState) -> WorkflowState:
+    def _assembler_node(self, state: WorkflowState) -> Dict[str, Any]:
         """Assembler Agent node."""
         print("\n" + "="*60)
         print("🔧 STAGE 3: ASSEMBLER & VALIDATOR")
@@ -190,16 +406,13 @@ class ContentGenerationPipeline:
 
         # Check if both workers completed
         if not state.skeleton:
-            state.errors.append("Assembler: No skeleton available")
-            return state
+            return {"errors": ["Assembler: No skeleton available"]}
 
         if not state.content:
-            state.errors.append("Assembler: No content available")
-            return state
+            return {"errors": ["Assembler: No content available"]}
 
         if not state.visual_mapping:
-            state.errors.append("Assembler: No visual mapping available")
-            return state
+            return {"errors": ["Assembler: No visual mapping available"]}
 
         try:
             final_schema = self.assembler.assemble(
@@ -208,44 +421,101 @@ class ContentGenerationPipeline:
                 visual_mapping=state.visual_mapping
             )
 
-            state.final_schema = final_schema
-            state.warnings.extend(self.assembler.warnings)
-
             print("\n" + "="*60)
             print("✅ PIPELINE COMPLETE")
             print("="*60)
 
+            return {"final_schema": final_schema, "warnings": list(self.assembler.warnings)}
+
         except Exception as e:
-            state.errors.append(f"Assembler failed: {e}")
+            return {"errors": [f"Assembler failed: {e}"]}
 
-        return state
+    async def _aassembler_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Assembler Agent node (async). Assembly is CPU-only, so it runs inline."""
+        return self._assembler_node(state)
 
-    def run(self, request: GenerationRequest, thread_id: str = None) -> GenerationResponse:
+    def run(
+        self,
+        request: GenerationRequest,
+        thread_id: str = None,
+        resume: bool = False
+    ) -> GenerationResponse:
         """
         Run the complete pipeline.
 
         Args:
             request: Generation request
-            thread_id: Optional thread ID for resuming conversations
+            thread_id: Optional thread ID; stage outputs are checkpointed under it
+            resume: Continue from the thread's checkpoint instead of starting over
 
         Returns:
             GenerationResponse with final schema and metadata
         """
+        initial_state = self._start_run(request, thread_id, resume)
+
+        # Run workflow
+        config = {"configurable": {"thread_id": thread_id or "default"}}
+        final_state = self.workflow.invoke(initial_state, config)
+
+        return self._build_response(final_state, initial_state.start_time)
+
+    async def arun(
+        self,
+        request: GenerationRequest,
+        thread_id: str = None,
+        resume: bool = False
+    ) -> GenerationResponse:
+        """
+        Async variant of run() built on LangGraph's ainvoke.
+
+        All LLM calls use ainvoke, so the event loop stays free while a page
+        is being generated.
+        """
+        initial_state = self._start_run(request, thread_id, resume)
+
+        config = {"configurable": {"thread_id": thread_id or "default"}}
+        final_state = await self.workflow.ainvoke(initial_state, config)
+
+        return self._build_response(final_state, initial_state.start_time)
+
+    def _start_run(
+        self,
+        request: GenerationRequest,
+        thread_id: Optional[str] = None,
+        resume: bool = False
+    ) -> WorkflowState:
+        """Log the request and build the initial workflow state (pre-filled when resuming)."""
         print("\n🚀 Starting Multi-Agent Content Generation Pipeline")
         print(f"   Topic: {request.topic}")
         print(f"   Audience: {request.target_audience}")
         print(f"   Difficulty: {request.difficulty.value}")
 
-        # Initialize state
-        initial_state = WorkflowState(
+        checkpoint = self._begin_checkpoint(request, thread_id, resume) or RunCheckpoint(thread_id="")
+
+        return WorkflowState(
             request=request,
+            thread_id=thread_id,
+            skeleton=checkpoint.skeleton,
+            content=checkpoint.content,
+            visual_mapping=checkpoint.visual_mapping,
             start_time=time.time()
         )
 
-        # Run workflow
-        config = {"configurable": {"thread_id": thread_id or "default"}}
-        final_state = self.workflow.invoke(initial_state, config)
-
+    def _begin_checkpoint(
+        self,
+        request: GenerationRequest,
+        thread_id: Optional[str],
+        resume: bool
+    ) -> Optional[RunCheckpoint]:
+        """Open the thread's checkpoint (None when checkpointing is off or there is no thread_id)."""
+        if not (self.checkpoints and thread_id):
+            if resume:
+                print("⚠️  resume requested without thread_id (or checkpoints disabled); starting fresh")
+            return None
+        return self.checkpoints.begin(thread_id, request, resume=resume)
+
+    def _build_response(self, final_state, start_time: float) -> GenerationResponse:
+        """Convert the final workflow state into a GenerationResponse."""
         # Handle potential dict return from LangGraph (in case state is serialized)
         if isinstance(final_state, dict):
             # Convert dict back to WorkflowState
@@ -253,7 +523,7 @@ class ContentGenerationPipeline:
 
         # Calculate timing
         end_time = time.time()
-        generation_time = end_time - initial_state.start_time
+        generation_time = end_time - start_time
 
         # Build response with error handling
         try:
@@ -264,9 +534,11 @@ class ContentGenerationPipeline:
                 content_stage=final_state.content,
                 visual_stage=final_state.visual_mapping,
                 tokens_used=final_state.tokens_used,
+                token_usage=final_state.token_usage,
                 generation_time_seconds=generation_time,
                 error="; ".join(final_state.errors) if final_state.errors else None,
-                warnings=final_state.warnings if hasattr(final_state, 'warnings') else []
+                warnings=final_state.warnings if hasattr(final_state, 'warnings') else [],
+                degradations=list(dict.fromkeys(final_state.degradations))
             )
         except Exception as e:
             print(f"⚠️  Error building response: {e}")
@@ -278,41 +550,591 @@ class ContentGenerationPipeline:
                 generation_time_seconds=generation_time
             )
 
+        if response.success and self.checkpoints and final_state.thread_id:
+            self.checkpoints.finish(final_state.thread_id)
+
+        # Cached / rule-based outputs must not become the page's baseline
+        degraded = self._served_degraded(response.degradations)
+        if response.success and final_state.content and final_state.visual_mapping and not degraded:
+            visuals = {v.node_id: v for v in final_state.visual_mapping.mappings}
+            self._remember_page(final_state.request, final_state.skeleton, {
+                c.node_id: NodeCheckpoint(content=c, visual=visuals[c.node_id])
+                for c in final_state.content.contents if c.node_id in visuals
+            })
+
         return response
 
-    def run_streaming(self, request: GenerationRequest, thread_id: str = None):
+    def run_streaming(
+        self,
+        request: GenerationRequest,
+        thread_id: str = None,
+        resume: bool = False,
+        cancel_token: Optional[CancellationToken] = None
+    ):
         """
         Run the pipeline with streaming output.
 
-        Yields StreamingEvent objects as content is generated.
-        """
-        from models.schemas import StreamingEvent, StreamingEventType
+        Yields StreamingEvent objects as content is generated. Nodes are
+        generated by a bounded worker pool (LLMConfig.max_concurrency) in
+        prerequisite order, free workers taking the most urgent ready node
+        under the request's scheduling policy (see workflows/scheduler.py), so BLOCK_READY
+        events arrive in completion order and carry the block's skeleton
+        index; the final schema is assembled in skeleton order.
 
+        With a thread_id, the skeleton and every finished node are
+        checkpointed; resume=True continues from that checkpoint (restored
+        blocks are emitted first, then only the missing nodes are generated).
+
+        Cancelling `cancel_token` stops the run: queued nodes are dropped,
+        no further LLM calls are made and GenerationCancelled is raised to
+        the consumer (checkpoints are kept, so the run can be resumed).
+        """
         print("\n🚀 Starting Multi-Agent Content Generation Pipeline (Streaming)")
 
         start_time = time.time()
+        usage = UsageReport()
 
         # Helper to get elapsed time
         def get_elapsed():
             return time.time() - start_time
 
+        checkpoint = self._begin_checkpoint(request, thread_id, resume)
+
         # ============ STAGE 1: PLANNER ============
-        yield StreamingEvent(
-            type=StreamingEventType.STAGE_START,
-            stage="planner",
-            data={"elapsed": get_elapsed()}
+        yield self._stage_start_event("planner", get_elapsed())
+
+        try:
+            skeleton = checkpoint.skeleton if checkpoint else None
+            if skeleton is None:
+                with usage_scope(stage="planner", report=usage), cancellation_scope(cancel_token):
+                    skeleton = self.planner.plan(request)
+                self._checkpoint_stage(thread_id, "skeleton", skeleton)
+        except Exception as e:
+            yield self._error_event("planner", e)
+            return
+
+        yield from self._skeleton_events(skeleton, get_elapsed())
+        yield self._placeholder_event(skeleton)
+
+        # ============ STAGE 2: PROGRESSIVE ASSEMBLY ============
+        yield self._stage_start_event("assembler", get_elapsed())
+
+        try:
+            jobs = self._node_jobs(skeleton)
+            total_blocks = len(jobs)
+            scheduler = self._node_scheduler(jobs, request)
+            budget = DeadlineBudget(request.deadline_seconds, start_time)
+            degrade = self._deadline_degrader(skeleton, budget, total_blocks)
+            blocks: Dict[int, FrontendBlock] = {}
+            futures: Dict[Future, NodeJob] = {}
+            node_tokens: Dict[Future, CancellationToken] = {}
+
+            workers = self._worker_count(total_blocks)
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="node-gen")
+
+            def submit(index: int) -> None:
+                prerequisite_context = scheduler.start(index)
+                degraded = degrade(jobs[index])
+                if degraded:
+                    future = Future()
+                    future.set_result(degraded)
+                else:
+                    # Each job gets its own copy of the context (usage scope) and
+                    # its own token, cancelled with the run or on its own
+                    node_token = cancel_token.child() if cancel_token else CancellationToken()
+                    future = executor.submit(
+                        cancellable_context(node_token).run,
+                        self._generate_block, jobs[index], request.target_audience, total_blocks, usage,
+                        prerequisite_context, budget.max_tokens(self.content_expert.llm.config.max_tokens)
+                    )
+                    node_tokens[future] = node_token
+                futures[future] = jobs[index]
+
+            def dispatch() -> None:
+                # Only hand out as many nodes as there are free workers, so the
+                # scheduling policy (not the executor queue) picks the next node
+                for index in scheduler.ready()[:workers - len(futures)]:
+                    submit(index)
+
+            try:
+                # Checkpointed (resume) and unchanged (incremental) nodes are
+                # emitted first and never regenerated
+                restored = self._restorable_nodes(request, skeleton, checkpoint)
+                outputs: Dict[str, NodeCheckpoint] = {}
+                completed = 0
+                for index, section, block in self._restore_nodes(jobs, scheduler, restored, outputs, total_blocks):
+                    completed += 1
+                    if block:
+                        blocks[index] = block
+                        yield self._block_ready_event(block, section, index, completed, total_blocks)
+
+                dispatch()
+
+                # Emit blocks as they finish, tagged with their skeleton index;
+                # dependents start as soon as their prerequisites are done
+                while futures:
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+
+                    done, _ = wait(futures, timeout=budget.remaining(), return_when=FIRST_COMPLETED)
+                    if not done:
+                        # Deadline reached: stop waiting and serve in-flight nodes degraded.
+                        # future.cancel() cannot stop a node already running on a
+                        # worker thread; cancelling its token makes its LLM call stop
+                        # at the next streamed chunk or retry (GenerationCancelled goes
+                        # to the discarded future) and frees the worker. A call still
+                        # waiting for its first token holds the thread until then.
+                        for future in list(futures):
+                            future.cancel()
+                            if future in node_tokens:
+                                node_tokens.pop(future).cancel("deadline reached")
+                            job = futures.pop(future)
+                            replacement = Future()
+                            replacement.set_result(degrade(job, force=True))
+                            futures[replacement] = job
+                        continue
+
+                    for future in sorted(done, key=lambda f: futures[f][0]):
+                        index, section, node, _ = futures.pop(future)
+                        node_tokens.pop(future, None)
+                        result = future.result()
+                        completed += 1
+
+                        self._record_node(thread_id, node, result, outputs)
+                        scheduler.complete(index, result.content)
+                        dispatch()
+
+                        if result.block:
+                            blocks[index] = result.block
+                            yield self._block_ready_event(result.block, section, index, completed, total_blocks)
+            finally:
+                # Drop queued nodes and stop running ones if the consumer stopped listening
+                executor.shutdown(wait=False, cancel_futures=True)
+                for node_token in node_tokens.values():
+                    node_token.cancel("stream closed")
+
+            sections, all_blocks = self._ordered_sections(skeleton, blocks)
+            complete_event = self._finalize_streaming(
+                skeleton, sections, all_blocks, get_elapsed(), usage, budget.degradations
+            )
+            if checkpoint:
+                self.checkpoints.finish(thread_id)
+            if not self._served_degraded(budget.degradations):
+                self._remember_page(request, skeleton, outputs)
+            yield complete_event
+
+        except Exception as e:
+            yield self._error_event("assembler", e, include_traceback=True)
+            return
+
+    async def arun_streaming(
+        self,
+        request: GenerationRequest,
+        thread_id: str = None,
+        resume: bool = False,
+        node_pool: Optional[asyncio.Semaphore] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Async variant of run_streaming().
+
+        Async generator yielding the same StreamingEvent sequence; every LLM
+        call is awaited with ainvoke.
+
+        Args:
+            node_pool: Optional limit on node generations in flight shared
+                with other runs (see arun_many()); the run's own worker limit
+                still applies
+            cancel_token: Cancelling it (from any thread) cancels the node
+                tasks in flight, aborting their provider requests
+        """
+        print("\n🚀 Starting Multi-Agent Content Generation Pipeline (Async Streaming)")
+
+        start_time = time.time()
+        usage = UsageReport()
+
+        def get_elapsed():
+            return time.time() - start_time
+
+        checkpoint = self._begin_checkpoint(request, thread_id, resume)
+
+        # ============ STAGE 1: PLANNER ============
+        yield self._stage_start_event("planner", get_elapsed())
+
+        try:
+            skeleton = checkpoint.skeleton if checkpoint else None
+            if skeleton is None:
+                with usage_scope(stage="planner", report=usage), cancellation_scope(cancel_token):
+                    skeleton = await self.planner.aplan(request)
+                self._checkpoint_stage(thread_id, "skeleton", skeleton)
+        except Exception as e:
+            yield self._error_event("planner", e)
+            return
+
+        for event in self._skeleton_events(skeleton, get_elapsed()):
+            yield event
+        yield self._placeholder_event(skeleton)
+
+        # ============ STAGE 2: PROGRESSIVE ASSEMBLY ============
+        yield self._stage_start_event("assembler", get_elapsed())
+
+        try:
+            jobs = self._node_jobs(skeleton)
+            total_blocks = len(jobs)
+            scheduler = self._node_scheduler(jobs, request)
+            budget = DeadlineBudget(request.deadline_seconds, start_time)
+            degrade = self._deadline_degrader(skeleton, budget, total_blocks)
+            workers = self._worker_count(total_blocks)
+            blocks: Dict[int, FrontendBlock] = {}
+            tasks: Dict[asyncio.Future, NodeJob] = {}
+
+            async def run_job(job: NodeJob, prerequisite_context: Optional[str]) -> NodeResult:
+                max_tokens = budget.max_tokens(self.content_expert.llm.config.max_tokens)
+                if node_pool is None:
+                    return await self._agenerate_block(
+                        job, request.target_audience, total_blocks, usage, prerequisite_context, max_tokens
+                    )
+                async with node_pool:
+                    return await self._agenerate_block(
+                        job, request.target_audience, total_blocks, usage, prerequisite_context, max_tokens
+                    )
+
+            def resolved(result: NodeResult) -> asyncio.Future:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(result)
+                return future
+
+            def launch(index: int) -> None:
+                prerequisite_context = scheduler.start(index)
+                degraded = degrade(jobs[index])
+                task = resolved(degraded) if degraded else loop.create_task(
+                    run_job(jobs[index], prerequisite_context), context=cancellable_context(cancel_token)
+                )
+                tasks[task] = jobs[index]
+
+            def cancel_in_flight() -> None:
+                for task in tasks:
+                    task.cancel()
+
+            loop = asyncio.get_running_loop()
+            if cancel_token:
+                cancel_token.on_cancel(lambda: loop.call_soon_threadsafe(cancel_in_flight))
+
+            def dispatch() -> None:
+                # At most `workers` nodes in flight; the scheduling policy picks the next one
+                for index in scheduler.ready()[:workers - len(tasks)]:
+                    launch(index)
+
+            try:
+                # Checkpointed (resume) and unchanged (incremental) nodes are
+                # emitted first and never regenerated
+                restored = self._restorable_nodes(request, skeleton, checkpoint)
+                outputs: Dict[str, NodeCheckpoint] = {}
+                completed = 0
+                for index, section, block in self._restore_nodes(jobs, scheduler, restored, outputs, total_blocks):
+                    completed += 1
+                    if block:
+                        blocks[index] = block
+                        yield self._block_ready_event(block, section, index, completed, total_blocks)
+
+                dispatch()
+
+                # Emit blocks as they finish, tagged with their skeleton index;
+                # dependents start as soon as their prerequisites are done
+                while tasks:
+                    done, _ = await asyncio.wait(tasks, timeout=budget.remaining(), return_when=asyncio.FIRST_COMPLETED)
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    if not done:
+                        # Deadline reached: cancel in-flight nodes and serve them degraded
+                        for task in list(tasks):
+                            task.cancel()
+                            job = tasks.pop(task)
+                            tasks[resolved(degrade(job, force=True))] = job
+                        continue
+
+                    for task in sorted(done, key=lambda t: tasks[t][0]):
+                        index, section, node, _ = tasks.pop(task)
+                        result = task.result()
+                        completed += 1
+
+                        self._record_node(thread_id, node, result, outputs)
+                        scheduler.complete(index, result.content)
+                        dispatch()
+
+                        if result.block:
+                            blocks[index] = result.block
+                            yield self._block_ready_event(result.block, section, index, completed, total_blocks)
+            finally:
+                # Cancel outstanding nodes if the consumer stopped listening
+                for task in tasks:
+                    task.cancel()
+
+            sections, all_blocks = self._ordered_sections(skeleton, blocks)
+            complete_event = self._finalize_streaming(
+                skeleton, sections, all_blocks, get_elapsed(), usage, budget.degradations
+            )
+            if checkpoint:
+                self.checkpoints.finish(thread_id)
+            if not self._served_degraded(budget.degradations):
+                self._remember_page(request, skeleton, outputs)
+            yield complete_event
+
+        except Exception as e:
+            yield self._error_event("assembler", e, include_traceback=True)
+            return
+
+    # ============ Batch Generation ============
+
+    def run_many(
+        self,
+        requests: List[GenerationRequest],
+        max_concurrency: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        on_result: Optional[Callable[[int, GenerationResponse], None]] = None
+    ) -> List[GenerationResponse]:
+        """
+        Generate many pages through one shared node worker pool.
+
+        Blocking wrapper around arun_many(); must not be called from a
+        running event loop. Each call runs on a fresh event loop with its
+        own async connection pools (closed before returning), so it can be
+        called any number of times per process.
+
+        Args:
+            requests: Pages to generate
+            max_concurrency: Node generations in flight across all pages
+                (default: the Content Expert provider's max_concurrency)
+            max_pages: Pages open at once (default: 2 x max_concurrency)
+            on_result: Called with (index, response) as each page finishes
+
+        Returns:
+            One GenerationResponse per request, in request order
+        """
+        async def collect() -> List[GenerationResponse]:
+            responses: List[Optional[GenerationResponse]] = [None] * len(requests)
+            try:
+                async for index, response in self.arun_many(requests, max_concurrency, max_pages):
+                    responses[index] = response
+                    if on_result:
+                        on_result(index, response)
+            finally:
+                # This loop ends with asyncio.run(): release its connections now
+                await get_llm_registry().aclose_loop()
+            return responses
+
+        return asyncio.run(collect())
+
+    async def arun_many(
+        self,
+        requests: List[GenerationRequest],
+        max_concurrency: Optional[int] = None,
+        max_pages: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, GenerationResponse]]:
+        """
+        Async variant of run_many(): yields (index, response) as pages finish.
+
+        Every page runs the async streaming path, so nodes of all pages are
+        generated per node through one shared pool (and the process-wide
+        rate limiter) instead of one page at a time. Failed pages yield an
+        unsuccessful response; they never stop the batch.
+        """
+        if not requests:
+            return
+
+        max_concurrency = max_concurrency or self.content_expert.llm.config.max_concurrency
+        max_pages = max_pages or 2 * max_concurrency
+        node_pool = asyncio.Semaphore(max_concurrency)
+        page_slots = asyncio.Semaphore(max_pages)
+
+        print(f"\n📚 Batch: {len(requests)} pages, {max_concurrency} shared node workers, "
+              f"up to {max_pages} pages open")
+
+        async def run_page(index: int) -> Tuple[int, GenerationResponse]:
+            async with page_slots:
+                return index, await self._arun_page(requests[index], node_pool)
+
+        pending = {asyncio.ensure_future(run_page(index)) for index in range(len(requests))}
+        finished = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, response = task.result()
+                    finished += 1
+                    status = "✅" if response.success else "❌"
+                    print(f"{status} Batch page {finished}/{len(requests)} done (request {index})")
+                    yield index, response
+        finally:
+            # Consumer stopped early: do not leave pages running
+            for task in pending:
+                task.cancel()
+
+    async def _arun_page(self, request: GenerationRequest, node_pool: asyncio.Semaphore) -> GenerationResponse:
+        """One page of a batch, as a GenerationResponse."""
+        start_time = time.time()
+        try:
+            async for event in self.arun_streaming(request, node_pool=node_pool):
+                if event.type == StreamingEventType.ERROR:
+                    return GenerationResponse(
+                        success=False,
+                        error=f"{event.stage}: {event.data.get('error')}",
+                        generation_time_seconds=time.time() - start_time
+                    )
+                if event.type == StreamingEventType.COMPLETE:
+                    return GenerationResponse(
+                        success=True,
+                        page_schema=FrontendPageSchema.model_validate(event.data["schema"]),
+                        tokens_used=event.data["tokens_used"],
+                        token_usage=event.data["token_usage"],
+                        generation_time_seconds=event.data["generation_time"],
+                        degradations=event.data["degradations"]
+                    )
+        except Exception as e:
+            return GenerationResponse(
+                success=False,
+                error=f"Pipeline execution error: {e}",
+                generation_time_seconds=time.time() - start_time
+            )
+
+        return GenerationResponse(
+            success=False,
+            error="Pipeline finished without a result",
+            generation_time_seconds=time.time() - start_time
         )
 
+    # ============ Deadline Degradation ============
+
+    @staticmethod
+    def _graph_budget(state: WorkflowState) -> DeadlineBudget:
+        """Deadline budget of a graph run (measured from the run's start_time)."""
+        return DeadlineBudget(state.request.deadline_seconds, state.start_time)
+
+    @staticmethod
+    def _served_degraded(degradations: List[str]) -> bool:
+        """Whether outputs were skipped / cached / rule-based (short LLM output still counts as generated)."""
+        return any(code != SHORT_OUTPUT for code in degradations)
+
+    def _deadline_skeleton(self, skeleton: PageSkeleton, budget: DeadlineBudget) -> PageSkeleton:
+        """Drop expansion nodes once the budget reaches the skip_expansion level."""
+        if not budget.skip_expansion():
+            return skeleton
+        expansion = expansion_node_ids(skeleton)
+        if not expansion:
+            return skeleton
+
+        budget.record(SKIPPED_EXPANSION_NODES)
+        print(f"⏳ Skipping {len(expansion)} expansion nodes")
+        sections = [
+            section.model_copy(update={"nodes": [n for n in section.nodes if n.node_id not in expansion]})
+            for section in skeleton.sections
+        ]
+        return skeleton.model_copy(update={"sections": [section for section in sections if section.nodes]})
+
+    def _stored_outputs(self, page_id: str) -> Dict[str, NodeCheckpoint]:
+        """Outputs of the page's last stored run, whatever their fingerprint."""
+        if not self.pages:
+            return {}
+        return {node_id: saved for node_id, (_, saved) in self.pages.load(page_id).items()}
+
+    def _fallback_content(self, node, stored: Dict[str, NodeCheckpoint], budget: DeadlineBudget) -> ContentBlock:
+        """Content without an LLM call: the stored block if there is one, else built from node metadata."""
+        if node.node_id in stored:
+            budget.record(CACHED_BLOCKS)
+            return stored[node.node_id].content
+        budget.record(RULE_BASED_BLOCKS)
+        return self.content_expert.rule_based_content(node)
+
+    def _fallback_contents(self, skeleton: PageSkeleton, budget: DeadlineBudget) -> List[ContentBlock]:
+        """_fallback_content() for every node of a skeleton."""
+        stored = self._stored_outputs(skeleton.page_id)
+        return [
+            self._fallback_content(node, stored, budget)
+            for section in skeleton.sections
+            for node in section.nodes
+        ]
+
+    def _fallback_visuals(self, skeleton: PageSkeleton, budget: DeadlineBudget) -> List[VisualComponent]:
+        """Rule-based visual mapping (no LLM call) for every node of a skeleton."""
+        budget.record(RULE_BASED_VISUALS)
+        return [
+            self.visual_director.map_single_node(node=node, section_title=section.title)
+            for section in skeleton.sections
+            for node in section.nodes
+        ]
+
+    def _deadline_degrader(
+        self,
+        skeleton: PageSkeleton,
+        budget: DeadlineBudget,
+        total_blocks: int
+    ) -> Callable[..., Optional[NodeResult]]:
+        """
+        Per-node degradation decision for a streaming run.
+
+        Returns:
+            degrade(job, force=False) -> NodeResult to serve instead of
+            generating the node, or None to generate it normally. force=True
+            (deadline reached) always returns a cached / rule-based result.
+        """
+        expansion = expansion_node_ids(skeleton) if budget.enabled else set()
+        stored: Optional[Dict[str, NodeCheckpoint]] = None
+
+        def degrade(job: NodeJob, force: bool = False) -> Optional[NodeResult]:
+            nonlocal stored
+            index, section, node, _ = job
+
+            if not force and budget.skip_expansion() and node.node_id in expansion:
+                budget.record(SKIPPED_EXPANSION_NODES)
+                print(f"  ⏳ Skipped expansion node {node.node_id}")
+                return NodeResult(None, None, None, degraded=True)
+
+            if not (force or budget.fallback()):
+                return None
+
+            if stored is None:
+                stored = self._stored_outputs(skeleton.page_id)
+            content = self._fallback_content(node, stored, budget)
+            visual = stored[node.node_id].visual if node.node_id in stored else \
+                self.visual_director.map_single_node(node=node, section_title=section.title)
+            block = self._assemble_node(node, content, visual, section, total_blocks)
+            return NodeResult(content, visual, block, degraded=True)
+
+        return degrade
+
+    # ============ Streaming Helpers ============
+
+    def _stage_start_event(self, stage: str, elapsed: float) -> StreamingEvent:
+        """STAGE_START event (also prints the stage banner)."""
+        banners = {
+            "planner": "🏗️  STAGE 1: PLANNER AGENT",
+            "assembler": "🔧 STAGE 3: PROGRESSIVE ASSEMBLY"
+        }
         print("\n" + "="*60)
-        print("🏗️  STAGE 1: PLANNER AGENT")
+        print(banners.get(stage, stage))
         print("="*60)
 
-        try:
-            skeleton = self.planner.plan(request)
-            print(f"✅ Planner completed: {len(skeleton.sections)} sections")
+        return StreamingEvent(
+            type=StreamingEventType.STAGE_START,
+            stage=stage,
+            data={"elapsed": elapsed}
+        )
+
+    def _error_event(self, stage: str, error: Exception, include_traceback: bool = False) -> StreamingEvent:
+        """ERROR event for a failed stage."""
+        data = {"error": str(error)}
+        if include_traceback:
+            import traceback
+            data["traceback"] = traceback.format_exc()
+
+        return StreamingEvent(type=StreamingEventType.ERROR, stage=stage, data=data)
+
+    def _skeleton_events(self, skeleton: PageSkeleton, elapsed: float) -> List[StreamingEvent]:
+        """SKELETON_READY + planner STAGE_COMPLETE events."""
+        print(f"✅ Planner completed: {len(skeleton.sections)} sections")
 
-            # Send skeleton_ready immediately
-            yield StreamingEvent(
+        return [
+            StreamingEvent(
                 type=StreamingEventType.SKELETON_READY,
                 stage="planner",
                 data={
@@ -323,149 +1145,389 @@ class ContentGenerationPipeline:
                     } for s in skeleton.sections],
                     "estimated_blocks": sum(len(s.nodes) for s in skeleton.sections)
                 }
-            )
-
-            yield StreamingEvent(
+            ),
+            StreamingEvent(
                 type=StreamingEventType.STAGE_COMPLETE,
                 stage="planner",
-                data={"section_count": len(skeleton.sections), "elapsed": get_elapsed()}
+                data={"section_count": len(skeleton.sections), "elapsed": elapsed}
             )
+        ]
 
-        except Exception as e:
-            yield StreamingEvent(
-                type=StreamingEventType.ERROR,
-                stage="planner",
-                data={"error": str(e)}
-            )
-            return
+    def _placeholder_event(self, skeleton: PageSkeleton) -> StreamingEvent:
+        """
+        BLOCK_PLACEHOLDER event: a rule-based block for every node, built
+        from skeleton metadata without any LLM call.
 
-        # ============ STAGE 2: PROGRESSIVE ASSEMBLY ============
-        yield StreamingEvent(
-            type=StreamingEventType.STAGE_START,
-            stage="assembler",
-            data={"elapsed": get_elapsed()}
+        Each placeholder carries the skeleton index and block id its
+        BLOCK_READY replacement will have, so the page is navigable before
+        the first node is generated.
+        """
+        total_blocks = sum(len(section.nodes) for section in skeleton.sections)
+        placeholders = []
+        index = 0
+        for section in skeleton.sections:
+            for node in section.nodes:
+                block = self.assembler._assemble_block(
+                    node=node,
+                    content=self.content_expert.rule_based_content(node),
+                    visual=self.visual_director.map_single_node(node=node, section_title=section.title),
+                    section=section,
+                    section_blocks=[],
+                    total_blocks=total_blocks,
+                    callback=None
+                )
+                if block:
+                    block.id = block.id or node.node_id
+                    placeholders.append({
+                        "block": block.model_dump(mode='json'),
+                        "section_id": section.section_id,
+                        "section_title": section.title,
+                        "index": index
+                    })
+                index += 1
+
+        print(f"🧩 Emitting {len(placeholders)}/{total_blocks} placeholder blocks")
+        return StreamingEvent(
+            type=StreamingEventType.BLOCK_PLACEHOLDER,
+            stage="planner",
+            data={"blocks": placeholders, "total_blocks": total_blocks}
         )
 
-        print("\n" + "="*60)
-        print("🔧 STAGE 3: PROGRESSIVE ASSEMBLY")
-        print("="*60)
+    def _section_context(self, section_idx: int, section) -> str:
+        """Section context string passed to the Content Expert for each node."""
+        return f"Section {section_idx + 1}: {section.title}\n{section.pedagogical_goal}"
 
-        try:
-            # Calculate total blocks
-            total_blocks = sum(len(s.nodes) for s in skeleton.sections)
-            current_block = 0
-
-            # Collect all blocks for final schema
-            all_blocks = []
-            sections = []
-
-            # Process each section and node progressively
-            for section_idx, section in enumerate(skeleton.sections):
-                section_blocks = []
-                section_context = f"Section {section_idx + 1}: {section.title}\n{section.pedagogical_goal}"
-
-                print(f"\n📂 Processing section {section_idx + 1}/{len(skeleton.sections)}: {section.title}")
-
-                for node_idx, node in enumerate(section.nodes):
-                    current_block += 1
-                    print(f"\n  🔷 Processing block {current_block}/{total_blocks}: {node.title}")
-
-                    # Step 1: Generate content for this node
-                    node_content = self.content_expert.generate_content_for_node(
-                        node=node,
-                        section_title=section.title,
-                        section_context=section_context,
-                        target_audience=request.target_audience,
-                        index=current_block - 1,
-                        total=total_blocks
-                    )
+    # ============ Concurrent Node Generation ============
 
-                    # Step 2: Generate visual mapping for this node
-                    node_visual = self.visual_director.map_single_node(
-                        node=node,
-                        section_title=section.title
-                    )
+    def _node_jobs(self, skeleton: PageSkeleton) -> List[NodeJob]:
+        """(index, section, node, section_context) for every node, in skeleton order."""
+        jobs = []
+        for section_idx, section in enumerate(skeleton.sections):
+            section_context = self._section_context(section_idx, section)
+            for node in section.nodes:
+                jobs.append((len(jobs), section, node, section_context))
+        return jobs
 
-                    # Step 3: Assemble the block
-                    block = self.assembler._assemble_block(
-                        node=node,
-                        content=node_content,
-                        visual=node_visual,
-                        section=section,
-                        section_blocks=section_blocks,
-                        total_blocks=total_blocks,
-                        callback=None  # We'll emit our own event
-                    )
+    def _node_scheduler(self, jobs: List[NodeJob], request: GenerationRequest) -> NodeScheduler:
+        """Scheduler for one streaming run, using the request's policy (or the pipeline default)."""
+        return NodeScheduler(jobs, policy=request.scheduling_policy or self.scheduling_policy)
 
-                    if block:
-                        section_blocks.append(block)
-                        all_blocks.append(block)
-
-                        # Step 4: Emit block_ready event immediately
-                        print(f"  📡 Emitting block_ready event for {block.type}")
-                        yield StreamingEvent(
-                            type=StreamingEventType.BLOCK_READY,
-                            stage="assembler",
-                            data={
-                                "block": block.model_dump(mode='json'),
-                                "section_id": section.section_id,
-                                "section_title": section.title,
-                                "index": current_block - 1,
-                                "progress": f"{current_block}/{total_blocks} ({int((current_block / total_blocks) * 100)}%)"
-                            }
-                        )
-                    else:
-                        print(f"  ⚠️  Skipped node {node.node_id} (no block generated)")
-
-                # Create section after all its blocks are ready
-                if section_blocks:
-                    frontend_section = self.assembler._build_section(
-                        section=section,
-                        blocks=section_blocks
-                    )
-                    sections.append(frontend_section)
+    def _worker_count(self, total_blocks: int) -> int:
+        """Per-node worker pool size (LLMConfig.max_concurrency of the Content Expert's provider)."""
+        workers = max(1, min(self.content_expert.llm.config.max_concurrency, total_blocks))
+        print(f"⚙️  Generating {total_blocks} blocks with {workers} concurrent workers")
+        return workers
+
+    def _generate_block(
+        self,
+        job: NodeJob,
+        target_audience: str,
+        total_blocks: int,
+        usage: UsageReport,
+        prerequisite_context: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> NodeResult:
+        """
+        Generate content + visual mapping for one node and assemble its block.
 
-            # Create final page schema
-            final_schema = self.assembler._build_final_schema(
-                skeleton=skeleton,
-                sections=sections,
-                all_blocks=all_blocks
+        Returns:
+            NodeResult - the content is summarized for dependent nodes and,
+            with the visual mapping, checkpointed for resume
+        """
+        index, section, node, section_context = job
+        print(f"\n  🔷 Processing block {index + 1}/{total_blocks}: {node.title}")
+
+        with usage_scope(stage="content_expert", node=node.node_id, report=usage):
+            node_content = self.content_expert.generate_content_for_node(
+                node=node,
+                section_title=section.title,
+                section_context=section_context,
+                target_audience=target_audience,
+                index=index,
+                total=total_blocks,
+                prerequisite_context=prerequisite_context,
+                max_tokens=max_tokens
             )
 
-            print(f"\n✅ Assembler completed: {len(final_schema.components)} blocks")
+        node_visual = self.visual_director.map_single_node(
+            node=node,
+            section_title=section.title
+        )
 
-            # Save to JSON
-            output_path = f"public/pages/{skeleton.page_id}.json"
-            self.assembler.export_to_json(final_schema, output_path)
-            print(f"💾 Saved to: {output_path}")
+        block = self._assemble_node(node, node_content, node_visual, section, total_blocks)
+        return NodeResult(node_content, node_visual, block)
 
-            # Final completion
-            total_time = get_elapsed()
-            yield StreamingEvent(
-                type=StreamingEventType.COMPLETE,
-                stage="assembler",
-                data={
-                    "schema": final_schema.model_dump(mode='json'),
-                    "total_blocks": len(final_schema.components),
-                    "saved_to": output_path,
-                    "generation_time": total_time
-                }
+    async def _agenerate_block(
+        self,
+        job: NodeJob,
+        target_audience: str,
+        total_blocks: int,
+        usage: UsageReport,
+        prerequisite_context: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> NodeResult:
+        """Async variant of _generate_block()."""
+        index, section, node, section_context = job
+        print(f"\n  🔷 Processing block {index + 1}/{total_blocks}: {node.title}")
+
+        with usage_scope(stage="content_expert", node=node.node_id, report=usage):
+            node_content = await self.content_expert.agenerate_content_for_node(
+                node=node,
+                section_title=section.title,
+                section_context=section_context,
+                target_audience=target_audience,
+                index=index,
+                total=total_blocks,
+                prerequisite_context=prerequisite_context,
+                max_tokens=max_tokens
             )
 
-            print("\n" + "="*60)
-            print("✅ PIPELINE COMPLETE")
-            print("="*60)
-            print(f"⏱️  Total time: {total_time:.2f}s")
-            print(f"📦 Total blocks: {len(final_schema.components)}")
+        node_visual = await self.visual_director.amap_single_node(
+            node=node,
+            section_title=section.title
+        )
 
-        except Exception as e:
-            import traceback
-            yield StreamingEvent(
-                type=StreamingEventType.ERROR,
-                stage="assembler",
-                data={"error": str(e), "traceback": traceback.format_exc()}
-            )
+        block = self._assemble_node(node, node_content, node_visual, section, total_blocks)
+        return NodeResult(node_content, node_visual, block)
+
+    def _restorable_nodes(
+        self,
+        request: GenerationRequest,
+        skeleton: PageSkeleton,
+        checkpoint: Optional[RunCheckpoint]
+    ) -> Dict[str, NodeCheckpoint]:
+        """Node outputs that need no generation: unchanged since the page's last run, or checkpointed."""
+        restored = self._reusable_nodes(request, skeleton)
+        if checkpoint:
+            restored.update(checkpoint.nodes)
+        return restored
+
+    def _restore_nodes(
+        self,
+        jobs: List[NodeJob],
+        scheduler: NodeScheduler,
+        restored: Dict[str, NodeCheckpoint],
+        outputs: Dict[str, NodeCheckpoint],
+        total_blocks: int
+    ) -> List[Tuple[int, Any, Optional[FrontendBlock]]]:
+        """
+        Re-assemble restored nodes and mark them done in the scheduler.
+
+        Returns:
+            (index, section, block) for every restored node, in skeleton order
+        """
+        restored_jobs = [job for job in jobs if job[2].node_id in restored]
+        if not restored_jobs:
+            return []
+
+        for index, _, _, _ in restored_jobs:
+            scheduler.start(index)
+
+        results = []
+        for index, section, node, _ in restored_jobs:
+            saved = restored[node.node_id]
+            outputs[node.node_id] = saved
+            scheduler.complete(index, saved.content)
+            results.append((index, section, self._assemble_node(node, saved.content, saved.visual, section, total_blocks)))
+
+        print(f"♻️  Restored {len(restored_jobs)}/{len(jobs)} nodes without generation")
+        return results
+
+    def _record_node(
+        self,
+        thread_id: Optional[str],
+        node,
+        result: NodeResult,
+        outputs: Dict[str, NodeCheckpoint]
+    ) -> None:
+        """Keep a finished node for the page store and checkpoint it (placeholder / degraded content is skipped, so it is retried)."""
+        if result.degraded or self.content_expert.is_fallback_content(node, result.content):
+            return
+        output_lengths.observe(node, result.content)
+        outputs[node.node_id] = NodeCheckpoint(content=result.content, visual=result.visual)
+        if self.checkpoints and thread_id:
+            self.checkpoints.save_node(thread_id, node.node_id, result.content, result.visual)
+
+    # ============ Incremental Regeneration ============
+
+    def _page_fingerprints(self, request: GenerationRequest, skeleton: PageSkeleton) -> Dict[str, str]:
+        """node_id -> prompt fingerprint (prerequisites included) for every node of the skeleton."""
+        return page_fingerprints(skeleton, request.target_audience)
+
+    def _reusable_nodes(self, request: GenerationRequest, skeleton: PageSkeleton) -> Dict[str, NodeCheckpoint]:
+        """Stored outputs of the nodes whose fingerprint is unchanged since the page's last run."""
+        if not self.pages or request.force_regenerate:
+            return {}
+        return self.pages.reusable(skeleton.page_id, self._page_fingerprints(request, skeleton))
+
+    def _remember_page(
+        self,
+        request: GenerationRequest,
+        skeleton: PageSkeleton,
+        outputs: Dict[str, NodeCheckpoint]
+    ) -> None:
+        """Store a finished run's node outputs as the page's baseline for the next run."""
+        if not self.pages:
             return
+        fingerprints = self._page_fingerprints(request, skeleton)
+        self.pages.save(skeleton.page_id, {
+            node_id: (fingerprints[node_id], saved)
+            for node_id, saved in outputs.items()
+            if node_id in fingerprints
+        })
+
+    @staticmethod
+    def _pending_skeleton(skeleton: PageSkeleton, reused: Dict[str, Any]) -> Optional[PageSkeleton]:
+        """The skeleton restricted to nodes that still need generation (None if there are none)."""
+        if not reused:
+            return skeleton
+
+        sections = []
+        for section in skeleton.sections:
+            nodes = [node for node in section.nodes if node.node_id not in reused]
+            if nodes:
+                sections.append(section.model_copy(update={"nodes": nodes}))
+
+        return skeleton.model_copy(update={"sections": sections}) if sections else None
+
+    @staticmethod
+    def _merge_reused(skeleton: PageSkeleton, generated: List[Any], reused: Dict[str, Any]) -> List[Any]:
+        """Combine generated and reused per-node items (keyed by node_id) in skeleton order."""
+        if not reused:
+            return generated
+
+        by_node = {**reused, **{item.node_id: item for item in generated}}
+        return [
+            by_node[node.node_id]
+            for section in skeleton.sections
+            for node in section.nodes
+            if node.node_id in by_node
+        ]
+
+    def _ordered_sections(
+        self,
+        skeleton: PageSkeleton,
+        blocks: Dict[int, FrontendBlock]
+    ) -> Tuple[List[FrontendSection], List[FrontendBlock]]:
+        """Rebuild sections and the flat block list in skeleton order."""
+        sections = []
+        all_blocks = []
+        index = 0
+
+        for section in skeleton.sections:
+            section_blocks = []
+            for _ in section.nodes:
+                if index in blocks:
+                    section_blocks.append(blocks[index])
+                index += 1
+
+            if section_blocks:
+                sections.append(self.assembler._build_section(section=section, blocks=section_blocks))
+                all_blocks.extend(section_blocks)
+
+        return sections, all_blocks
+
+    def _assemble_node(
+        self,
+        node,
+        content,
+        visual,
+        section,
+        total_blocks: int
+    ) -> Optional[FrontendBlock]:
+        """Assemble a single block (logs nodes that produced nothing)."""
+        block = self.assembler._assemble_block(
+            node=node,
+            content=content,
+            visual=visual,
+            section=section,
+            section_blocks=[],  # Only used for the callback's progress
+            total_blocks=total_blocks,
+            callback=None  # We emit our own event
+        )
+
+        if not block:
+            print(f"  ⚠️  Skipped node {node.node_id} (no block generated)")
+        elif not block.id:
+            # Same id as the node's BLOCK_PLACEHOLDER block
+            block.id = node.node_id
+
+        return block
+
+    def _block_ready_event(
+        self,
+        block: FrontendBlock,
+        section,
+        index: int,
+        completed: int,
+        total_blocks: int
+    ) -> StreamingEvent:
+        """
+        BLOCK_READY event for an assembled block.
+
+        Blocks are generated concurrently, so events arrive in completion
+        order; `index` is the block's stable position in the skeleton.
+        """
+        print(f"  📡 Emitting block_ready event for {block.type} (#{index + 1})")
+        return StreamingEvent(
+            type=StreamingEventType.BLOCK_READY,
+            stage="assembler",
+            data={
+                "block": block.model_dump(mode='json'),
+                "section_id": section.section_id,
+                "section_title": section.title,
+                "index": index,
+                "progress": f"{completed}/{total_blocks} ({int((completed / total_blocks) * 100)}%)"
+            }
+        )
+
+    def _finalize_streaming(
+        self,
+        skeleton: PageSkeleton,
+        sections: List[FrontendSection],
+        all_blocks: List[FrontendBlock],
+        total_time: float,
+        usage: Optional[UsageReport] = None,
+        degradations: Optional[List[str]] = None
+    ) -> StreamingEvent:
+        """Build and save the final page schema; return the COMPLETE event."""
+        final_schema = self.assembler._build_final_schema(
+            skeleton=skeleton,
+            sections=sections,
+            all_blocks=all_blocks
+        )
+
+        print(f"\n✅ Assembler completed: {len(final_schema.components)} blocks")
+
+        # Save to JSON
+        output_path = f"public/pages/{skeleton.page_id}.json"
+        self.assembler.export_to_json(final_schema, output_path)
+        print(f"💾 Saved to: {output_path}")
+
+        print("\n" + "="*60)
+        print("✅ PIPELINE COMPLETE")
+        print("="*60)
+        print(f"⏱️  Total time: {total_time:.2f}s")
+        print(f"📦 Total blocks: {len(final_schema.components)}")
+        if usage:
+            print(f"🔢 Tokens: {usage.total.total_tokens} "
+                  f"({usage.total.cached_tokens} cached, {usage.total.calls} calls)")
+        if degradations:
+            print(f"⏳ Degradations: {', '.join(degradations)}")
+
+        return StreamingEvent(
+            type=StreamingEventType.COMPLETE,
+            stage="assembler",
+            data={
+                "schema": final_schema.model_dump(mode='json'),
+                "total_blocks": len(final_schema.components),
+                "saved_to": output_path,
+                "generation_time": total_time,
+                "tokens_used": usage.total.total_tokens if usage else None,
+                "token_usage": usage.model_dump() if usage else None,
+                "degradations": degradations or []
+            }
+        )
 
 
 # ============ Helper Functions ============
@@ -0,0 +1,308 @@
+"""
+Prerequisite-Aware Node Scheduler
+
+Per-node generation in streaming mode used to treat every node as
+independent. ContentNode.prerequisites (and the example / practice nodes
+that knowledge_point_to_expanded_nodes() hangs off each main concept) form
+a dependency graph; NodeScheduler turns it into a DAG over the pipeline's
+node jobs:
+
+- Independent nodes are ready immediately and run in parallel
+- A node becomes ready as soon as all of its prerequisites are done
+- Each node's prompt gets a compact summary of its prerequisites' content
+
+Prerequisites may name a node_id (topic mode) or a knowledge_id (knowledge
+path mode, resolved to the first node of that knowledge point). Unknown
+references are ignored and cycles are broken, so a bad skeleton degrades
+to plain parallel generation instead of stalling.
+
+Among ready nodes, a scheduling policy decides who gets a free worker:
+- viewport_first:   first section (Hero included) first - fastest perceived load
+- longest_first:    longest expected output first (critical path) - shortest makespan
+- importance_first: key points / high ContentNode.importance first
+A node inherits the priority of its most urgent dependent, so the
+prerequisites of an urgent node are urgent too.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from models.schemas import ContentBlock, ContentNode
+
+
+# (index, section, node, section_context) - one unit of per-node generation
+NodeJob = Tuple[int, Any, Any, str]
+
+# Priority key per job index; smaller keys are dispatched first
+SchedulingPolicy = Callable[["NodeScheduler"], Dict[int, Tuple]]
+
+
+# ============ Output Length Model ============
+
+class OutputLengthModel:
+    """
+    Running estimate of generated content length per ContentCategory.
+
+    Fed by every generated node (characters of the ContentBlock JSON);
+    categories without observations fall back to estimated_time_minutes.
+    """
+
+    CHARS_PER_MINUTE = 300   # Prior: output length per estimated minute
+    SMOOTHING = 0.3          # EWMA weight of the newest observation
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lengths: Dict[str, float] = {}
+
+    def observe(self, node: ContentNode, content: ContentBlock) -> None:
+        """Record the output length of a generated node."""
+        length = len(content.model_dump_json())
+        with self._lock:
+            previous = self._lengths.get(node.category.value)
+            self._lengths[node.category.value] = length if previous is None else \
+                previous + self.SMOOTHING * (length - previous)
+
+    def estimate(self, node: ContentNode) -> float:
+        """Expected output length of a node (characters)."""
+        with self._lock:
+            observed = self._lengths.get(node.category.value)
+        return observed if observed is not None else node.estimated_time_minutes * self.CHARS_PER_MINUTE
+
+
+# Shared by all pipelines of the process
+output_lengths = OutputLengthModel()
+
+
+class NodeScheduler:
+    """
+    Dependency bookkeeping for one streaming run (thread-safe).
+
+    Usage:
+        scheduler = NodeScheduler(jobs)
+        pending = scheduler.ready()
+        ...
+        newly_ready = scheduler.complete(index, content)
+    """
+
+    # Limits for the prerequisite summaries passed into prompts
+    SUMMARY_KEY_POINTS = 3
+    SUMMARY_MAX_CHARS = 300
+
+    def __init__(self, jobs: List[NodeJob], policy: Optional[str] = None):
+        """
+        Args:
+            jobs: Node jobs in skeleton order (index == position)
+            policy: Scheduling policy name (default: DEFAULT_SCHEDULING_POLICY)
+        """
+        self.jobs = jobs
+        self._lock = threading.Lock()
+
+        self.dependencies: Dict[int, Set[int]] = self._resolve_dependencies(jobs)
+        self.order: List[int] = self._topological_order()
+
+        self.dependents: Dict[int, List[int]] = {job[0]: [] for job in jobs}
+        for index, prerequisites in self.dependencies.items():
+            for prerequisite in sorted(prerequisites):
+                self.dependents[prerequisite].append(index)
+
+        self.policy, policy_fn = get_scheduling_policy(policy)
+        self.priority: Dict[int, Tuple] = self._effective_priorities(policy_fn(self))
+
+        self._remaining: Dict[int, Set[int]] = {
+            index: set(prerequisites) for index, prerequisites in self.dependencies.items()
+        }
+        self._summaries: Dict[int, str] = {}
+
+        edges = sum(len(p) for p in self.dependencies.values())
+        print(f"🧭 Node scheduler: {len(jobs)} nodes, {edges} prerequisite links, "
+              f"{len(self.ready())} ready immediately, policy={self.policy}")
+
+    # ============ Graph Construction ============
+
+    @staticmethod
+    def _resolve_dependencies(jobs: List[NodeJob]) -> Dict[int, Set[int]]:
+        """Map each job index to the indices of its prerequisite jobs."""
+        by_node_id: Dict[str, int] = {}
+        by_knowledge_id: Dict[str, int] = {}
+        for index, _, node, _ in jobs:
+            by_node_id.setdefault(node.node_id, index)
+            by_knowledge_id.setdefault(node.knowledge_id, index)
+
+        dependencies: Dict[int, Set[int]] = {}
+        for index, _, node, _ in jobs:
+            prerequisites = set()
+            for reference in node.prerequisites:
+                target = by_node_id.get(reference, by_knowledge_id.get(reference))
+                if target is not None and target != index:
+                    prerequisites.add(target)
+            dependencies[index] = prerequisites
+
+        return dependencies
+
+    def _topological_order(self) -> List[int]:
+        """
+        Kahn's algorithm, preferring skeleton order among ready nodes.
+
+        When the sort gets stuck on a cycle, the earliest node still waiting
+        has its unresolved dependencies dropped (with a warning) and the
+        sort continues, so every node still runs.
+        """
+        remaining = {index: set(p) for index, p in self.dependencies.items()}
+        order: List[int] = []
+
+        while remaining:
+            ready = sorted(index for index, prerequisites in remaining.items() if not prerequisites)
+            if not ready:
+                index = min(remaining)
+                print(f"⚠️  Prerequisite cycle at node '{self.jobs[index][2].node_id}'; "
+                      f"ignoring its unresolved prerequisites")
+                self.dependencies[index] -= remaining[index]
+                remaining[index].clear()
+                continue
+
+            for index in ready:
+                order.append(index)
+                del remaining[index]
+            for prerequisites in remaining.values():
+                prerequisites.difference_update(ready)
+
+        return order
+
+    def _effective_priorities(self, own: Dict[int, Tuple]) -> Dict[int, Tuple]:
+        """
+        Let each job inherit the key of its most urgent dependent.
+
+        Keys end with the job index, which is replaced by the inheriting
+        job's own index so ties still break in skeleton order.
+        """
+        priority: Dict[int, Tuple] = {}
+        for index in reversed(self.order):
+            key = own[index]
+            for dependent in self.dependents[index]:
+                key = min(key, priority[dependent][:-1] + (index,))
+            priority[index] = key
+        return priority
+
+    # ============ Scheduling ============
+
+    def ready(self) -> List[int]:
+        """Jobs with no unfinished prerequisites that have not been handed out yet (most urgent first)."""
+        with self._lock:
+            ready = [index for index in self.order if index in self._remaining and not self._remaining[index]]
+        return sorted(ready, key=self.priority.__getitem__)
+
+    def start(self, index: int) -> Optional[str]:
+        """
+        Mark a job as dispatched.
+
+        Returns:
+            Prerequisite summary for the job's prompt (None if it has none)
+        """
+        with self._lock:
+            self._remaining.pop(index, None)
+            summaries = [
+                self._summaries[p] for p in sorted(self.dependencies[index]) if p in self._summaries
+            ]
+        return "\n".join(summaries) if summaries else None
+
+    def complete(self, index: int, content: Optional[ContentBlock]) -> List[int]:
+        """
+        Record a finished job.
+
+        Args:
+            index: Finished job
+            content: Its generated content (summarized for dependents)
+
+        Returns:
+            Jobs that became ready because of this completion (most urgent first)
+        """
+        with self._lock:
+            if content is not None:
+                self._summaries[index] = self.summarize(content)
+
+            newly_ready = []
+            for dependent in self.dependents[index]:
+                waiting = self._remaining.get(dependent)
+                if waiting is None:
+                    continue
+                waiting.discard(index)
+                if not waiting:
+                    newly_ready.append(dependent)
+
+        return sorted(newly_ready, key=self.priority.__getitem__)
+
+    @classmethod
+    def summarize(cls, content: ContentBlock) -> str:
+        """Compact one-line summary of a node's content for dependent prompts."""
+        if content.key_points:
+            gist = "; ".join(content.key_points[:cls.SUMMARY_KEY_POINTS])
+        else:
+            gist = " ".join(content.main_content.split())
+
+        if len(gist) > cls.SUMMARY_MAX_CHARS:
+            gist = gist[:cls.SUMMARY_MAX_CHARS].rstrip() + "…"
+
+        return f"- **{content.title}** ({content.node_id}): {gist}"
+
+
+# ============ Scheduling Policies ============
+
+def viewport_first(scheduler: NodeScheduler) -> Dict[int, Tuple]:
+    """First section (Hero included) first, then skeleton order."""
+    first_section = scheduler.jobs[0][1].section_id if scheduler.jobs else None
+    return {
+        index: (0 if section.section_id == first_section else 1, index)
+        for index, section, _, _ in scheduler.jobs
+    }
+
+
+def longest_first(scheduler: NodeScheduler) -> Dict[int, Tuple]:
+    """
+    Longest processing time first, along the critical path.
+
+    A job's weight is its expected output length (output_lengths) plus the
+    heaviest chain of dependents behind it; without prerequisite links this
+    is plain LPT ordering.
+    """
+    weight: Dict[int, float] = {}
+    for index in reversed(scheduler.order):
+        node = scheduler.jobs[index][2]
+        tail = max((weight[d] for d in scheduler.dependents[index]), default=0.0)
+        weight[index] = output_lengths.estimate(node) + tail
+    return {index: (-weight[index], index) for index in weight}
+
+
+def importance_first(scheduler: NodeScheduler) -> Dict[int, Tuple]:
+    """Key points first, then by ContentNode.importance."""
+    return {
+        index: (not node.is_key_point, -node.importance, index)
+        for index, _, node, _ in scheduler.jobs
+    }
+
+
+SCHEDULING_POLICIES: Dict[str, SchedulingPolicy] = {
+    "viewport_first": viewport_first,
+    "longest_first": longest_first,
+    "importance_first": importance_first
+}
+
+DEFAULT_SCHEDULING_POLICY = "viewport_first"
+
+
+def register_scheduling_policy(name: str, policy: SchedulingPolicy) -> None:
+    """Add (or replace) a scheduling policy selectable by name."""
+    SCHEDULING_POLICIES[name] = policy
+
+
+def get_scheduling_policy(name: Optional[str]) -> Tuple[str, SchedulingPolicy]:
+    """
+    Resolve a policy name.
+
+    Returns:
+        (name, policy) - unknown names fall back to DEFAULT_SCHEDULING_POLICY
+    """
+    name = (name or DEFAULT_SCHEDULING_POLICY).strip().lower().replace("-", "_")
+    if name not in SCHEDULING_POLICIES:
+        print(f"⚠️  Unknown scheduling policy '{name}', using '{DEFAULT_SCHEDULING_POLICY}'")
+        name = DEFAULT_SCHEDULING_POLICY
+    return name, SCHEDULING_POLICIES[name]
@@ -13,7 +13,7 @@ interface GenerationRequestAPI {
 // SSE Event types from backend
 interface StreamingEvent {
   task_id: string;
-  type: 'stage_start' | 'stage_complete' | 'skeleton_ready' | 'block_ready'
+  type: 'stage_start' | 'stage_complete' | 'skeleton_ready' | 'block_placeholder' | 'block_ready'
        | 'heartbeat' | 'progress' | 'section_complete' | 'complete' | 'error';
   stage?: string;
   data?: any;
@@ -37,8 +37,9 @@ interface StreamingState {
   // Skeleton structure
   skeleton: PageSkeleton | null;
 
-  // Content blocks
+  // Content blocks (in skeleton order) and their stable indices
   blocks: Block[];
+  blockIndices: number[];
 
   // Status
   isComplete: boolean;
@@ -59,10 +60,15 @@ interface StreamingState {
   progress: string;  // "5/12 (42%)"
 }
 
+// Resuming a dropped stream (GET /generate/{task_id}/events)
+const MAX_RECONNECTS = 5;
+const RECONNECT_DELAY_MS = 1000;
+
 export function useStreamingGeneration(request: GenerationRequestAPI) {
   const [state, setState] = useState<StreamingState>({
     skeleton: null,
     blocks: [],
+    blockIndices: [],
     isComplete: false,
     currentStage: 'idle',
     error: null,
@@ -97,7 +103,7 @@ export function useStreamingGeneration(request: GenerationRequestAPI) {
 
     try {
       console.log('📡 Sending request to: http://localhost:8000/generate/stream');
-      const response = await fetch('http://localhost:8000/generate/stream', {
+      let response = await fetch('http://localhost:8000/generate/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(request),
@@ -107,136 +113,181 @@ export function useStreamingGeneration(request: GenerationRequestAPI) {
       console.log('📡 Response received:', response.status, response.statusText);
       console.log('📡 Response headers:', response.headers);
 
-      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      // Every event carries an SSE id; if the connection drops before the
+      // run finishes, resume from the last one instead of starting over
+      let taskId: string | null = null;
+      let lastEventId = 0;
+      let finished = false;
 
-      const reader = response.body?.getReader();
-      const decoder = new TextDecoder();
+      const readEvents = async (response: Response): Promise<boolean> => {
+        const reader = response.body?.getReader();
+        const decoder = new TextDecoder();
 
-      if (!reader) throw new Error('No response body');
+        if (!reader) throw new Error('No response body');
 
-      console.log('✅ Reader created, starting to read SSE stream...');
+        console.log('✅ Reader created, starting to read SSE stream...');
 
-      let buffer = '';
-      let eventCount = 0;
+        let buffer = '';
+        let eventCount = 0;
 
-      while (true) {
-        const { done, value } = await reader.read();
-        if (done) {
-          console.log(`✅ Stream ended. Total events received: ${eventCount}`);
-          break;
-        }
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) {
+            console.log(`✅ Stream ended. Total events received: ${eventCount}`);
+            return finished;
+          }
 
-        buffer += decoder.decode(value, { stream: true });
-        console.log(`📦 Received chunk: ${value.length} bytes, buffer size: ${buffer.length}`);
+          buffer += decoder.decode(value, { stream: true });
+          console.log(`📦 Received chunk: ${value.length} bytes, buffer size: ${buffer.length}`);
 
-        // Process SSE events
-        const lines = buffer.split('\n\n');
-        buffer = lines.pop() || '';
+          // Process SSE events
+          const lines = buffer.split('\n\n');
+          buffer = lines.pop() || '';
 
-        for (const line of lines) {
-          // Parse SSE format:
-          // event: stage_start
-          // data: {...}
+          for (const line of lines) {
+            // Parse SSE format:
+            // event: stage_start
+            // data: {...}
 
-          const lines_splitted = line.split('\n');
-          let eventData = null;
+            const lines_splitted = line.split('\n');
+            let eventData = null;
 
-          for (const l of lines_splitted) {
-            if (l.startsWith('data: ')) {
-              try {
-                eventData = JSON.parse(l.slice(6));
-              } catch (e) {
-                console.error('Failed to parse data JSON:', l);
+            for (const l of lines_splitted) {
+              if (l.startsWith('id: ')) {
+                lastEventId = Number(l.slice(4)) || lastEventId;
               }
-            }
-          }
-
-          if (!eventData) continue;
-
-          try {
-            const event: StreamingEvent = eventData;
-            eventCount++;
-            const elapsed = (Date.now() - startTimeRef.current) / 1000;
-
-            // Debug logging
-            console.log(`📨 Event #${eventCount}:`, event.type, event.stage);
-
-            setState(prev => {
-              const newState = { ...prev };
-              newState.metadata.elapsed_time = elapsed;
-
-              switch (event.type) {
-                case 'stage_start':
-                  newState.currentStage = event.stage || 'unknown';
-                  newState.metadata.stages[event.stage!] = {
-                    ...prev.metadata.stages[event.stage!],
-                    started: event.timestamp
-                  };
-                  break;
-
-                case 'stage_complete':
-                  const started = newState.metadata.stages[event.stage!]?.started || event.timestamp;
-                  newState.metadata.stages[event.stage!] = {
-                    ...newState.metadata.stages[event.stage!],
-                    completed: event.timestamp,
-                    duration: event.timestamp - started
-                  };
-
-                  // Estimate remaining time based on stages
-                  const completed_stages = Object.values(newState.metadata.stages).filter(s => s.duration);
-                  if (completed_stages.length >= 2) {
-                    const avg_stage_time = completed_stages.reduce((a, b) => a + (b.duration || 0), 0) / completed_stages.length;
-                    const remaining_stages = 4 - completed_stages.length;  // 4 total stages
-                    newState.metadata.estimated_remaining = avg_stage_time * remaining_stages;
-                  }
-                  break;
-
-                case 'skeleton_ready':
-                  console.log('🦴 Setting skeleton:', event.data);
-                  newState.skeleton = event.data;
-                  newState.metadata.totalBlocks = event.data?.estimated_blocks || 0;
-                  break;
-
-                case 'block_ready':
-                  const newBlock = event.data?.block;
-                  console.log('🧱 Adding block:', newBlock?.type, newBlock?.title);
-                  if (newBlock) {
-                    newState.blocks = [...prev.blocks, newBlock];
-                    newState.metadata.receivedBlocks++;
-                    newState.progress = event.data?.progress || '';
-                  }
-
-                  // Update ETA based on blocks
-                  if (newState.metadata.receivedBlocks > 0 && newState.metadata.totalBlocks > 0) {
-                    const time_per_block = elapsed / newState.metadata.receivedBlocks;
-                    const remaining_blocks = newState.metadata.totalBlocks - newState.metadata.receivedBlocks;
-                    newState.metadata.estimated_remaining = time_per_block * remaining_blocks;
-                  }
-                  break;
-
-                case 'heartbeat':
-                  newState.lastHeartbeat = event.data?.message || '';
-                  break;
-
-                case 'complete':
-                  newState.isComplete = true;
-                  newState.metadata.totalBlocks = event.data?.total_blocks || 0;
-                  newState.metadata.estimated_remaining = 0;
-                  console.log(`✅ Saved to: ${event.data?.saved_to}`);
-                  break;
-
-                case 'error':
-                  newState.error = event.data?.error || 'Unknown error';
-                  newState.isComplete = true;
-                  break;
+              if (l.startsWith('data: ')) {
+                try {
+                  eventData = JSON.parse(l.slice(6));
+                } catch (e) {
+                  console.error('Failed to parse data JSON:', l);
+                }
               }
+            }
 
-              return newState;
-            });
-          } catch (e) {
-            console.error('Failed to parse SSE event:', e);
+            if (!eventData) continue;
+
+            try {
+              const event: StreamingEvent = eventData;
+              taskId = event.task_id || taskId;
+              finished = finished || event.type === 'complete' || event.type === 'error';
+              eventCount++;
+              const elapsed = (Date.now() - startTimeRef.current) / 1000;
+
+              // Debug logging
+              console.log(`📨 Event #${eventCount}:`, event.type, event.stage);
+
+              setState(prev => {
+                const newState = { ...prev };
+                newState.metadata.elapsed_time = elapsed;
+
+                switch (event.type) {
+                  case 'stage_start':
+                    newState.currentStage = event.stage || 'unknown';
+                    newState.metadata.stages[event.stage!] = {
+                      ...prev.metadata.stages[event.stage!],
+                      started: event.timestamp
+                    };
+                    break;
+
+                  case 'stage_complete':
+                    const started = newState.metadata.stages[event.stage!]?.started || event.timestamp;
+                    newState.metadata.stages[event.stage!] = {
+                      ...newState.metadata.stages[event.stage!],
+                      completed: event.timestamp,
+                      duration: event.timestamp - started
+                    };
+
+                    // Estimate remaining time based on stages
+                    const completed_stages = Object.values(newState.metadata.stages).filter(s => s.duration);
+                    if (completed_stages.length >= 2) {
+                      const avg_stage_time = completed_stages.reduce((a, b) => a + (b.duration || 0), 0) / completed_stages.length;
+                      const remaining_stages = 4 - completed_stages.length;  // 4 total stages
+                      newState.metadata.estimated_remaining = avg_stage_time * remaining_stages;
+                    }
+                    break;
+
+                  case 'skeleton_ready':
+                    console.log('🦴 Setting skeleton:', event.data);
+                    newState.skeleton = event.data;
+                    newState.metadata.totalBlocks = event.data?.estimated_blocks || 0;
+                    break;
+
+                  case 'block_placeholder':
+                    // Rule-based blocks for the whole page, shown until the
+                    // generated block with the same index arrives
+                    const placeholders: { index: number; block: Block }[] = event.data?.blocks || [];
+                    console.log('🧩 Placeholder blocks:', placeholders.length);
+                    newState.blocks = placeholders.map(p => p.block);
+                    newState.blockIndices = placeholders.map(p => p.index);
+                    break;
+
+                  case 'block_ready':
+                    const newBlock = event.data?.block;
+                    console.log('🧱 Adding block:', newBlock?.type, newBlock?.title);
+                    if (newBlock) {
+                      // Blocks are generated concurrently and may arrive out of
+                      // order; slot each one in by its stable skeleton index,
+                      // replacing its placeholder if there is one
+                      const index: number = event.data?.index ?? prev.blocks.length;
+                      const pos = prev.blockIndices.filter(i => i < index).length;
+                      const replaces = prev.blockIndices[pos] === index ? 1 : 0;
+                      newState.blocks = [...prev.blocks.slice(0, pos), newBlock, ...prev.blocks.slice(pos + replaces)];
+                      newState.blockIndices = [...prev.blockIndices.slice(0, pos), index, ...prev.blockIndices.slice(pos + replaces)];
+                      newState.metadata.receivedBlocks++;
+                      newState.progress = event.data?.progress || '';
+                    }
+
+                    // Update ETA based on blocks
+                    if (newState.metadata.receivedBlocks > 0 && newState.metadata.totalBlocks > 0) {
+                      const time_per_block = elapsed / newState.metadata.receivedBlocks;
+                      const remaining_blocks = newState.metadata.totalBlocks - newState.metadata.receivedBlocks;
+                      newState.metadata.estimated_remaining = time_per_block * remaining_blocks;
+                    }
+                    break;
+
+                  case 'heartbeat':
+                    newState.lastHeartbeat = event.data?.message || '';
+                    break;
+
+                  case 'complete':
+                    newState.isComplete = true;
+                    newState.metadata.totalBlocks = event.data?.total_blocks || 0;
+                    newState.metadata.estimated_remaining = 0;
+                    console.log(`✅ Saved to: ${event.data?.saved_to}`);
+                    break;
+
+                  case 'error':
+                    newState.error = event.data?.error || 'Unknown error';
+                    newState.isComplete = true;
+                    break;
+                }
+
+                return newState;
+              });
+            } catch (e) {
+              console.error('Failed to parse SSE event:', e);
+            }
           }
         }
+      };
+
+      for (let attempt = 0; ; attempt++) {
+        try {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          if (await readEvents(response)) break;
+        } catch (error) {
+          if (ctrl.signal.aborted || !taskId || attempt >= MAX_RECONNECTS) throw error;
+          console.warn('⚠️ Stream interrupted:', error);
+        }
+        if (!taskId || attempt >= MAX_RECONNECTS) throw new Error('Stream ended before generation completed');
+
+        await new Promise(resolve => setTimeout(resolve, RECONNECT_DELAY_MS * (attempt + 1)));
+        console.log(`🔁 Resuming task ${taskId} after event ${lastEventId}`);
+        response = await fetch(`http://localhost:8000/generate/${taskId}/events`, {
+          headers: { 'Last-Event-ID': String(lastEventId) },
+          signal: ctrl.signal
+        });
       }
     } catch (error) {
       if (error instanceof Error && error.name !== 'AbortError') {